@@ -6,30 +6,66 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
+import logging
 import os
+import time
 
 # Inicialização de extensões
 db = SQLAlchemy()
 migrate = Migrate()
+
+# Registra o backend sqlite:// do Flask-Limiter e a chave por usuário/IP
+from app.utils.ratelimit import chave_rate_limit
+
+# Limites padrão por usuário: cobrem uma aula inteira de navegação e autosave;
+# o contador de não lidas (polling) e o stream SSE ficam isentos (ver notificacoes.py)
 limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["200 per day", "50 per hour"]
+    key_func=chave_rate_limit,
+    default_limits=["5000 per day", "1000 per hour"]
 )
 
 def create_app(config_name='default'):
     """Factory para criar a aplicação Flask"""
+    inicio = time.perf_counter()
     app = Flask(__name__)
     
     # Carregar configurações
     from app.config import config
     app.config.from_object(config[config_name])
     
+    # Logger "app": também recebe os logs dos módulos app.*
+    app.logger.setLevel(app.config.get('LOG_LEVEL', logging.INFO))
+    
+    # Tempo de cada fase da inicialização (registrado no log ao final)
+    tempos = {}
+    marca = time.perf_counter()
+    
     # Inicializar extensões
     db.init_app(app)
     migrate.init_app(app, db)
     limiter.init_app(app)
     
+    # Sessão server-side no banco principal
+    if app.config.get('SESSION_TYPE') == 'database':
+        from app.utils.session_store import DatabaseSessionInterface
+        app.session_interface = DatabaseSessionInterface()
+    
+    # Dispatcher da outbox de notificações
+    from app.utils.outbox import init_outbox
+    init_outbox(app)
+    
+    # Buffer de autosave dos rascunhos de respostas
+    from app.utils.autosave import init_autosave
+    init_autosave(app)
+    
+    # Agendador de lembretes de prazo (líder eleito entre os workers)
+    from app.utils.scheduler import init_scheduler
+    init_scheduler(app)
+    
+    # Comandos de linha de comando (flask <comando>)
+    from app.commands import register_commands
+    register_commands(app)
+    
     # Definir origem permitida para o frontend no Render
     frontend_url = app.config.get("FRONTEND_URL", "https://ativflow-frontend.onrender.com")
     
@@ -43,10 +79,13 @@ def create_app(config_name='default'):
     # Criar diretório de uploads se não existir
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
+    tempos['extensoes'] = time.perf_counter() - marca
+    marca = time.perf_counter()
+    
     # Registrar blueprints (rotas)
     from app.routes import (
         auth, usuarios, atividades, entregas,
-        grupos, questoes, followups, notificacoes, relatorios
+        grupos, questoes, followups, notificacoes, relatorios, tarefas
     )
     
     app.register_blueprint(auth.bp)
@@ -58,35 +97,26 @@ def create_app(config_name='default'):
     app.register_blueprint(followups.bp)
     app.register_blueprint(notificacoes.bp)
     app.register_blueprint(relatorios.bp)
+    app.register_blueprint(tarefas.bp)
+    
+    tempos['blueprints'] = time.perf_counter() - marca
+    marca = time.perf_counter()
+    
+    # Bootstrap do banco (usuários de teste) uma vez por deploy; nos demais boots
+    # é só a conferência do marcador. O import também registra a tabela do
+    # marcador no metadata usado pelas migrações.
+    from app.bootstrap import bootstrap_database
+    if app.config.get('BOOTSTRAP_ON_START', True):
+        with app.app_context():
+            bootstrap_database(app)
+    
+    tempos['bootstrap_db'] = time.perf_counter() - marca
+    tempos['total'] = time.perf_counter() - inicio
+    app.extensions['startup_timings'] = tempos
+    
+    app.logger.info(
+        'Inicialização: extensões %.1f ms, blueprints %.1f ms, bootstrap do banco %.1f ms, total %.1f ms',
+        *(tempos[fase] * 1000 for fase in ('extensoes', 'blueprints', 'bootstrap_db', 'total'))
+    )
     
-    # Importar modelos e criar tabelas se necessário
-    with app.app_context():
-        from app import models
-        db.create_all()  # <-- Cria as tabelas automaticamente se não existirem
-
-        from app.models import Usuario
-
-        # --- Criação automática de usuários de teste ---
-        if not Usuario.query.filter_by(email="maria.santos@senac.edu.br").first():
-            prof = Usuario(
-                nome="Maria Santos",
-                email="maria.santos@senac.edu.br",
-                tipo="professor"
-            )
-            prof.set_password("Prof@123")
-            db.session.add(prof)
-
-        if not Usuario.query.filter_by(email="samuel.ribeiro@adm321530.com").first():
-            aluno = Usuario(
-                nome="Samuel Ribeiro",
-                email="samuel.ribeiro@adm321530.com",
-                tipo="aluno"
-            )
-            aluno.set_password("Aluno@123")
-            db.session.add(aluno)
-
-        db.session.commit()
-        print("Banco e usuários de teste verificados/criados com sucesso.")
-
     return app
-
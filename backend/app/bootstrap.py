@@ -0,0 +1,148 @@
+"""
+Bootstrap do banco executado uma vez por deploy.
+
+Cada worker apenas confere o marcador na tabela `app_bootstrap` (uma consulta).
+Quando o esquema dos modelos muda, o primeiro processo a subir obtém um lock
+(advisory lock no PostgreSQL, flock de arquivo nos demais bancos), garante os
+usuários de teste e grava o novo marcador. O esquema em si é criado e alterado
+apenas pelas migrações (`flask db upgrade`); sem as tabelas o bootstrap é pulado.
+"""
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+from datetime import datetime
+from sqlalchemy import Column, DateTime, String, inspect, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Incrementar quando os dados de bootstrap (usuários de teste) mudarem
+SEED_VERSION = 1
+
+# Chave do pg_advisory_lock (constante arbitrária do AtivFlow)
+_ADVISORY_LOCK_KEY = 731_530_001
+
+bootstrap_marker = db.Table(
+    'app_bootstrap',
+    Column('chave', String(50), primary_key=True),
+    Column('versao', String(64), nullable=False),
+    Column('executado_em', DateTime, nullable=False)
+)
+
+def schema_fingerprint():
+    """Hash do esquema declarado nos modelos + versão dos dados de bootstrap"""
+    partes = [f'seed={SEED_VERSION}']
+    for tabela in db.metadata.sorted_tables:
+        colunas = ','.join(f'{c.name}:{c.type}' for c in tabela.columns)
+        indices = ','.join(sorted(i.name or '' for i in tabela.indexes))
+        partes.append(f'{tabela.name}({colunas})[{indices}]')
+    return hashlib.sha256('|'.join(partes).encode('utf-8')).hexdigest()
+
+def _versao_registrada(conn):
+    """Versão gravada no marcador ou None se ainda não houver bootstrap"""
+    try:
+        versao = conn.execute(
+            select(bootstrap_marker.c.versao).where(bootstrap_marker.c.chave == 'schema')
+        ).scalar()
+    except SQLAlchemyError:
+        versao = None
+    # Não manter a transação de leitura aberta enquanto outros processos escrevem
+    conn.rollback()
+    return versao
+
+def _esquema_criado(conn):
+    """Indica se as migrações já criaram as tabelas usadas pelo bootstrap"""
+    inspetor = inspect(conn)
+    criado = inspetor.has_table(bootstrap_marker.name) and inspetor.has_table('usuarios')
+    conn.rollback()
+    return criado
+
+@contextlib.contextmanager
+def _bootstrap_lock(conn):
+    """Lock exclusivo entre processos enquanto o bootstrap roda"""
+    if conn.dialect.name == 'postgresql':
+        conn.execute(text('SELECT pg_advisory_lock(:k)'), {'k': _ADVISORY_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text('SELECT pg_advisory_unlock(:k)'), {'k': _ADVISORY_LOCK_KEY})
+        return
+
+    try:
+        import fcntl
+    except ImportError:  # Windows: sem lock entre processos
+        yield
+        return
+
+    caminho = os.path.join(tempfile.gettempdir(), 'ativflow-bootstrap.lock')
+    with open(caminho, 'w') as arquivo:
+        fcntl.flock(arquivo, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+def _criar_usuarios_teste():
+    """Garante os usuários de teste padrão"""
+    from app.models import Usuario
+
+    if not Usuario.query.filter_by(email="maria.santos@senac.edu.br").first():
+        prof = Usuario(
+            nome_completo="Maria Santos",
+            email="maria.santos@senac.edu.br",
+            tipo="professor"
+        )
+        prof.set_password("Prof@123")
+        db.session.add(prof)
+
+    if not Usuario.query.filter_by(email="samuel.ribeiro@adm321530.com").first():
+        aluno = Usuario(
+            nome_completo="Samuel Ribeiro",
+            email="samuel.ribeiro@adm321530.com",
+            tipo="aluno"
+        )
+        aluno.set_password("Aluno@123")
+        db.session.add(aluno)
+
+    db.session.commit()
+
+def bootstrap_database(app, force=False):
+    """
+    Executa o bootstrap se o marcador não corresponder ao esquema atual.
+    Retorna True se o bootstrap rodou, False se foi pulado.
+    """
+    from app import models  # noqa: F401 (registra os modelos no metadata)
+
+    versao = schema_fingerprint()
+
+    with db.engine.connect() as conn:
+        if not force and _versao_registrada(conn) == versao:
+            return False
+
+        if not _esquema_criado(conn):
+            logger.warning('Tabelas do banco ausentes; rode `flask db upgrade` (bootstrap ignorado)')
+            return False
+
+        with _bootstrap_lock(conn):
+            # Outro processo pode ter concluído enquanto aguardávamos o lock
+            if not force and _versao_registrada(conn) == versao:
+                return False
+
+            if app.config.get('SEED_TEST_USERS', True):
+                _criar_usuarios_teste()
+
+            marcador = {'versao': versao, 'executado_em': datetime.utcnow()}
+            atualizado = conn.execute(
+                bootstrap_marker.update()
+                .where(bootstrap_marker.c.chave == 'schema')
+                .values(**marcador)
+            ).rowcount
+            if not atualizado:
+                conn.execute(bootstrap_marker.insert().values(chave='schema', **marcador))
+            conn.commit()
+
+    logger.info('Bootstrap do banco concluído (versão %s)', versao[:12])
+    return True
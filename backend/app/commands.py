@@ -0,0 +1,166 @@
+"""
+Comandos de linha de comando da aplicação (flask <comando>)
+"""
+import click
+from flask.cli import with_appcontext
+
+@click.command('limpar-sessoes')
+@click.option('--lote', default=1000, show_default=True, help='Sessões removidas por transação')
+@with_appcontext
+def limpar_sessoes_command(lote):
+    """Remove sessões expiradas em lotes"""
+    from app.utils.session_store import limpar_sessoes_expiradas
+    
+    total = limpar_sessoes_expiradas(lote=lote)
+    click.echo(f'{total} sessões expiradas removidas')
+
+@click.command('limpar-idempotencia')
+@click.option('--lote', default=1000, show_default=True, help='Chaves removidas por transação')
+@with_appcontext
+def limpar_idempotencia_command(lote):
+    """Remove as chaves Idempotency-Key expiradas em lotes"""
+    from app.utils.idempotency import limpar_chaves_expiradas
+    
+    total = limpar_chaves_expiradas(lote=lote)
+    click.echo(f'{total} chaves de idempotência expiradas removidas')
+
+@click.command('limpar-outbox')
+@click.option('--lote', default=1000, show_default=True, help='Eventos removidos por transação')
+@with_appcontext
+def limpar_outbox_command(lote):
+    """Remove em lotes os eventos da outbox já concluídos"""
+    from app.utils.outbox import limpar_eventos_concluidos
+    
+    total = limpar_eventos_concluidos(lote=lote)
+    click.echo(f'{total} eventos concluídos removidos da outbox')
+
+@click.command('bootstrap')
+@click.option('--force', is_flag=True, help='Executa mesmo que o marcador esteja atualizado')
+@with_appcontext
+def bootstrap_command(force):
+    """Garante os usuários de teste (uma vez por deploy, após `flask db upgrade`)"""
+    from flask import current_app
+    from app.bootstrap import bootstrap_database
+    
+    if bootstrap_database(current_app, force=force):
+        click.echo('Bootstrap executado')
+    else:
+        click.echo('Banco já está atualizado; bootstrap ignorado')
+
+@click.command('respostas-duplicadas')
+@click.option('--manter', type=click.Choice(['primeira', 'melhor']),
+              help='Remove as excedentes mantendo o primeiro envio ou a maior pontuação (sem a opção, só lista)')
+@click.option('--backup', type=click.Path(dir_okay=False, writable=True),
+              help='Arquivo JSON onde as respostas removidas são gravadas (obrigatório com --manter)')
+@with_appcontext
+def respostas_duplicadas_command(manter, backup):
+    """Lista as respostas duplicadas por questão e aluno (pré-requisito do índice único)"""
+    from app.utils.duplicate_answers import (
+        escolher_mantidas, listar_respostas_duplicadas, remover_respostas_duplicadas
+    )
+    
+    if manter and not backup:
+        raise click.UsageError('--backup é obrigatório com --manter')
+    
+    grupos = listar_respostas_duplicadas()
+    if not grupos:
+        click.echo('Nenhuma resposta duplicada')
+        return
+    
+    mantidas = escolher_mantidas(grupos, manter) if manter else {}
+    for (questao_id, aluno_id), linhas in grupos.items():
+        click.echo(f'Questão {questao_id}, aluno {aluno_id}:')
+        for linha in linhas:
+            marca = '*' if mantidas.get((questao_id, aluno_id)) is linha else ' '
+            click.echo(f'  {marca} id={linha.id} data={linha.data_resposta} '
+                       f'pontos={linha.pontos_obtidos} resposta={linha.resposta}')
+    
+    if not manter:
+        click.echo(f'{len(grupos)} pares duplicados; para remover escolha o critério com '
+                   '--manter primeira|melhor --backup ARQUIVO')
+        return
+    
+    total = remover_respostas_duplicadas(grupos, manter, backup)
+    click.echo(f'{total} respostas removidas (mantidas as marcadas com *); backup em {backup}')
+
+@click.command('notificacoes-worker')
+@click.option('--intervalo', default=2.0, show_default=True, help='Segundos entre varreduras da outbox')
+@click.option('--lote', default=100, show_default=True, help='Eventos por varredura')
+@click.option('--uma-vez', is_flag=True, help='Processa os eventos pendentes e sai')
+@with_appcontext
+def notificacoes_worker_command(intervalo, lote, uma_vez):
+    """Processa a outbox de notificações (use com NOTIFICATION_DISPATCHER=external)"""
+    import time
+    from app import db
+    from app.utils.outbox import processar_outbox
+    
+    while True:
+        eventos, notificacoes = processar_outbox(lote=lote)
+        if eventos:
+            click.echo(f'{eventos} eventos processados, {notificacoes} notificações criadas')
+        if uma_vez and eventos < lote:
+            return
+        if eventos < lote:
+            db.session.remove()
+            time.sleep(intervalo)
+
+@click.command('recalcular-nao-lidas')
+@with_appcontext
+def recalcular_nao_lidas_command():
+    """Recalcula em lote os contadores de notificações não lidas"""
+    from app.utils.notifications import recalcular_contadores_nao_lidas
+    
+    total = recalcular_contadores_nao_lidas()
+    click.echo(f'{total} contadores de não lidas recalculados')
+
+@click.command('lembretes-prazo')
+@click.option('--loop', is_flag=True, help='Continua executando a cada DEADLINE_REMINDER_INTERVAL segundos')
+@with_appcontext
+def lembretes_prazo_command(loop):
+    """Envia os lembretes de prazo pendentes (cada um uma única vez)"""
+    import time
+    from flask import current_app
+    from app import db
+    from app.utils.scheduler import LeaderLock
+    
+    agendador = current_app.extensions['deadline_scheduler']
+    lider = LeaderLock(db.engine)
+    
+    while True:
+        if lider.tentar():
+            enviados = agendador.executar_uma_vez()
+            click.echo(f'{enviados} lembretes de prazo enviados')
+        else:
+            click.echo('Outro processo está enviando os lembretes; nada a fazer')
+        if not loop:
+            return
+        db.session.remove()
+        time.sleep(agendador.intervalo or 600)
+
+@click.command('limpar-notificacoes')
+@click.option('--dias', default=None, type=int, help='Idade mínima (padrão: NOTIFICATION_CLEANUP_DAYS)')
+@click.option('--lote', default=None, type=int, help='Notificações removidas por transação')
+@with_appcontext
+def limpar_notificacoes_command(dias, lote):
+    """Remove notificações antigas em lotes, informando o progresso"""
+    from flask import current_app
+    from app.utils.notifications import limpar_notificacoes_antigas
+    
+    total = limpar_notificacoes_antigas(
+        dias=dias or current_app.config.get('NOTIFICATION_CLEANUP_DAYS', 30),
+        lote=lote or current_app.config.get('NOTIFICATION_PURGE_BATCH', 1000),
+        reportar=lambda removidas: click.echo(f'{removidas} notificações removidas...')
+    )
+    click.echo(f'{total} notificações antigas removidas')
+
+def register_commands(app):
+    """Registra os comandos na CLI do Flask"""
+    app.cli.add_command(limpar_sessoes_command)
+    app.cli.add_command(bootstrap_command)
+    app.cli.add_command(respostas_duplicadas_command)
+    app.cli.add_command(notificacoes_worker_command)
+    app.cli.add_command(recalcular_nao_lidas_command)
+    app.cli.add_command(lembretes_prazo_command)
+    app.cli.add_command(limpar_notificacoes_command)
+    app.cli.add_command(limpar_idempotencia_command)
+    app.cli.add_command(limpar_outbox_command)
@@ -2,6 +2,7 @@
 Configurações do sistema AtivFlow
 """
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -13,14 +14,46 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///ativflow.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
-    # Sessão
-    SESSION_TYPE = 'filesystem'
+    # Sessão (server-side, tabela sessoes; ver app.utils.session_store)
+    SESSION_TYPE = 'database'
     SESSION_PERMANENT = True
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
+    SESSION_REFRESH_INTERVAL = timedelta(hours=1)  # Renovação mínima da expiração
+    SESSION_SWEEP_INTERVAL = int(os.environ.get('SESSION_SWEEP_INTERVAL', 600))  # segundos; 0 desativa
+    SESSION_SWEEP_BATCH = 1000
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Strict'
     SESSION_COOKIE_SECURE = os.environ.get('FLASK_ENV') == 'production'
     
+    # Cache de usuários autenticados (por worker); 0 desativa
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))  # segundos
+    
+    # Cache de respostas das rotas de leitura (atividade, questões); 0 desativa.
+    # RESPONSE_CACHE_SHARED_PATH: arquivo SQLite compartilhado pelos workers do host
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 512))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 30))  # segundos
+    RESPONSE_CACHE_SHARED_PATH = os.environ.get('RESPONSE_CACHE_SHARED_PATH')
+    
+    # Autosave dos rascunhos de respostas: buffer em memória por worker descarregado
+    # em lote a cada AUTOSAVE_FLUSH_INTERVAL segundos (0 grava a cada requisição)
+    AUTOSAVE_FLUSH_INTERVAL = float(os.environ.get('AUTOSAVE_FLUSH_INTERVAL', 2))
+    AUTOSAVE_MAX_PENDING = int(os.environ.get('AUTOSAVE_MAX_PENDING', 5000))
+    
+    # Idempotency-Key (reenvio de respostas): validade das chaves gravadas
+    IDEMPOTENCY_KEY_TTL = timedelta(hours=int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24)))
+    
+    # Hashing de senhas: hashes simultâneos por host (vagas compartilhadas pelos
+    # workers via flock em PASSWORD_HASH_LOCK_DIR); sem vaga livre em
+    # PASSWORD_HASH_WAIT segundos a requisição recebe 503 na hora.
+    # Alterar o número de iterações força rehash transparente no próximo login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_CONCURRENCY = int(os.environ.get('PASSWORD_HASH_CONCURRENCY', max((os.cpu_count() or 2) - 1, 1)))
+    PASSWORD_HASH_WAIT = float(os.environ.get('PASSWORD_HASH_WAIT', 0.2))
+    PASSWORD_HASH_LOCK_DIR = os.environ.get(
+        'PASSWORD_HASH_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'ativflow-password-hash')
+    )
+    
     # Upload de arquivos
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB
@@ -37,22 +70,73 @@ class Config:
     FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
     
     # Rate limiting
+    # Contadores compartilhados entre os workers do host via arquivo SQLite
     RATELIMIT_ENABLED = True
-    RATELIMIT_STORAGE_URL = 'memory://'
+    RATELIMIT_STORAGE_URI = os.environ.get(
+        'RATELIMIT_STORAGE_URI',
+        'sqlite:///' + os.path.join(tempfile.gettempdir(), 'ativflow-ratelimit.db')
+    )
+    
+    # Bootstrap do banco (usuários de teste) na subida dos workers; as tabelas vêm
+    # das migrações (`flask db upgrade`).
+    # Roda uma vez por versão de esquema; desativar se o deploy rodar `flask bootstrap`
+    BOOTSTRAP_ON_START = os.environ.get('BOOTSTRAP_ON_START', 'True').lower() == 'true'
+    SEED_TEST_USERS = os.environ.get('SEED_TEST_USERS', 'True').lower() == 'true'
     
     # Debug
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     
     # Timezone
     TIMEZONE = 'UTC'
     
     # Notificações - limpeza automática
     NOTIFICATION_CLEANUP_DAYS = 30
+    NOTIFICATION_PURGE_BATCH = 1000  # Linhas removidas por transação
+    
+    # Threads por worker para tarefas em background (limpezas, recálculos)
+    BACKGROUND_JOB_WORKERS = 2
+    
+    # Recorreção ao alterar o gabarito: até REGRADE_SYNC_LIMIT respostas roda na
+    # própria requisição; acima disso vira Tarefa em background
+    REGRADE_SYNC_LIMIT = int(os.environ.get('REGRADE_SYNC_LIMIT', 2000))
+    REGRADE_BATCH = 1000  # Respostas atualizadas por transação
+    
+    # Outbox de notificações: 'thread' (pool no próprio worker web) ou
+    # 'external' (apenas enfileira; processado por `flask notificacoes-worker`)
+    NOTIFICATION_DISPATCHER = os.environ.get('NOTIFICATION_DISPATCHER', 'thread')
+    NOTIFICATION_DISPATCH_WORKERS = int(os.environ.get('NOTIFICATION_DISPATCH_WORKERS', 2))
+    NOTIFICATION_DISPATCH_INTERVAL = float(os.environ.get('NOTIFICATION_DISPATCH_INTERVAL', 5))
+    NOTIFICATION_DISPATCH_BATCH = 100
+    # Eventos concluídos ficam na outbox por este período (`flask limpar-outbox`)
+    NOTIFICATION_OUTBOX_RETENTION = timedelta(days=int(os.environ.get('NOTIFICATION_OUTBOX_RETENTION_DAYS', 7)))
+    
+    # Lembretes de prazo: intervalo (segundos) do agendador em background
+    # (0 desativa; usar `flask lembretes-prazo` via cron) e janelas em horas
+    DEADLINE_REMINDER_INTERVAL = int(os.environ.get('DEADLINE_REMINDER_INTERVAL', 600))
+    DEADLINE_REMINDER_WINDOWS = tuple(
+        int(horas) for horas in os.environ.get('DEADLINE_REMINDER_WINDOWS', '48').split(',')
+    )
+    
+    # Stream de notificações (SSE): cada conexão prende uma thread do worker
+    # gthread por até SSE_MAX_DURATION (o cliente reconecta com Last-Event-ID).
+    # Teto por worker = GUNICORN_THREADS (mesma variável do gunicorn.conf.py)
+    # - SSE_RESERVED_THREADS, sempre livres para os demais endpoints;
+    # SSE_MAX_STREAMS só pode baixar esse teto. Acima dele a conexão recebe 503
+    # e o cliente volta ao polling do contador de não lidas
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 16))
+    SSE_RESERVED_THREADS = int(os.environ.get('SSE_RESERVED_THREADS', 8))
+    SSE_MAX_STREAMS = int(os.environ['SSE_MAX_STREAMS']) if os.environ.get('SSE_MAX_STREAMS') else None
+    SSE_HEARTBEAT_SECONDS = 20
+    SSE_MAX_DURATION = 900
+    SSE_RETRY_MS = 5000
+    SSE_SIGNAL_FILE = os.environ.get('SSE_SIGNAL_FILE')  # Padrão: arquivo no diretório temporário
 
 class DevelopmentConfig(Config):
     """Configuração de desenvolvimento"""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///ativflow.db')
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', 'memory://')
 
 class ProductionConfig(Config):
     """Configuração de produção"""
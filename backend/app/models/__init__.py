@@ -7,8 +7,14 @@ from app.models.grupo import Grupo, GrupoMembro
 from app.models.entrega import Entrega
 from app.models.questao import Questao, Resposta
 from app.models.followup import FollowUp
-from app.models.notificacao import Notificacao
+from app.models.notificacao import Notificacao, NotificacaoLeitura, NotificacaoMarcador
+from app.models.evento_notificacao import EventoNotificacao
 from app.models.avaliacao import Avaliacao
+from app.models.lembrete_prazo import LembretePrazo
+from app.models.sessao import Sessao
+from app.models.tarefa import Tarefa
+from app.models.resposta_idempotente import RespostaIdempotente
+from app.models.rascunho_resposta import RascunhoResposta
 
 __all__ = [
     'Usuario',
@@ -20,6 +26,14 @@ __all__ = [
     'Resposta',
     'FollowUp',
     'Notificacao',
-    'Avaliacao'
+    'NotificacaoLeitura',
+    'NotificacaoMarcador',
+    'EventoNotificacao',
+    'Avaliacao',
+    'LembretePrazo',
+    'Sessao',
+    'Tarefa',
+    'RespostaIdempotente',
+    'RascunhoResposta'
 ]
 
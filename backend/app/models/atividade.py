@@ -16,12 +16,20 @@ class Atividade(db.Model):
     titulo = db.Column(db.String(255), nullable=False)
     descricao = db.Column(db.Text)
     tipo = db.Column(db.String(30), nullable=False)  # individual, grupo, multipla_escolha
-    prazo = db.Column(db.DateTime, nullable=False)
+    prazo = db.Column(db.DateTime, nullable=False, index=True)
     criado_por = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False, index=True)
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
     config_json = db.Column(db.Text)  # JSON com configurações extras
     ativo = db.Column(db.Boolean, default=True)
     turma = db.Column(db.String(20))  # Turma alvo da atividade
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # Listagem do aluno: turma + ativo, ordenada por prazo
+        db.Index('ix_atividades_turma_ativo_prazo', 'turma', 'ativo', 'prazo'),
+        # ETag da listagem: count/max(atualizado_em) da turma lidos só do índice
+        db.Index('ix_atividades_turma_ativo_atualizado', 'turma', 'ativo', 'atualizado_em'),
+    )
     
     # Relacionamentos
     entregas = db.relationship('Entrega', backref='atividade', lazy='dynamic', cascade='all, delete-orphan')
@@ -53,7 +61,8 @@ class Atividade(db.Model):
             'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
             'config': self.get_config(),
             'ativo': self.ativo,
-            'turma': self.turma
+            'turma': self.turma,
+            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None
         }
     
     def __repr__(self):
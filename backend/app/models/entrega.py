@@ -28,6 +28,16 @@ class Entrega(db.Model):
     destino_grupo = db.Column(db.Boolean, default=False)  # Se é entrega para o líder
     encaminhado_para = db.Column(db.Integer, db.ForeignKey('usuarios.id'))  # ID do líder
     consolidada = db.Column(db.Boolean, default=False)  # Se foi consolidada pelo líder
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # Entregas do aluno, mais recentes primeiro
+        db.Index('ix_entregas_aluno_data_envio', 'aluno_id', 'data_envio'),
+        # ETag da listagem do aluno
+        db.Index('ix_entregas_aluno_atualizado', 'aluno_id', 'atualizado_em'),
+        # Entregas encaminhadas ao líder (consolidação)
+        db.Index('ix_entregas_destino_encaminhado', 'destino_grupo', 'encaminhado_para'),
+    )
     
     # Relacionamentos
     avaliacoes = db.relationship('Avaliacao', backref='entrega', lazy='dynamic', cascade='all, delete-orphan')
@@ -63,7 +73,8 @@ class Entrega(db.Model):
             'data_avaliacao': self.data_avaliacao.isoformat() if self.data_avaliacao else None,
             'destino_grupo': self.destino_grupo,
             'encaminhado_para': self.encaminhado_para,
-            'consolidada': self.consolidada
+            'consolidada': self.consolidada,
+            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None
         }
     
     def __repr__(self):
@@ -0,0 +1,39 @@
+"""
+Modelo de Evento de Notificação (outbox transacional)
+"""
+from datetime import datetime
+from app import db
+import json
+
+class EventoNotificacao(db.Model):
+    """
+    Evento de notificação pendente de expansão.
+    É gravado na mesma transação da operação que o originou e depois expandido
+    em linhas de Notificacao pelo dispatcher (ver app.utils.outbox).
+    Tipos: turma, usuarios, grupo
+    """
+    __tablename__ = 'notificacao_eventos'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(30), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON com destinatários e conteúdo
+    status = db.Column(db.String(20), default='pendente', nullable=False, index=True)  # pendente, processando, concluido, erro
+    tentativas = db.Column(db.Integer, default=0, nullable=False)
+    erro = db.Column(db.Text)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    bloqueado_em = db.Column(db.DateTime)  # Quando um dispatcher reivindicou o evento
+    processado_em = db.Column(db.DateTime)
+    
+    def get_payload(self):
+        """Retorna o payload como dicionário"""
+        try:
+            return json.loads(self.payload)
+        except:
+            return {}
+    
+    def set_payload(self, payload_dict):
+        """Define o payload a partir de dicionário"""
+        self.payload = json.dumps(payload_dict)
+    
+    def __repr__(self):
+        return f'<EventoNotificacao id={self.id} tipo={self.tipo} status={self.status}>'
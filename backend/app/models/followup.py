@@ -23,6 +23,11 @@ class FollowUp(db.Model):
     criado_em = db.Column(db.DateTime, default=datetime.utcnow)
     pode_editar = db.Column(db.Boolean, default=False)  # Professor pode liberar edição
     
+    __table_args__ = (
+        # Histórico do aluno por data e verificação de um follow-up por dia
+        db.Index('ix_followups_aluno_data', 'aluno_id', 'data'),
+    )
+    
     def to_dict(self):
         """Serializa o follow-up para JSON"""
         return {
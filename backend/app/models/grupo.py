@@ -2,6 +2,7 @@
 Modelo de Grupo
 """
 from datetime import datetime
+from sqlalchemy import event, update
 from app import db
 
 class Grupo(db.Model):
@@ -17,6 +18,12 @@ class Grupo(db.Model):
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(30), default='ativo')  # ativo, concluido
     observacoes = db.Column(db.Text)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Também tocado quando os membros mudam
+    
+    __table_args__ = (
+        # ETag da listagem por atividade
+        db.Index('ix_grupos_atividade_atualizado', 'atividade_id', 'atualizado_em'),
+    )
     
     # Relacionamentos
     membros = db.relationship('GrupoMembro', backref='grupo', lazy='dynamic', cascade='all, delete-orphan')
@@ -32,6 +39,7 @@ class Grupo(db.Model):
             'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
             'status': self.status,
             'observacoes': self.observacoes,
+            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None,
             'membros': [m.to_dict() for m in self.membros]
         }
     
@@ -70,3 +78,12 @@ class GrupoMembro(db.Model):
     def __repr__(self):
         return f'<GrupoMembro aluno_id={self.aluno_id} grupo_id={self.grupo_id}>'
 
+@event.listens_for(GrupoMembro, 'after_insert')
+@event.listens_for(GrupoMembro, 'after_update')
+@event.listens_for(GrupoMembro, 'after_delete')
+def _tocar_grupo(mapper, connection, membro):
+    """Os membros fazem parte do JSON do grupo: alterá-los muda o atualizado_em do grupo"""
+    grupos = Grupo.__table__
+    connection.execute(
+        update(grupos).where(grupos.c.id == membro.grupo_id).values(atualizado_em=datetime.utcnow())
+    )
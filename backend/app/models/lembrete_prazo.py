@@ -0,0 +1,21 @@
+"""
+Modelo de Lembrete de Prazo (registro de lembretes já enviados)
+"""
+from datetime import datetime
+from app import db
+
+class LembretePrazo(db.Model):
+    """
+    Registro dos lembretes de prazo enviados, um por (atividade, janela).
+    A chave primária garante que cada lembrete seja enviado uma única vez,
+    mesmo com execuções repetidas ou concorrentes do agendador.
+    Janela: antecedência do lembrete, ex.: '48h'
+    """
+    __tablename__ = 'lembretes_prazo'
+    
+    atividade_id = db.Column(db.Integer, db.ForeignKey('atividades.id', ondelete='CASCADE'), primary_key=True)
+    janela = db.Column(db.String(10), primary_key=True)
+    enviado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<LembretePrazo atividade_id={self.atividade_id} janela={self.janela}>'
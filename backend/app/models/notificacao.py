@@ -7,29 +7,89 @@ from app import db
 class Notificacao(db.Model):
     """
     Modelo de notificação para usuários.
+    O público é definido pelas colunas preenchidas, e cada aviso é gravado uma vez:
+    - usuario_id: notificação pessoal
+    - turma (usuario_id nulo): aviso para todos os alunos da turma
+    - ambos nulos: notificação global
+    A leitura de avisos compartilhados fica em NotificacaoLeitura/NotificacaoMarcador.
     """
     __tablename__ = 'notificacoes'
     
     id = db.Column(db.Integer, primary_key=True)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), index=True)  # Null para notificações globais
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), index=True)  # Null para notificações de turma/globais
+    turma = db.Column(db.String(50), index=True)  # Preenchida apenas em avisos de turma
     titulo = db.Column(db.String(255), nullable=False)
     mensagem = db.Column(db.Text, nullable=False)
     tipo = db.Column(db.String(30), default='info')  # info, alert, prazo
-    lida = db.Column(db.Boolean, default=False)
+    lida = db.Column(db.Boolean, default=False)  # Usado só nas notificações pessoais
     data_envio = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
-    def to_dict(self):
-        """Serializa a notificação para JSON"""
+    __table_args__ = (
+        # Notificações pessoais do usuário (filtro por lida), mais recentes primeiro
+        db.Index('ix_notificacoes_usuario_lida_data', 'usuario_id', 'lida', 'data_envio'),
+        # Parcial: apenas avisos compartilhados (turma/global) entram no índice
+        db.Index(
+            'ix_notificacoes_compartilhadas', 'turma', 'data_envio',
+            sqlite_where=db.text('usuario_id IS NULL'),
+            postgresql_where=db.text('usuario_id IS NULL')
+        ),
+    )
+    
+    @property
+    def publico(self):
+        """Público da notificação: usuario, turma ou global"""
+        if self.usuario_id:
+            return 'usuario'
+        return 'turma' if self.turma else 'global'
+    
+    def to_dict(self, lida=None):
+        """
+        Serializa a notificação para JSON.
+        `lida` permite informar o estado de leitura do usuário atual (avisos compartilhados).
+        """
         return {
             'id': self.id,
             'usuario_id': self.usuario_id,
+            'turma': self.turma,
+            'publico': self.publico,
             'titulo': self.titulo,
             'mensagem': self.mensagem,
             'tipo': self.tipo,
-            'lida': self.lida,
+            'lida': self.lida if lida is None else bool(lida),
             'data_envio': self.data_envio.isoformat() if self.data_envio else None
         }
     
     def __repr__(self):
         return f'<Notificacao id={self.id} usuario_id={self.usuario_id}>'
 
+
+class NotificacaoLeitura(db.Model):
+    """
+    Recibo de leitura de um aviso compartilhado (turma/global) por um usuário.
+    Só existe para avisos acima do marcador do usuário; "marcar todas" compacta os recibos.
+    """
+    __tablename__ = 'notificacao_leituras'
+    
+    notificacao_id = db.Column(db.Integer, db.ForeignKey('notificacoes.id', ondelete='CASCADE'), primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), primary_key=True)
+    lida_em = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<NotificacaoLeitura notificacao_id={self.notificacao_id} usuario_id={self.usuario_id}>'
+
+
+class NotificacaoMarcador(db.Model):
+    """
+    Estado de leitura por usuário, lido por chave primária:
+    - lidas_ate_id: marca d'água (toda notificação com id <= lidas_ate_id está lida)
+    - nao_lidas: contador materializado de não lidas (NULL = recalcular na próxima leitura)
+    """
+    __tablename__ = 'notificacao_marcadores'
+    
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), primary_key=True)
+    lidas_ate_id = db.Column(db.Integer, default=0, nullable=False)
+    nao_lidas = db.Column(db.Integer)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<NotificacaoMarcador usuario_id={self.usuario_id} nao_lidas={self.nao_lidas}>'
@@ -5,6 +5,16 @@ from datetime import datetime
 from app import db
 import json
 
+def normalizar_resposta(resposta):
+    """
+    JSON canônico de uma resposta: alternativas de questões `multiple` sem
+    repetição e ordenadas, para que respostas equivalentes sejam agrupadas juntas.
+    """
+    if isinstance(resposta, (list, tuple)):
+        itens = {json.dumps(item, sort_keys=True) for item in resposta}
+        return '[' + ', '.join(sorted(itens)) + ']'
+    return json.dumps(resposta, sort_keys=True)
+
 class Questao(db.Model):
     """
     Modelo de questão para atividades de múltipla escolha.
@@ -19,6 +29,12 @@ class Questao(db.Model):
     resposta_correta = db.Column(db.Text)  # JSON com resposta(s) correta(s)
     pontuacao = db.Column(db.Numeric(5, 2), default=1.0)
     ordem = db.Column(db.Integer, default=0)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # ETag da listagem por atividade
+        db.Index('ix_questoes_atividade_atualizado', 'atividade_id', 'atualizado_em'),
+    )
     
     # Relacionamentos
     respostas = db.relationship('Resposta', backref='questao', lazy='dynamic', cascade='all, delete-orphan')
@@ -58,7 +74,8 @@ class Questao(db.Model):
             'tipo': self.tipo,
             'alternativas': self.get_alternativas(),
             'pontuacao': float(self.pontuacao) if self.pontuacao else 1.0,
-            'ordem': self.ordem
+            'ordem': self.ordem,
+            'atualizado_em': self.atualizado_em.isoformat() if self.atualizado_em else None
         }
         if include_resposta:
             data['resposta_correta'] = self.get_resposta_correta()
@@ -79,10 +96,19 @@ class Resposta(db.Model):
     aluno_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False, index=True)
     atividade_id = db.Column(db.Integer, db.ForeignKey('atividades.id'), nullable=False, index=True)
     resposta = db.Column(db.Text)  # JSON com resposta(s) do aluno
+    resposta_normalizada = db.Column(db.Text)  # JSON canônico (alternativas ordenadas) para agregações
     correta = db.Column(db.Boolean)
     pontos_obtidos = db.Column(db.Numeric(5, 2))
     data_resposta = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # Uma resposta por aluno e questão: envios repetidos ou concorrentes
+        # são descartados pelo INSERT ... ON CONFLICT (ver app.utils.grading).
+        # Em bancos antigos a migração do índice recusa enquanto houver duplicatas
+        # (revisadas com `flask respostas-duplicadas`).
+        db.Index('uq_respostas_questao_aluno', 'questao_id', 'aluno_id', unique=True),
+    )
+    
     # Relacionamento com aluno
     aluno = db.relationship('Usuario', backref='respostas', foreign_keys=[aluno_id])
     
@@ -98,6 +124,7 @@ class Resposta(db.Model):
     def set_resposta(self, resposta_obj):
         """Define resposta a partir de objeto Python"""
         self.resposta = json.dumps(resposta_obj)
+        self.resposta_normalizada = normalizar_resposta(resposta_obj)
     
     def to_dict(self):
         """Serializa a resposta para JSON"""
@@ -0,0 +1,28 @@
+"""
+Modelo de Rascunho de Resposta (autosave das atividades de múltipla escolha)
+"""
+from datetime import datetime
+from app import db
+
+class RascunhoResposta(db.Model):
+    """
+    Resposta em andamento de um aluno, ainda não enviada: uma linha por
+    (aluno, questão), sobrescrita a cada gravação (vale a mais recente).
+    As gravações chegam em lote pelo buffer de autosave (ver app.utils.autosave)
+    e o envio final consome e remove os rascunhos da atividade.
+    """
+    __tablename__ = 'rascunhos_respostas'
+
+    aluno_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), primary_key=True)
+    questao_id = db.Column(db.Integer, db.ForeignKey('questoes.id', ondelete='CASCADE'), primary_key=True)
+    atividade_id = db.Column(db.Integer, db.ForeignKey('atividades.id', ondelete='CASCADE'), nullable=False)
+    resposta = db.Column(db.Text)  # JSON com resposta(s) do aluno
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Rascunhos do aluno na atividade (leitura e envio final)
+        db.Index('ix_rascunhos_aluno_atividade', 'aluno_id', 'atividade_id'),
+    )
+
+    def __repr__(self):
+        return f'<RascunhoResposta aluno_id={self.aluno_id} questao_id={self.questao_id}>'
@@ -0,0 +1,24 @@
+"""
+Modelo de Resposta Idempotente (resultado de requisições com Idempotency-Key)
+"""
+from datetime import datetime
+from app import db
+
+class RespostaIdempotente(db.Model):
+    """
+    Resultado gravado de uma requisição enviada com o cabeçalho Idempotency-Key.
+    A chave primária (usuário, chave) garante um único resultado por chave,
+    mesmo com reenvios concorrentes; o reenvio recebe o resultado gravado.
+    Escopo: requisição à qual a chave pertence, ex.: 'responder:42'
+    """
+    __tablename__ = 'respostas_idempotentes'
+
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id', ondelete='CASCADE'), primary_key=True)
+    chave = db.Column(db.String(128), primary_key=True)
+    escopo = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.Integer, nullable=False)
+    corpo = db.Column(db.Text, nullable=False)  # JSON da resposta original
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<RespostaIdempotente usuario_id={self.usuario_id} escopo={self.escopo}>'
@@ -0,0 +1,21 @@
+"""
+Modelo de Sessão (armazenamento server-side)
+"""
+from datetime import datetime
+from app import db
+
+class Sessao(db.Model):
+    """
+    Sessão HTTP armazenada no servidor.
+    O cookie guarda apenas o identificador assinado; os dados ficam em
+    `dados` numa codificação binária compacta (ver app.utils.session_store).
+    """
+    __tablename__ = 'sessoes'
+    
+    id = db.Column(db.String(64), primary_key=True)
+    dados = db.Column(db.LargeBinary, nullable=False)
+    expira_em = db.Column(db.DateTime, nullable=False, index=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Sessao expira_em={self.expira_em}>'
@@ -0,0 +1,54 @@
+"""
+Modelo de Tarefa em background
+"""
+from datetime import datetime
+from app import db
+import json
+
+class Tarefa(db.Model):
+    """
+    Tarefa longa executada fora da requisição HTTP (ver app.utils.jobs).
+    O progresso fica no banco para ser consultado de qualquer worker.
+    Status: pendente, executando, concluida, erro
+    """
+    __tablename__ = 'tarefas'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)  # ex.: limpar_notificacoes
+    status = db.Column(db.String(20), default='pendente', nullable=False, index=True)
+    progresso = db.Column(db.Integer, default=0, nullable=False)
+    total = db.Column(db.Integer)  # Null quando o total não é conhecido de antemão
+    resultado_json = db.Column(db.Text)
+    erro = db.Column(db.Text)
+    criado_por = db.Column(db.Integer, db.ForeignKey('usuarios.id'))
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    iniciado_em = db.Column(db.DateTime)
+    concluido_em = db.Column(db.DateTime)
+    
+    def get_resultado(self):
+        """Retorna o resultado como dicionário"""
+        if self.resultado_json:
+            try:
+                return json.loads(self.resultado_json)
+            except:
+                return None
+        return None
+    
+    def to_dict(self):
+        """Serializa a tarefa para JSON"""
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'status': self.status,
+            'progresso': self.progresso,
+            'total': self.total,
+            'resultado': self.get_resultado(),
+            'erro': self.erro,
+            'criado_por': self.criado_por,
+            'criado_em': self.criado_em.isoformat() if self.criado_em else None,
+            'iniciado_em': self.iniciado_em.isoformat() if self.iniciado_em else None,
+            'concluido_em': self.concluido_em.isoformat() if self.concluido_em else None
+        }
+    
+    def __repr__(self):
+        return f'<Tarefa id={self.id} tipo={self.tipo} status={self.status}>'
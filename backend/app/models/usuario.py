@@ -2,7 +2,7 @@
 Modelo de Usuário
 """
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from app import db
 
 class Usuario(db.Model):
@@ -24,6 +24,11 @@ class Usuario(db.Model):
     atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     ultimo_login = db.Column(db.DateTime)
     
+    __table_args__ = (
+        # Listagem de alunos por turma/status e alunos de uma turma
+        db.Index('ix_usuarios_tipo_turma_status', 'tipo', 'turma', 'status'),
+    )
+    
     # Relacionamentos
     atividades_criadas = db.relationship('Atividade', backref='criador', lazy='dynamic', foreign_keys='Atividade.criado_por')
     entregas = db.relationship('Entrega', backref='aluno', lazy='dynamic', foreign_keys='Entrega.aluno_id')
@@ -33,8 +38,9 @@ class Usuario(db.Model):
     notificacoes = db.relationship('Notificacao', backref='usuario', lazy='dynamic', foreign_keys='Notificacao.usuario_id')
     
     def set_password(self, password):
-        """Define a senha com hash bcrypt (work factor 12)"""
-        self.senha_hash = generate_password_hash(password, method='pbkdf2:sha256')
+        """Define a senha com hash pbkdf2 (método configurado em PASSWORD_HASH_METHOD)"""
+        from app.utils.password_hashing import gerar_hash
+        self.senha_hash = gerar_hash(password)
     
     def check_password(self, password):
         """Verifica se a senha está correta"""
@@ -0,0 +1,46 @@
+"""
+Backends de exportação de relatórios (XLSX, PDF)
+
+Cada formato é registrado pelo caminho do módulo e só é importado no primeiro
+uso, para que WeasyPrint/openpyxl não pesem na inicialização dos workers.
+"""
+import importlib
+import threading
+
+# formato -> 'modulo:Classe'
+_BACKENDS = {
+    'xlsx': 'app.reports.xlsx:XlsxBackend',
+    'pdf': 'app.reports.pdf:PdfBackend',
+}
+
+_instancias = {}
+_lock = threading.Lock()
+
+def registrar_backend(formato, caminho):
+    """Registra (ou substitui) o backend de um formato: 'pacote.modulo:Classe'"""
+    with _lock:
+        _BACKENDS[formato] = caminho
+        _instancias.pop(formato, None)
+
+def formatos_disponiveis():
+    """Formatos de exportação registrados"""
+    return sorted(_BACKENDS)
+
+def get_backend(formato):
+    """
+    Retorna a instância do backend do formato, importando o módulo na
+    primeira chamada. Retorna None para formatos desconhecidos.
+    """
+    backend = _instancias.get(formato)
+    if backend is not None:
+        return backend
+
+    caminho = _BACKENDS.get(formato)
+    if caminho is None:
+        return None
+
+    with _lock:
+        if formato not in _instancias:
+            modulo, classe = caminho.split(':')
+            _instancias[formato] = getattr(importlib.import_module(modulo), classe)()
+        return _instancias[formato]
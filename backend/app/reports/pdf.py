@@ -0,0 +1,81 @@
+"""
+Backend de exportação PDF (WeasyPrint)
+"""
+from weasyprint import HTML
+
+class PdfBackend:
+    """Gera o relatório de desempenho em PDF a partir de HTML"""
+    
+    extensao = 'pdf'
+    mimetype = 'application/pdf'
+    
+    def render_desempenho(self, dados):
+        """Retorna os bytes do PDF do relatório de desempenho"""
+        estatisticas_gerais = dados['estatisticas_gerais']
+        turma = dados['turma']
+        data_ini = dados['data_ini']
+        data_fim = dados['data_fim']
+        
+        html_content = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 20px; }}
+                h1 {{ color: #003366; }}
+                h2 {{ color: #0066cc; margin-top: 30px; }}
+                table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
+                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+                th {{ background-color: #003366; color: white; }}
+                .stats {{ background-color: #f0f0f0; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
+            </style>
+        </head>
+        <body>
+            <h1>Relatório de Desempenho - AtivFlow</h1>
+            <p><strong>Turma:</strong> {turma or 'Todas'}</p>
+            <p><strong>Período:</strong> {data_ini or 'Início'} a {data_fim or 'Fim'}</p>
+            
+            <div class="stats">
+                <h2>Estatísticas Gerais</h2>
+                <p><strong>Total de Alunos:</strong> {estatisticas_gerais['total_alunos']}</p>
+                <p><strong>Total de Atividades:</strong> {estatisticas_gerais['total_atividades']}</p>
+                <p><strong>Nota Média da Turma:</strong> {estatisticas_gerais['nota_media_turma']}</p>
+                <p><strong>Taxa de Entrega Média:</strong> {estatisticas_gerais['taxa_entrega_media']}%</p>
+            </div>
+            
+            <h2>Ranking de Alunos</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Posição</th>
+                        <th>Nome</th>
+                        <th>Email</th>
+                        <th>Total Entregas</th>
+                        <th>Nota Média</th>
+                        <th>Taxa de Entrega (%)</th>
+                    </tr>
+                </thead>
+                <tbody>
+        """
+        
+        for idx, aluno in enumerate(dados['ranking'], 1):
+            html_content += f"""
+                    <tr>
+                        <td>{idx}</td>
+                        <td>{aluno['nome']}</td>
+                        <td>{aluno['email']}</td>
+                        <td>{aluno['total_entregas']}</td>
+                        <td>{aluno['nota_media']}</td>
+                        <td>{aluno['taxa_entrega']}</td>
+                    </tr>
+            """
+        
+        html_content += """
+                </tbody>
+            </table>
+        </body>
+        </html>
+        """
+        
+        return HTML(string=html_content).write_pdf()
@@ -0,0 +1,70 @@
+"""
+Backend de exportação XLSX (openpyxl)
+"""
+from io import BytesIO
+import openpyxl
+from openpyxl.styles import Font, Alignment
+
+class XlsxBackend:
+    """Gera o relatório de desempenho em planilha XLSX"""
+    
+    extensao = 'xlsx'
+    mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    
+    def render_desempenho(self, dados):
+        """Retorna os bytes da planilha do relatório de desempenho"""
+        estatisticas_gerais = dados['estatisticas_gerais']
+        turma = dados['turma']
+        data_ini = dados['data_ini']
+        data_fim = dados['data_fim']
+        
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Relatório de Desempenho"
+        
+        # Cabeçalho
+        ws.append(['Relatório de Desempenho - AtivFlow'])
+        ws.append([f'Turma: {turma or "Todas"}'])
+        ws.append([f'Período: {data_ini or "Início"} a {data_fim or "Fim"}'])
+        ws.append([])
+        
+        # Estatísticas gerais
+        ws.append(['Estatísticas Gerais'])
+        ws.append(['Total de Alunos', estatisticas_gerais['total_alunos']])
+        ws.append(['Total de Atividades', estatisticas_gerais['total_atividades']])
+        ws.append(['Nota Média da Turma', estatisticas_gerais['nota_media_turma']])
+        ws.append(['Taxa de Entrega Média', f"{estatisticas_gerais['taxa_entrega_media']}%"])
+        ws.append([])
+        
+        # Ranking
+        ws.append(['Ranking de Alunos'])
+        ws.append(['Posição', 'Nome', 'Email', 'Total Entregas', 'Nota Média', 'Taxa de Entrega (%)'])
+        
+        for idx, aluno in enumerate(dados['ranking'], 1):
+            ws.append([
+                idx,
+                aluno['nome'],
+                aluno['email'],
+                aluno['total_entregas'],
+                aluno['nota_media'],
+                aluno['taxa_entrega']
+            ])
+        
+        # Estilizar cabeçalhos
+        for cell in ws[1]:
+            cell.font = Font(bold=True, size=14)
+        
+        for cell in ws[5]:
+            cell.font = Font(bold=True)
+        
+        for cell in ws[11]:
+            cell.font = Font(bold=True)
+        
+        for cell in ws[12]:
+            cell.font = Font(bold=True)
+            cell.alignment = Alignment(horizontal='center')
+        
+        # Salvar em memória
+        output = BytesIO()
+        wb.save(output)
+        return output.getvalue()
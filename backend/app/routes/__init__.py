@@ -1,7 +1,7 @@
 """
 Importação de todas as rotas
 """
-from app.routes import auth, usuarios, atividades, entregas, grupos, questoes, followups, notificacoes, relatorios
+from app.routes import auth, usuarios, atividades, entregas, grupos, questoes, followups, notificacoes, relatorios, tarefas
 
 __all__ = [
     'auth',
@@ -12,6 +12,7 @@ __all__ = [
     'questoes',
     'followups',
     'notificacoes',
-    'relatorios'
+    'relatorios',
+    'tarefas'
 ]
 
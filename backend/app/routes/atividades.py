@@ -6,11 +6,19 @@ from datetime import datetime
 from app import db
 from app.models.atividade import Atividade
 from app.models.usuario import Usuario
-from app.utils.auth import professor_required, login_required, get_current_user
+from app.utils.auth import professor_required, login_required, admin_required, get_current_user
+from app.utils.conditional import lista_condicional
+from app.utils.pagination import paginar
+from app.utils.response_cache import cache_resposta, get_response_cache, invalidar_cache
+from app.utils.row_serializers import serializar_atividade, plano_da_requisicao
 from app.utils.notifications import notificar_nova_atividade
 
 bp = Blueprint('atividades', __name__, url_prefix='/api/atividades')
 
+def _variante_atividade(usuario):
+    # Aluno só vê atividades da sua turma: a turma separa as entradas do cache
+    return f'aluno:{usuario.turma}' if usuario.tipo == 'aluno' else 'equipe'
+
 @bp.route('/', methods=['GET'])
 @login_required
 def listar_atividades():
@@ -21,9 +29,6 @@ def listar_atividades():
     turma = request.args.get('turma')
     ativo = request.args.get('ativo', 'true').lower() == 'true'
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
     query = Atividade.query
     
     # Filtrar por turma do aluno se for aluno
@@ -37,22 +42,23 @@ def listar_atividades():
     
     query = query.filter_by(ativo=ativo)
     
-    # Ordenar por prazo
-    query = query.order_by(Atividade.prazo.asc())
+    # Ordenar por prazo (página ou cursor), lendo só as colunas do JSON (?fields=, ?include=)
+    plano = plano_da_requisicao(serializar_atividade, garantir=[Atividade.prazo, Atividade.id])
     
-    atividades_paginadas = query.paginate(page=page, per_page=per_page, error_out=False)
+    def resposta():
+        atividades, paginacao = paginar(plano.consulta(query), [(Atividade.prazo, 'asc')], Atividade.id)
+        return jsonify({
+            'ok': True,
+            'atividades': plano.serializar(atividades),
+            **paginacao
+        }), 200
     
-    return jsonify({
-        'ok': True,
-        'atividades': [atividade.to_dict() for atividade in atividades_paginadas.items],
-        'total': atividades_paginadas.total,
-        'page': page,
-        'per_page': per_page,
-        'pages': atividades_paginadas.pages
-    }), 200
+    # Sem alterações desde a última consulta do cliente: 304 sem montar a página
+    return lista_condicional(query, Atividade.atualizado_em, resposta, plano)
 
 @bp.route('/<int:atividade_id>', methods=['GET'])
 @login_required
+@cache_resposta('atividade:{atividade_id}', variante=_variante_atividade)
 def obter_atividade(atividade_id):
     """Obtém detalhes de uma atividade específica"""
     atividade = Atividade.query.get(atividade_id)
@@ -65,6 +71,7 @@ def obter_atividade(atividade_id):
     if usuario.tipo == 'aluno' and atividade.turma != usuario.turma:
         return jsonify({'ok': False, 'error': 'Acesso negado'}), 403
     
+    # ETag pelo conteúdo vem de cache_resposta (mesmo validador no HIT e no MISS)
     return jsonify({
         'ok': True,
         'atividade': atividade.to_dict()
@@ -112,12 +119,13 @@ def criar_atividade():
         atividade.set_config(data['config_json'])
     
     db.session.add(atividade)
-    db.session.commit()
     
-    # Notificar alunos
+    # Notificar alunos (evento gravado na mesma transação da atividade)
     if atividade.turma:
         notificar_nova_atividade(atividade)
     
+    db.session.commit()
+    
     return jsonify({
         'ok': True,
         'atividade': atividade.to_dict(),
@@ -156,6 +164,7 @@ def atualizar_atividade(atividade_id):
     if 'config_json' in data:
         atividade.set_config(data['config_json'])
     
+    invalidar_cache(f'atividade:{atividade_id}')
     db.session.commit()
     
     return jsonify({
@@ -177,6 +186,7 @@ def deletar_atividade(atividade_id):
         return jsonify({'ok': False, 'error': 'Atividade não encontrada'}), 404
     
     atividade.ativo = False
+    invalidar_cache(f'atividade:{atividade_id}')
     db.session.commit()
     
     return jsonify({
@@ -184,3 +194,11 @@ def deletar_atividade(atividade_id):
         'message': 'Atividade inativada com sucesso'
     }), 200
 
+@bp.route('/cache/stats', methods=['GET'])
+@admin_required
+def cache_stats():
+    """Métricas do cache de respostas deste worker"""
+    return jsonify({
+        'ok': True,
+        'cache': get_response_cache().stats()
+    }), 200
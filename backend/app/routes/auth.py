@@ -5,12 +5,17 @@ from flask import Blueprint, request, jsonify, session
 from datetime import datetime
 from app import db, limiter
 from app.models.usuario import Usuario
-from app.utils.auth import login_required, get_current_user
+from app.utils.auth import login_required, admin_required, get_current_user
+from app.utils.ratelimit import chave_login
+from app.utils.password_hashing import (
+    HashingPoolBusy, get_hashing_pool, hash_senha, verificar_senha, precisa_rehash
+)
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 @bp.route('/login', methods=['POST'])
-@limiter.limit("5 per 10 minutes")  # Rate limiting: 5 tentativas por 10 minutos
+@limiter.limit("5 per 10 minutes", key_func=chave_login)  # Rate limiting: 5 tentativas por conta/IP a cada 10 minutos
+@limiter.limit("200 per 10 minutes")  # Teto por IP (turmas inteiras atrás do mesmo NAT)
 def login():
     """
     Endpoint de login com sessão por cookie HTTPOnly.
@@ -27,18 +32,34 @@ def login():
     # Buscar usuário
     usuario = Usuario.query.filter_by(email=data['email']).first()
     
-    if not usuario or not usuario.check_password(data['senha']):
+    # Verificação da senha numa vaga de hashing do host (503 se todas ocupadas)
+    try:
+        senha_ok = usuario is not None and verificar_senha(usuario.senha_hash, data['senha'])
+    except HashingPoolBusy:
+        return jsonify({'ok': False, 'error': 'Servidor ocupado, tente novamente'}), 503
+    
+    if not senha_ok:
         return jsonify({'ok': False, 'error': 'Credenciais inválidas'}), 401
     
     # Verificar se usuário está ativo
     if usuario.status != 'ativo':
         return jsonify({'ok': False, 'error': 'Usuário inativo'}), 403
     
-    # Criar sessão
+    # Criar sessão com identificador novo (o anterior ao login não é reaproveitado)
+    session.clear()
+    if hasattr(session, 'regenerar'):
+        session.regenerar()
     session['user_id'] = usuario.id
     session['user_tipo'] = usuario.tipo
     session.permanent = True
     
+    # Rehash transparente quando o método/iterações configurados mudaram
+    if precisa_rehash(usuario.senha_hash):
+        try:
+            usuario.senha_hash = hash_senha(data['senha'])
+        except HashingPoolBusy:
+            pass  # Tenta novamente no próximo login
+    
     # Atualizar último login
     usuario.ultimo_login = datetime.utcnow()
     db.session.commit()
@@ -86,3 +107,11 @@ def check():
         'authenticated': False
     }), 200
 
+@bp.route('/hashing/stats', methods=['GET'])
+@admin_required
+def hashing_stats():
+    """Métricas das vagas de hashing de senhas (contadores deste worker)"""
+    return jsonify({
+        'ok': True,
+        'stats': get_hashing_pool().stats()
+    }), 200
@@ -9,6 +9,9 @@ from app.models.atividade import Atividade
 from app.models.grupo import Grupo
 from app.models.avaliacao import Avaliacao
 from app.utils.auth import professor_required, login_required, get_current_user
+from app.utils.conditional import detalhe_condicional, lista_condicional
+from app.utils.pagination import paginar
+from app.utils.row_serializers import serializar_entrega, plano_da_requisicao
 from app.utils.file_upload import save_multiple_files
 from app.utils.notifications import notificar_entrega_recebida, notificar_avaliacao_concluida
 
@@ -24,9 +27,6 @@ def listar_entregas():
     aluno_id = request.args.get('aluno_id', type=int)
     status = request.args.get('status')
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
     query = Entrega.query
     
     # Se for aluno, só pode ver suas próprias entregas
@@ -41,19 +41,19 @@ def listar_entregas():
     if status:
         query = query.filter_by(status=status)
     
-    # Ordenar por data de envio
-    query = query.order_by(Entrega.data_envio.desc())
+    # Ordenar por data de envio (página ou cursor), lendo só as colunas do JSON (?fields=, ?include=)
+    plano = plano_da_requisicao(serializar_entrega, garantir=[Entrega.data_envio, Entrega.id])
     
-    entregas_paginadas = query.paginate(page=page, per_page=per_page, error_out=False)
+    def resposta():
+        entregas, paginacao = paginar(plano.consulta(query), [(Entrega.data_envio, 'desc')], Entrega.id)
+        return jsonify({
+            'ok': True,
+            'entregas': plano.serializar(entregas),
+            **paginacao
+        }), 200
     
-    return jsonify({
-        'ok': True,
-        'entregas': [entrega.to_dict() for entrega in entregas_paginadas.items],
-        'total': entregas_paginadas.total,
-        'page': page,
-        'per_page': per_page,
-        'pages': entregas_paginadas.pages
-    }), 200
+    # Sem alterações desde a última consulta do cliente: 304 sem montar a página
+    return lista_condicional(query, Entrega.atualizado_em, resposta, plano)
 
 @bp.route('/<int:entrega_id>', methods=['GET'])
 @login_required
@@ -69,10 +69,10 @@ def obter_entrega(entrega_id):
     if usuario.tipo == 'aluno' and entrega.aluno_id != usuario.id:
         return jsonify({'ok': False, 'error': 'Acesso negado'}), 403
     
-    return jsonify({
+    return detalhe_condicional(entrega, lambda: (jsonify({
         'ok': True,
         'entrega': entrega.to_dict()
-    }), 200
+    }), 200))
 
 @bp.route('/upload', methods=['POST'])
 @login_required
@@ -126,9 +126,9 @@ def criar_entrega():
     entrega.set_arquivos(arquivo_urls)
     
     db.session.add(entrega)
-    db.session.commit()
+    db.session.flush()
     
-    # Notificar professor ou líder
+    # Notificar professor ou líder (evento gravado na mesma transação da entrega)
     if destino_grupo and encaminhado_para:
         # Notificar líder (implementar se necessário)
         pass
@@ -136,6 +136,8 @@ def criar_entrega():
         # Notificar professor
         notificar_entrega_recebida(entrega, atividade.criado_por)
     
+    db.session.commit()
+    
     return jsonify({
         'ok': True,
         'entrega': entrega.to_dict(),
@@ -196,11 +198,12 @@ def avaliar_entrega(entrega_id):
     )
     
     db.session.add(avaliacao)
-    db.session.commit()
     
-    # Notificar aluno
+    # Notificar aluno (evento gravado na mesma transação da avaliação)
     notificar_avaliacao_concluida(entrega)
     
+    db.session.commit()
+    
     return jsonify({
         'ok': True,
         'entrega': entrega.to_dict(),
@@ -276,11 +279,13 @@ def consolidar_entrega_grupo(grupo_id):
     entrega_grupo.set_arquivos(todos_arquivos)
     
     db.session.add(entrega_grupo)
-    db.session.commit()
+    db.session.flush()
     
-    # Notificar professor
+    # Notificar professor (evento gravado na mesma transação da entrega)
     notificar_entrega_recebida(entrega_grupo, grupo.atividade.criado_por)
     
+    db.session.commit()
+    
     return jsonify({
         'ok': True,
         'entrega': entrega_grupo.to_dict(),
@@ -6,6 +6,7 @@ from datetime import datetime, date
 from app import db
 from app.models.followup import FollowUp
 from app.utils.auth import professor_required, login_required, get_current_user
+from app.utils.pagination import paginar
 
 bp = Blueprint('followups', __name__, url_prefix='/api/followups')
 
@@ -20,20 +21,16 @@ def meus_followups():
     if usuario.tipo != 'aluno':
         return jsonify({'ok': False, 'error': 'Apenas alunos podem acessar'}), 403
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
-    followups_paginados = FollowUp.query.filter_by(aluno_id=usuario.id)\
-        .order_by(FollowUp.data.desc())\
-        .paginate(page=page, per_page=per_page, error_out=False)
+    followups, paginacao = paginar(
+        FollowUp.query.filter_by(aluno_id=usuario.id),
+        [(FollowUp.data, 'desc')],
+        FollowUp.id
+    )
     
     return jsonify({
         'ok': True,
-        'followups': [f.to_dict() for f in followups_paginados.items],
-        'total': followups_paginados.total,
-        'page': page,
-        'per_page': per_page,
-        'pages': followups_paginados.pages
+        'followups': [f.to_dict() for f in followups],
+        **paginacao
     }), 200
 
 @bp.route('/', methods=['POST'])
@@ -154,9 +151,6 @@ def listar_followups_admin():
     data_fim = request.args.get('data_fim')
     status = request.args.get('status')
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
     query = FollowUp.query
     
     if aluno_id:
@@ -179,17 +173,12 @@ def listar_followups_admin():
     if status:
         query = query.filter_by(status=status)
     
-    query = query.order_by(FollowUp.data.desc())
-    
-    followups_paginados = query.paginate(page=page, per_page=per_page, error_out=False)
+    followups, paginacao = paginar(query, [(FollowUp.data, 'desc')], FollowUp.id)
     
     return jsonify({
         'ok': True,
-        'followups': [f.to_dict() for f in followups_paginados.items],
-        'total': followups_paginados.total,
-        'page': page,
-        'per_page': per_page,
-        'pages': followups_paginados.pages
+        'followups': [f.to_dict() for f in followups],
+        **paginacao
     }), 200
 
 @bp.route('/<int:followup_id>/liberar-edicao', methods=['PUT'])
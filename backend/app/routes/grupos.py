@@ -7,6 +7,9 @@ from app.models.grupo import Grupo, GrupoMembro
 from app.models.atividade import Atividade
 from app.models.usuario import Usuario
 from app.utils.auth import professor_required, login_required, get_current_user
+from app.utils.conditional import detalhe_condicional, lista_condicional
+from app.utils.pagination import paginar
+from app.utils.row_serializers import serializar_grupo, plano_da_requisicao
 
 bp = Blueprint('grupos', __name__, url_prefix='/api/grupos')
 
@@ -16,24 +19,24 @@ def listar_grupos():
     """Lista grupos com filtros"""
     atividade_id = request.args.get('atividade_id', type=int)
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
     query = Grupo.query
     
     if atividade_id:
         query = query.filter_by(atividade_id=atividade_id)
     
-    grupos_paginados = query.paginate(page=page, per_page=per_page, error_out=False)
+    # Membros carregados em lote (?fields=, ?include=)
+    plano = plano_da_requisicao(serializar_grupo, garantir=[Grupo.id])
     
-    return jsonify({
-        'ok': True,
-        'grupos': [grupo.to_dict() for grupo in grupos_paginados.items],
-        'total': grupos_paginados.total,
-        'page': page,
-        'per_page': per_page,
-        'pages': grupos_paginados.pages
-    }), 200
+    def resposta():
+        grupos, paginacao = paginar(plano.consulta(query), [], Grupo.id)
+        return jsonify({
+            'ok': True,
+            'grupos': plano.serializar(grupos),
+            **paginacao
+        }), 200
+    
+    # Membros (relação padrão) trazem o nome do aluno: sem ETag enquanto vierem no plano
+    return lista_condicional(query, Grupo.atualizado_em, resposta, plano)
 
 @bp.route('/<int:grupo_id>', methods=['GET'])
 @login_required
@@ -44,10 +47,10 @@ def obter_grupo(grupo_id):
     if not grupo:
         return jsonify({'ok': False, 'error': 'Grupo não encontrado'}), 404
     
-    return jsonify({
+    return detalhe_condicional(grupo, lambda: (jsonify({
         'ok': True,
         'grupo': grupo.to_dict()
-    }), 200
+    }), 200))
 
 @bp.route('/', methods=['POST'])
 @professor_required
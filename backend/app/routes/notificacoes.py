@@ -1,11 +1,19 @@
 """
 Rotas de gerenciamento de notificações
 """
-from flask import Blueprint, request, jsonify
-from app import db
+from flask import Blueprint, Response, current_app, request, jsonify
+from app import limiter
 from app.models.notificacao import Notificacao
-from app.utils.auth import professor_required, login_required, get_current_user
-from app.utils.notifications import criar_notificacao_global, notificar_turma, limpar_notificacoes_antigas
+from app.utils.auth import professor_required, login_required, admin_required, get_current_user
+from app.utils.pagination import paginar
+from app.utils.row_serializers import serializar_notificacao, plano_da_requisicao
+from app.utils.jobs import iniciar_tarefa
+from app.utils.notification_stream import get_broadcaster, stream_notificacoes, StreamLimitReached
+from app.utils.notifications import (
+    criar_notificacao_global, notificar_turma, limpar_notificacoes_antigas,
+    consulta_caixa_entrada, contar_nao_lidas, turma_avisos,
+    marcar_notificacao_lida, marcar_todas_notificacoes_lidas
+)
 
 bp = Blueprint('notificacoes', __name__, url_prefix='/api/notificacoes')
 
@@ -14,34 +22,28 @@ bp = Blueprint('notificacoes', __name__, url_prefix='/api/notificacoes')
 def minhas_notificacoes():
     """
     Retorna notificações do usuário atual.
-    Inclui notificações específicas e globais.
+    Inclui notificações pessoais, avisos da turma do usuário e globais,
+    com o estado de leitura do próprio usuário.
     """
     usuario = get_current_user()
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
     lida = request.args.get('lida')
     
-    # Buscar notificações específicas do usuário ou globais
-    query = Notificacao.query.filter(
-        (Notificacao.usuario_id == usuario.id) | (Notificacao.usuario_id == None)
-    )
+    query, lida_expr = consulta_caixa_entrada(usuario)
     
     if lida is not None:
         lida_bool = lida.lower() == 'true'
-        query = query.filter_by(lida=lida_bool)
-    
-    query = query.order_by(Notificacao.data_envio.desc())
+        query = query.filter(lida_expr if lida_bool else ~lida_expr)
     
-    notificacoes_paginadas = query.paginate(page=page, per_page=per_page, error_out=False)
+    # Só as colunas do JSON, com o estado de leitura do próprio usuário
+    serializer = serializar_notificacao.com(lida=(lida_expr.label('lida_usuario'), bool))
+    plano = plano_da_requisicao(serializer, garantir=[Notificacao.data_envio, Notificacao.id])
+    notificacoes, paginacao = paginar(plano.consulta(query), [(Notificacao.data_envio, 'desc')], Notificacao.id)
     
     return jsonify({
         'ok': True,
-        'notificacoes': [n.to_dict() for n in notificacoes_paginadas.items],
-        'total': notificacoes_paginadas.total,
-        'page': page,
-        'per_page': per_page,
-        'pages': notificacoes_paginadas.pages
+        'notificacoes': plano.serializar(notificacoes),
+        **paginacao
     }), 200
 
 @bp.route('/<int:notificacao_id>/marcar-lida', methods=['PUT'])
@@ -55,12 +57,13 @@ def marcar_lida(notificacao_id):
     if not notificacao:
         return jsonify({'ok': False, 'error': 'Notificação não encontrada'}), 404
     
-    # Verificar permissão
+    # Verificar permissão (pessoal de outro usuário ou aviso de outra turma)
     if notificacao.usuario_id and notificacao.usuario_id != usuario.id:
         return jsonify({'ok': False, 'error': 'Acesso negado'}), 403
+    if notificacao.turma and notificacao.turma != turma_avisos(usuario):
+        return jsonify({'ok': False, 'error': 'Acesso negado'}), 403
     
-    notificacao.lida = True
-    db.session.commit()
+    marcar_notificacao_lida(notificacao, usuario)
     
     return jsonify({
         'ok': True,
@@ -70,13 +73,10 @@ def marcar_lida(notificacao_id):
 @bp.route('/marcar-todas-lidas', methods=['PUT'])
 @login_required
 def marcar_todas_lidas():
-    """Marca todas as notificações do usuário como lidas"""
+    """Marca todas as notificações do usuário como lidas (inclusive turma e globais)"""
     usuario = get_current_user()
     
-    # Atualizar notificações específicas do usuário
-    Notificacao.query.filter_by(usuario_id=usuario.id, lida=False).update({'lida': True})
-    
-    db.session.commit()
+    marcar_todas_notificacoes_lidas(usuario)
     
     return jsonify({
         'ok': True,
@@ -123,29 +123,79 @@ def enviar_notificacao_manual():
 def limpar_antigas():
     """
     Remove notificações com mais de 30 dias (configurável).
+    A remoção roda em background, em lotes; o andamento é consultado em
+    GET /api/tarefas/<id>.
     """
+    usuario = get_current_user()
     dias = request.args.get('dias', 30, type=int)
-    
-    count = limpar_notificacoes_antigas(dias)
+    lote = request.args.get('lote', current_app.config.get('NOTIFICATION_PURGE_BATCH', 1000), type=int)
+    
+    tarefa = iniciar_tarefa(
+        'limpar_notificacoes',
+        limpar_notificacoes_antigas,
+        dias,
+        lote=max(1, min(lote, 10000)),
+        criado_por=usuario.id
+    )
     
     return jsonify({
         'ok': True,
-        'message': f'{count} notificações antigas foram removidas'
-    }), 200
+        'message': 'Limpeza de notificações antigas iniciada',
+        'tarefa': tarefa.to_dict()
+    }), 202
 
 @bp.route('/nao-lidas/count', methods=['GET'])
+@limiter.exempt  # Polling periódico do cliente
 @login_required
 def count_nao_lidas():
-    """Retorna contagem de notificações não lidas"""
+    """Retorna contagem de notificações não lidas (contador materializado por usuário)"""
     usuario = get_current_user()
     
-    count = Notificacao.query.filter(
-        (Notificacao.usuario_id == usuario.id) | (Notificacao.usuario_id == None),
-        Notificacao.lida == False
-    ).count()
+    count = contar_nao_lidas(usuario)
     
     return jsonify({
         'ok': True,
         'count': count
     }), 200
 
+@bp.route('/stream', methods=['GET'])
+@limiter.exempt  # Reconexões do EventSource; o teto é o de streams por worker (limite_streams)
+@login_required
+def stream():
+    """
+    Stream (Server-Sent Events) com novas notificações e mudanças no contador
+    de não lidas, substituindo o polling. Aceita Last-Event-ID para retomar.
+    """
+    usuario = get_current_user()
+    broadcaster = get_broadcaster()
+    
+    try:
+        broadcaster.abrir()
+    except StreamLimitReached:
+        return jsonify({
+            'ok': False,
+            'error': 'Muitas conexões abertas. Tente novamente em instantes.'
+        }), 503, {'Retry-After': '10'}
+    
+    ultimo_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        ultimo_id = int(ultimo_id) if ultimo_id else None
+    except ValueError:
+        ultimo_id = None
+    
+    response = Response(
+        stream_notificacoes(current_app._get_current_object(), usuario.id, ultimo_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(broadcaster.fechar)
+    return response
+
+@bp.route('/stream/stats', methods=['GET'])
+@admin_required
+def stream_stats():
+    """Conexões de stream abertas neste worker"""
+    return jsonify({
+        'ok': True,
+        'stream': get_broadcaster().stats()
+    }), 200
@@ -1,18 +1,37 @@
 """
 Rotas de gerenciamento de questões (múltipla escolha)
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from app import db
 from app.models.questao import Questao, Resposta
 from app.models.atividade import Atividade
 from app.utils.auth import professor_required, login_required, get_current_user
+from app.utils.autosave import consumir_rascunhos, get_autosave, ler_rascunhos
+from app.utils.conditional import lista_condicional
+from app.utils.grading import corrigir_envio, estatisticas_por_questao
+from app.utils.idempotency import chave_da_requisicao, gravar_resposta, resposta_gravada
+from app.utils.item_analysis import analise_itens
+from app.utils.jobs import iniciar_tarefa
+from app.utils.regrading import contar_respostas, recorrigir_questoes
+from app.utils.response_cache import cache_resposta, invalidar_cache
+from app.utils.row_serializers import serializar_questao, respostas_por_questao, plano_da_requisicao
 
 bp = Blueprint('questoes', __name__, url_prefix='/api')
 
+def _variante_questoes(usuario):
+    # Respostas mudam a cada envio durante a prova: com elas a listagem não usa o cache
+    pedidos = ','.join(request.args.getlist('include') + request.args.getlist('fields'))
+    if 'respostas' in pedidos:
+        return None
+    return 'professor' if usuario.tipo in ['professor', 'admin'] else 'aluno'  # include_resposta
+
 # Rotas de questões (professor)
 @bp.route('/atividades/<int:atividade_id>/questoes', methods=['GET'])
 @login_required
+@cache_resposta('atividade:{atividade_id}', variante=_variante_questoes)
 def listar_questoes(atividade_id):
     """Lista questões de uma atividade"""
     atividade = Atividade.query.get(atividade_id)
@@ -23,16 +42,25 @@ def listar_questoes(atividade_id):
     if atividade.tipo != 'multipla_escolha':
         return jsonify({'ok': False, 'error': 'Atividade não é do tipo múltipla escolha'}), 400
     
-    questoes = Questao.query.filter_by(atividade_id=atividade_id).order_by(Questao.ordem).all()
-    
-    # Se for professor, incluir respostas corretas
+    # Se for professor, incluir respostas corretas; aluno só vê as próprias respostas
     usuario = get_current_user()
-    include_resposta = usuario.tipo in ['professor', 'admin']
-    
-    return jsonify({
-        'ok': True,
-        'questoes': [q.to_dict(include_resposta=include_resposta) for q in questoes]
-    }), 200
+    serializer = serializar_questao
+    if usuario.tipo not in ['professor', 'admin']:
+        serializer = serializer.sem('resposta_correta').com_relacoes(respostas=(
+            Questao.id, lambda ids: respostas_por_questao(ids, aluno_id=usuario.id), []
+        ))
+    
+    plano = plano_da_requisicao(serializer)
+    query = Questao.query.filter_by(atividade_id=atividade_id)
+    
+    def resposta():
+        questoes = plano.consulta(query.order_by(Questao.ordem)).all()
+        return jsonify({
+            'ok': True,
+            'questoes': plano.serializar(questoes)
+        }), 200
+    
+    return lista_condicional(query, Questao.atualizado_em, resposta, plano)
 
 @bp.route('/atividades/<int:atividade_id>/questoes', methods=['POST'])
 @professor_required
@@ -68,6 +96,7 @@ def criar_questao(atividade_id):
         questao.set_resposta_correta(data['resposta_correta'])
     
     db.session.add(questao)
+    invalidar_cache(f'atividade:{atividade_id}')
     db.session.commit()
     
     return jsonify({
@@ -101,13 +130,42 @@ def atualizar_questao(questao_id):
     if 'ordem' in data:
         questao.ordem = data['ordem']
     
+    # Gabarito alterado: as respostas já enviadas são recorrigidas
+    estado = db.inspect(questao)
+    gabarito_alterado = any(
+        estado.attrs[campo].history.has_changes() for campo in ('resposta_correta', 'pontuacao')
+    )
+    
+    invalidar_cache(f'atividade:{questao.atividade_id}')
     db.session.commit()
     
-    return jsonify({
+    resultado = {
         'ok': True,
         'questao': questao.to_dict(include_resposta=True),
         'message': 'Questão atualizada com sucesso'
-    }), 200
+    }
+    if gabarito_alterado:
+        resultado.update(_recorrigir([questao.id]))
+    
+    return jsonify(resultado), 200
+
+def _recorrigir(questao_ids):
+    """
+    Recorrige as respostas das questões: na hora se forem poucas, senão em
+    background. Retorna {'recorrecao': resumo} ou {'tarefa': tarefa}.
+    """
+    lote = current_app.config.get('REGRADE_BATCH', 1000)
+    if contar_respostas(questao_ids) <= current_app.config.get('REGRADE_SYNC_LIMIT', 2000):
+        return {'recorrecao': recorrigir_questoes(questao_ids, lote=lote)}
+    
+    tarefa = iniciar_tarefa(
+        'recorrigir_questoes',
+        recorrigir_questoes,
+        questao_ids,
+        lote=lote,
+        criado_por=get_current_user().id
+    )
+    return {'tarefa': tarefa.to_dict()}
 
 @bp.route('/questoes/<int:questao_id>', methods=['DELETE'])
 @professor_required
@@ -119,6 +177,7 @@ def deletar_questao(questao_id):
         return jsonify({'ok': False, 'error': 'Questão não encontrada'}), 404
     
     db.session.delete(questao)
+    invalidar_cache(f'atividade:{questao.atividade_id}')
     db.session.commit()
     
     return jsonify({
@@ -133,9 +192,18 @@ def responder_atividade(atividade_id):
     """
     Aluno responde questões de múltipla escolha.
     Correção automática e cálculo de nota.
+    Os rascunhos salvos (autosave) completam as questões ausentes do envio e são removidos.
+    Com o cabeçalho Idempotency-Key, o reenvio retorna o resultado gravado sem corrigir de novo.
     """
     usuario = get_current_user()
     
+    chave = chave_da_requisicao()
+    escopo = f'responder:{atividade_id}'
+    if chave:
+        gravada = resposta_gravada(usuario.id, chave, escopo)
+        if gravada is not None:
+            return gravada
+    
     atividade = Atividade.query.get(atividade_id)
     
     if not atividade:
@@ -147,77 +215,110 @@ def responder_atividade(atividade_id):
     data = request.get_json()
     respostas_data = data.get('respostas', [])
     
+    # Rascunhos consumidos num único DELETE ... RETURNING; as respostas do envio têm prioridade
+    rascunhos = consumir_rascunhos(usuario.id, atividade_id)
+    respostas_data = list(respostas_data) + [
+        {'questao_id': questao_id, 'resposta': resposta}
+        for questao_id, (resposta, _) in rascunhos.items()
+    ]
+    
     if not respostas_data:
         return jsonify({'ok': False, 'error': 'Nenhuma resposta fornecida'}), 400
     
-    # Processar respostas
-    respostas_criadas = []
-    nota_total = 0
-    pontos_possiveis = 0
-    
-    for resp_data in respostas_data:
-        questao_id = resp_data.get('questao_id')
-        resposta_aluno = resp_data.get('resposta')
-        
-        questao = Questao.query.get(questao_id)
-        if not questao or questao.atividade_id != atividade_id:
-            continue
-        
-        # Verificar se já existe resposta (evitar duplicatas)
-        resposta_existente = Resposta.query.filter_by(
-            questao_id=questao_id,
-            aluno_id=usuario.id,
-            atividade_id=atividade_id
-        ).first()
-        
-        if resposta_existente:
-            continue
-        
-        # Correção automática
-        resposta_correta_obj = questao.get_resposta_correta()
-        correta = False
-        pontos_obtidos = 0
-        
-        if resposta_correta_obj is not None:
-            if isinstance(resposta_correta_obj, list):
-                # Múltipla escolha (multiple)
-                correta = set(resposta_aluno) == set(resposta_correta_obj)
-            else:
-                # Única escolha (single)
-                correta = resposta_aluno == resposta_correta_obj
-            
-            if correta:
-                pontos_obtidos = float(questao.pontuacao)
-        
-        # Criar resposta
-        resposta = Resposta(
-            questao_id=questao_id,
-            aluno_id=usuario.id,
-            atividade_id=atividade_id,
-            correta=correta,
-            pontos_obtidos=pontos_obtidos
-        )
-        resposta.set_resposta(resposta_aluno)
-        
-        db.session.add(resposta)
-        respostas_criadas.append(resposta)
-        
-        nota_total += pontos_obtidos
-        pontos_possiveis += float(questao.pontuacao)
-    
-    db.session.commit()
+    # Correção em lote: gabarito e um único INSERT (respostas já existentes são ignoradas)
+    respostas_criadas, nota_total, pontos_possiveis = corrigir_envio(
+        atividade_id, usuario.id, respostas_data
+    )
     
     # Calcular nota percentual
     nota_percentual = (nota_total / pontos_possiveis * 100) if pontos_possiveis > 0 else 0
     
-    return jsonify({
+    resultado = {
         'ok': True,
+        # Serializar antes do commit: as linhas vieram completas do RETURNING
         'respostas': [r.to_dict() for r in respostas_criadas],
         'nota_total': nota_total,
         'pontos_possiveis': pontos_possiveis,
         'nota_percentual': round(nota_percentual, 2),
         'message': 'Respostas enviadas e corrigidas com sucesso'
-    }), 201
+    }
+    if chave:
+        gravar_resposta(usuario.id, chave, escopo, resultado, 201)
+    if respostas_criadas:
+        invalidar_cache(f'respostas:{atividade_id}')
+    
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Reenvio concorrente com a mesma chave (ou banco sem ON CONFLICT)
+        db.session.rollback()
+        gravada = resposta_gravada(usuario.id, chave, escopo) if chave else None
+        if gravada is not None:
+            return gravada
+        return jsonify({'ok': False, 'error': 'Respostas já enviadas para esta atividade'}), 409
+    
+    get_autosave().descartar(usuario.id, atividade_id)
+    
+    return jsonify(resultado), 201
+
+@bp.route('/atividades/<int:atividade_id>/rascunho', methods=['PUT'])
+@login_required
+def salvar_rascunho(atividade_id):
+    """
+    Autosave das respostas em andamento: guarda no buffer do worker (gravado
+    em lote no banco a cada poucos segundos). Vale a gravação mais recente.
+    """
+    usuario = get_current_user()
+    
+    atividade = db.session.get(Atividade, atividade_id)
+    
+    if not atividade:
+        return jsonify({'ok': False, 'error': 'Atividade não encontrada'}), 404
+    
+    if atividade.tipo != 'multipla_escolha':
+        return jsonify({'ok': False, 'error': 'Atividade não é do tipo múltipla escolha'}), 400
+    
+    data = request.get_json()
+    respostas_data = data.get('respostas', [])
+    
+    if not respostas_data or not all(
+        isinstance(r, dict) and isinstance(r.get('questao_id'), int) for r in respostas_data
+    ):
+        return jsonify({'ok': False, 'error': 'Informe as respostas com questao_id'}), 400
+    
+    # Só questões desta atividade (uma linha inválida não pode travar o lote do worker)
+    questao_ids = {r['questao_id'] for r in respostas_data}
+    validas = set(db.session.scalars(
+        select(Questao.id).where(Questao.atividade_id == atividade_id, Questao.id.in_(questao_ids))
+    ))
+    if validas != questao_ids:
+        invalidas = ', '.join(str(i) for i in sorted(questao_ids - validas))
+        return jsonify({'ok': False, 'error': f'Questões não pertencem à atividade: {invalidas}'}), 400
+    
+    get_autosave().registrar(usuario.id, atividade_id, {
+        r['questao_id']: r.get('resposta') for r in respostas_data
+    })
+    
+    return jsonify({
+        'ok': True,
+        'salvas': len(respostas_data)
+    }), 202
+
+@bp.route('/atividades/<int:atividade_id>/rascunho', methods=['GET'])
+@login_required
+def obter_rascunho(atividade_id):
+    """Rascunhos do aluno na atividade (para retomar a prova)"""
+    usuario = get_current_user()
+    
+    rascunhos = ler_rascunhos(usuario.id, atividade_id)
+    
+    return jsonify({
+        'ok': True,
+        'rascunhos': [
+            {'questao_id': questao_id, 'resposta': resposta, 'atualizado_em': carimbo.isoformat()}
+            for questao_id, (resposta, carimbo) in sorted(rascunhos.items())
+        ]
+    }), 200
 
 @bp.route('/atividades/<int:atividade_id>/minhas-respostas', methods=['GET'])
 @login_required
@@ -235,12 +336,58 @@ def minhas_respostas(atividade_id):
         'respostas': [r.to_dict() for r in respostas]
     }), 200
 
+@bp.route('/atividades/<int:atividade_id>/recorrigir', methods=['POST'])
+@professor_required
+def recorrigir_atividade(atividade_id):
+    """
+    Recorrige todas as respostas da atividade contra o gabarito atual.
+    Atividades grandes rodam em background (acompanhar em GET /api/tarefas/<id>).
+    """
+    atividade = Atividade.query.get(atividade_id)
+    
+    if not atividade:
+        return jsonify({'ok': False, 'error': 'Atividade não encontrada'}), 404
+    
+    questao_ids = list(db.session.scalars(
+        select(Questao.id).where(Questao.atividade_id == atividade_id)
+    ))
+    resultado = _recorrigir(questao_ids)
+    
+    return jsonify({
+        'ok': True,
+        'message': 'Recorreção iniciada' if 'tarefa' in resultado else 'Respostas recorrigidas',
+        **resultado
+    }), 202 if 'tarefa' in resultado else 200
+
+@bp.route('/atividades/<int:atividade_id>/analise-itens', methods=['GET'])
+@professor_required
+@cache_resposta(('atividade:{atividade_id}', 'respostas:{atividade_id}'))
+def analise_itens_atividade(atividade_id):
+    """
+    Análise de itens da atividade de múltipla escolha: dificuldade, discriminação,
+    ponto-bisserial e eficiência dos distratores por questão, e alfa de Cronbach.
+    Fica em cache até chegarem novas respostas ou o gabarito mudar.
+    """
+    atividade = Atividade.query.get(atividade_id)
+    
+    if not atividade:
+        return jsonify({'ok': False, 'error': 'Atividade não encontrada'}), 404
+    
+    if atividade.tipo != 'multipla_escolha':
+        return jsonify({'ok': False, 'error': 'Atividade não é do tipo múltipla escolha'}), 400
+    
+    return jsonify({
+        'ok': True,
+        'atividade_id': atividade_id,
+        **analise_itens(atividade_id)
+    }), 200
+
 @bp.route('/atividades/<int:atividade_id>/estatisticas', methods=['GET'])
 @professor_required
 def estatisticas_atividade(atividade_id):
     """
     Retorna estatísticas de uma atividade de múltipla escolha.
-    Taxa de acerto por questão, média geral, etc.
+    Taxa de acerto e distribuição das respostas por alternativa, por questão.
     """
     atividade = Atividade.query.get(atividade_id)
     
@@ -250,24 +397,8 @@ def estatisticas_atividade(atividade_id):
     if atividade.tipo != 'multipla_escolha':
         return jsonify({'ok': False, 'error': 'Atividade não é do tipo múltipla escolha'}), 400
     
-    questoes = Questao.query.filter_by(atividade_id=atividade_id).all()
-    
-    estatisticas = []
-    
-    for questao in questoes:
-        respostas = Resposta.query.filter_by(questao_id=questao.id).all()
-        
-        total_respostas = len(respostas)
-        corretas = sum(1 for r in respostas if r.correta)
-        taxa_acerto = (corretas / total_respostas * 100) if total_respostas > 0 else 0
-        
-        estatisticas.append({
-            'questao_id': questao.id,
-            'enunciado': questao.enunciado,
-            'total_respostas': total_respostas,
-            'respostas_corretas': corretas,
-            'taxa_acerto': round(taxa_acerto, 2)
-        })
+    # Um GROUP BY por (questão, resposta); inclui a distribuição por alternativa
+    estatisticas = estatisticas_por_questao(atividade_id)
     
     return jsonify({
         'ok': True,
@@ -4,15 +4,13 @@ Rotas de geração de relatórios (PDF e XLSX)
 from flask import Blueprint, request, jsonify, send_file
 from datetime import datetime
 from io import BytesIO
-import openpyxl
-from openpyxl.styles import Font, Alignment
-from weasyprint import HTML
 from app import db
 from app.models.usuario import Usuario
 from app.models.atividade import Atividade
 from app.models.entrega import Entrega
 from app.models.questao import Resposta
 from app.utils.auth import professor_required
+from app.reports import get_backend
 
 bp = Blueprint('relatorios', __name__, url_prefix='/api/relatorios')
 
@@ -111,143 +109,22 @@ def relatorio_desempenho():
             }
         }), 200
     
-    # Gerar XLSX
-    elif formato == 'xlsx':
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Relatório de Desempenho"
-        
-        # Cabeçalho
-        ws.append(['Relatório de Desempenho - AtivFlow'])
-        ws.append([f'Turma: {turma or "Todas"}'])
-        ws.append([f'Período: {data_ini or "Início"} a {data_fim or "Fim"}'])
-        ws.append([])
-        
-        # Estatísticas gerais
-        ws.append(['Estatísticas Gerais'])
-        ws.append(['Total de Alunos', estatisticas_gerais['total_alunos']])
-        ws.append(['Total de Atividades', estatisticas_gerais['total_atividades']])
-        ws.append(['Nota Média da Turma', estatisticas_gerais['nota_media_turma']])
-        ws.append(['Taxa de Entrega Média', f"{estatisticas_gerais['taxa_entrega_media']}%"])
-        ws.append([])
-        
-        # Ranking
-        ws.append(['Ranking de Alunos'])
-        ws.append(['Posição', 'Nome', 'Email', 'Total Entregas', 'Nota Média', 'Taxa de Entrega (%)'])
-        
-        for idx, aluno in enumerate(dados_alunos_sorted, 1):
-            ws.append([
-                idx,
-                aluno['nome'],
-                aluno['email'],
-                aluno['total_entregas'],
-                aluno['nota_media'],
-                aluno['taxa_entrega']
-            ])
-        
-        # Estilizar cabeçalhos
-        for cell in ws[1]:
-            cell.font = Font(bold=True, size=14)
-        
-        for cell in ws[5]:
-            cell.font = Font(bold=True)
-        
-        for cell in ws[11]:
-            cell.font = Font(bold=True)
-        
-        for cell in ws[12]:
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal='center')
-        
-        # Salvar em memória
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        return send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=f'relatorio_desempenho_{turma or "todas"}_{datetime.now().strftime("%Y%m%d")}.xlsx'
-        )
-    
-    # Gerar PDF
-    elif formato == 'pdf':
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                h1 {{ color: #003366; }}
-                h2 {{ color: #0066cc; margin-top: 30px; }}
-                table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #003366; color: white; }}
-                .stats {{ background-color: #f0f0f0; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-            </style>
-        </head>
-        <body>
-            <h1>Relatório de Desempenho - AtivFlow</h1>
-            <p><strong>Turma:</strong> {turma or 'Todas'}</p>
-            <p><strong>Período:</strong> {data_ini or 'Início'} a {data_fim or 'Fim'}</p>
-            
-            <div class="stats">
-                <h2>Estatísticas Gerais</h2>
-                <p><strong>Total de Alunos:</strong> {estatisticas_gerais['total_alunos']}</p>
-                <p><strong>Total de Atividades:</strong> {estatisticas_gerais['total_atividades']}</p>
-                <p><strong>Nota Média da Turma:</strong> {estatisticas_gerais['nota_media_turma']}</p>
-                <p><strong>Taxa de Entrega Média:</strong> {estatisticas_gerais['taxa_entrega_media']}%</p>
-            </div>
-            
-            <h2>Ranking de Alunos</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Posição</th>
-                        <th>Nome</th>
-                        <th>Email</th>
-                        <th>Total Entregas</th>
-                        <th>Nota Média</th>
-                        <th>Taxa de Entrega (%)</th>
-                    </tr>
-                </thead>
-                <tbody>
-        """
-        
-        for idx, aluno in enumerate(dados_alunos_sorted, 1):
-            html_content += f"""
-                    <tr>
-                        <td>{idx}</td>
-                        <td>{aluno['nome']}</td>
-                        <td>{aluno['email']}</td>
-                        <td>{aluno['total_entregas']}</td>
-                        <td>{aluno['nota_media']}</td>
-                        <td>{aluno['taxa_entrega']}</td>
-                    </tr>
-            """
-        
-        html_content += """
-                </tbody>
-            </table>
-        </body>
-        </html>
-        """
-        
-        # Gerar PDF
-        pdf = HTML(string=html_content).write_pdf()
-        
-        output = BytesIO(pdf)
-        output.seek(0)
-        
-        return send_file(
-            output,
-            mimetype='application/pdf',
-            as_attachment=True,
-            download_name=f'relatorio_desempenho_{turma or "todas"}_{datetime.now().strftime("%Y%m%d")}.pdf'
-        )
-    
-    else:
+    # Exportar (XLSX, PDF...) pelo backend do formato, carregado sob demanda
+    backend = get_backend(formato)
+    if backend is None:
         return jsonify({'ok': False, 'error': 'Formato inválido'}), 400
-
+    
+    conteudo = backend.render_desempenho({
+        'estatisticas_gerais': estatisticas_gerais,
+        'ranking': dados_alunos_sorted,
+        'turma': turma,
+        'data_ini': data_ini,
+        'data_fim': data_fim
+    })
+    
+    return send_file(
+        BytesIO(conteudo),
+        mimetype=backend.mimetype,
+        as_attachment=True,
+        download_name=f'relatorio_desempenho_{turma or "todas"}_{datetime.now().strftime("%Y%m%d")}.{backend.extensao}'
+    )
@@ -0,0 +1,27 @@
+"""
+Rotas de acompanhamento de tarefas em background
+"""
+from flask import Blueprint, jsonify
+from app.models.tarefa import Tarefa
+from app.utils.auth import professor_required, get_current_user
+
+bp = Blueprint('tarefas', __name__, url_prefix='/api/tarefas')
+
+@bp.route('/<int:tarefa_id>', methods=['GET'])
+@professor_required
+def obter_tarefa(tarefa_id):
+    """Retorna status e progresso de uma tarefa"""
+    usuario = get_current_user()
+    tarefa = Tarefa.query.get(tarefa_id)
+    
+    if not tarefa:
+        return jsonify({'ok': False, 'error': 'Tarefa não encontrada'}), 404
+    
+    # Apenas quem criou a tarefa ou admin
+    if tarefa.criado_por and tarefa.criado_por != usuario.id and usuario.tipo != 'admin':
+        return jsonify({'ok': False, 'error': 'Acesso negado'}), 403
+    
+    return jsonify({
+        'ok': True,
+        'tarefa': tarefa.to_dict()
+    }), 200
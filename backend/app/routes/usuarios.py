@@ -5,7 +5,9 @@ from flask import Blueprint, request, jsonify
 from app import db
 from app.models.usuario import Usuario
 from app.utils.auth import professor_required, login_required
+from app.utils.pagination import paginar
 from app.utils.email_generator import gerar_email_aluno
+from app.utils.password_hashing import HashingPoolBusy, hash_senha
 
 bp = Blueprint('usuarios', __name__, url_prefix='/api/alunos')
 
@@ -17,9 +19,6 @@ def listar_alunos():
     curso = request.args.get('curso')
     status = request.args.get('status', 'ativo')
     
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
     query = Usuario.query.filter_by(tipo='aluno')
     
     if turma:
@@ -29,15 +28,12 @@ def listar_alunos():
     if status:
         query = query.filter_by(status=status)
     
-    alunos_paginados = query.paginate(page=page, per_page=per_page, error_out=False)
+    alunos, paginacao = paginar(query, [], Usuario.id)
     
     return jsonify({
         'ok': True,
-        'alunos': [aluno.to_dict() for aluno in alunos_paginados.items],
-        'total': alunos_paginados.total,
-        'page': page,
-        'per_page': per_page,
-        'pages': alunos_paginados.pages
+        'alunos': [aluno.to_dict() for aluno in alunos],
+        **paginacao
     }), 200
 
 @bp.route('/<int:aluno_id>', methods=['GET'])
@@ -85,7 +81,11 @@ def criar_aluno():
         turma=data['turma'],
         status='ativo'
     )
-    aluno.set_password(data['senha'])
+    
+    try:
+        aluno.senha_hash = hash_senha(data['senha'])
+    except HashingPoolBusy:
+        return jsonify({'ok': False, 'error': 'Servidor ocupado, tente novamente'}), 503
     
     db.session.add(aluno)
     db.session.commit()
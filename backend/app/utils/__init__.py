@@ -7,6 +7,8 @@ from app.utils.file_upload import save_file, save_multiple_files, delete_file, a
 from app.utils.notifications import (
     criar_notificacao, 
     criar_notificacao_global,
+    criar_notificacoes_em_lote,
+    criar_notificacao_turma,
     notificar_turma,
     notificar_nova_atividade,
     notificar_entrega_recebida,
@@ -28,6 +30,8 @@ __all__ = [
     'allowed_file',
     'criar_notificacao',
     'criar_notificacao_global',
+    'criar_notificacoes_em_lote',
+    'criar_notificacao_turma',
     'notificar_turma',
     'notificar_nova_atividade',
     'notificar_entrega_recebida',
@@ -2,8 +2,12 @@
 Utilitários de autenticação e decoradores de autorização
 """
 from functools import wraps
-from flask import session, jsonify, request
+from flask import session, jsonify, request, g, current_app, has_app_context
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import make_transient_to_detached
+from app import db
 from app.models.usuario import Usuario
+from app.utils.cache import TTLCache
 
 def login_required(f):
     """
@@ -26,7 +30,7 @@ def professor_required(f):
         if 'user_id' not in session:
             return jsonify({'ok': False, 'error': 'Autenticação necessária'}), 401
         
-        user = Usuario.query.get(session['user_id'])
+        user = get_usuario_autorizado()
         if not user or user.tipo not in ['professor', 'admin']:
             return jsonify({'ok': False, 'error': 'Permissão de professor necessária'}), 403
         
@@ -42,7 +46,7 @@ def admin_required(f):
         if 'user_id' not in session:
             return jsonify({'ok': False, 'error': 'Autenticação necessária'}), 401
         
-        user = Usuario.query.get(session['user_id'])
+        user = get_usuario_autorizado()
         if not user or user.tipo != 'admin':
             return jsonify({'ok': False, 'error': 'Permissão de admin necessária'}), 403
         
@@ -52,8 +56,95 @@ def admin_required(f):
 def get_current_user():
     """
     Retorna o usuário atual da sessão ou None.
+
+    O resultado fica guardado em flask.g durante a requisição, então decoradores
+    e views compartilham a mesma instância. Entre requisições, um cache LRU com
+    TTL (USER_CACHE_SIZE / USER_CACHE_TTL) evita a consulta por chave primária.
+    """
+    if 'user_id' not in session:
+        return None
+
+    user_id = session['user_id']
+    if 'current_user' in g and g.current_user_id == user_id:
+        return g.current_user
+
+    usuario = _carregar_usuario(user_id)
+    g.current_user = usuario
+    g.current_user_id = user_id
+    return usuario
+
+def get_usuario_autorizado():
+    """
+    Usuário atual para decisões de autorização, ou None se inexistente/inativo.
+
+    O snapshot do cache só é invalidado no worker que alterou a linha (e não em
+    updates em lote), então tipo e status são conferidos no banco com uma
+    consulta por chave primária. Se divergirem, o snapshot é descartado e o
+    usuário é recarregado.
+    """
+    usuario = get_current_user()
+    if usuario is None:
+        return None
+
+    atual = db.session.execute(
+        select(Usuario.tipo, Usuario.status).where(Usuario.id == usuario.id)
+    ).first()
+    if atual is None:
+        invalidar_usuario_cache(usuario.id)
+        g.pop('current_user', None)
+        return None
+
+    if (atual.tipo, atual.status) != (usuario.tipo, usuario.status):
+        invalidar_usuario_cache(usuario.id)
+        db.session.refresh(usuario)
+        _guardar_snapshot(usuario)
+
+    return usuario if usuario.status == 'ativo' else None
+
+def get_user_cache():
+    """Retorna o cache de usuários da aplicação atual"""
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        cache = TTLCache(
+            maxsize=current_app.config.get('USER_CACHE_SIZE', 0),
+            ttl=current_app.config.get('USER_CACHE_TTL', 0)
+        )
+        current_app.extensions['user_cache'] = cache
+    return cache
+
+def _carregar_usuario(user_id):
+    """
+    Busca o usuário no cache LRU ou no banco.
+    O cache guarda apenas os valores das colunas; a instância é reconstruída
+    e anexada à sessão atual sem consulta ao banco.
     """
-    if 'user_id' in session:
-        return Usuario.query.get(session['user_id'])
-    return None
+    cache = get_user_cache()
+    snapshot = cache.get(user_id)
+
+    if snapshot is not None:
+        usuario = Usuario(**snapshot)
+        make_transient_to_detached(usuario)
+        return db.session.merge(usuario, load=False)
+
+    usuario = Usuario.query.get(user_id)
+    if usuario is not None:
+        _guardar_snapshot(usuario)
+    return usuario
+
+def _guardar_snapshot(usuario):
+    """Guarda no cache LRU os valores das colunas do usuário"""
+    get_user_cache().set(usuario.id, {
+        attr.key: getattr(usuario, attr.key)
+        for attr in inspect(Usuario).column_attrs
+    })
+
+def invalidar_usuario_cache(user_id):
+    """Remove um usuário do cache LRU (chamado quando a linha muda)"""
+    if has_app_context():
+        get_user_cache().delete(user_id)
 
+@event.listens_for(Usuario, 'after_update')
+@event.listens_for(Usuario, 'after_delete')
+def _usuario_alterado(mapper, connection, target):
+    """Invalida o cache quando status, tipo, turma, senha etc. são alterados"""
+    invalidar_usuario_cache(target.id)
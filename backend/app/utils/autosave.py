@@ -0,0 +1,258 @@
+"""
+Autosave (write-behind) das respostas em andamento nas atividades de múltipla escolha.
+
+O aluno grava continuamente enquanto responde; cada gravação só atualiza um
+dicionário em memória do worker, (aluno, atividade) -> {questão: resposta},
+onde a gravação mais recente substitui a anterior. Uma thread por processo
+descarrega o buffer a cada AUTOSAVE_FLUSH_INTERVAL segundos (ou antes, ao
+passar de AUTOSAVE_MAX_PENDING rascunhos) com um único upsert na tabela
+`rascunhos_respostas`. O upsert só sobrescreve rascunhos mais antigos, então
+entre workers também vale a última gravação.
+
+O envio final (responder_atividade) consome os rascunhos num único
+DELETE ... RETURNING e descarta os pendentes no buffer do próprio worker.
+Rascunhos ainda no buffer de outro worker são descartados na descarga, que
+não grava rascunhos de questões já respondidas.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.questao import Resposta
+from app.models.rascunho_resposta import RascunhoResposta
+
+logger = logging.getLogger(__name__)
+
+
+class AutosaveBuffer:
+    """Buffer de rascunhos do worker, descarregado em lote por uma thread de fundo"""
+
+    def __init__(self, app, intervalo=2, max_pendentes=5000):
+        self.app = app
+        self.intervalo = intervalo
+        self.max_pendentes = max_pendentes
+        self._pendentes = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._pid = None
+
+    def iniciar(self):
+        """Inicia a thread de descarga (uma vez por processo, depois do fork)"""
+        # Intervalo 0: gravação imediata, sem thread
+        if self._pid == os.getpid() or self.app.testing or self.intervalo <= 0:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # Processo novo (fork): o buffer herdado pertence ao processo pai
+            self._pendentes = {}
+            self._total = 0
+            self._acordar = threading.Event()
+            threading.Thread(target=self._executar, name='autosave-flush', daemon=True).start()
+            atexit.register(self._descarregar_no_contexto)
+
+    def registrar(self, aluno_id, atividade_id, itens):
+        """Guarda {questao_id: resposta} do aluno; a gravação mais recente vale"""
+        self.iniciar()
+        agora = datetime.utcnow()
+        with self._lock:
+            rascunhos = self._pendentes.setdefault((aluno_id, atividade_id), {})
+            antes = len(rascunhos)
+            for questao_id, resposta in itens.items():
+                rascunhos[questao_id] = (json.dumps(resposta), agora)
+            self._total += len(rascunhos) - antes
+            cheio = self._total >= self.max_pendentes
+        if self.intervalo <= 0:
+            self.descarregar()
+        elif cheio:
+            self._acordar.set()
+
+    def pendentes(self, aluno_id, atividade_id):
+        """Cópia dos rascunhos ainda no buffer: {questao_id: (resposta JSON, carimbo)}"""
+        with self._lock:
+            return dict(self._pendentes.get((aluno_id, atividade_id), {}))
+
+    def descartar(self, aluno_id, atividade_id):
+        """Remove do buffer os rascunhos da atividade (após o envio final)"""
+        with self._lock:
+            self._total -= len(self._pendentes.pop((aluno_id, atividade_id), {}))
+
+    def descarregar(self):
+        """
+        Grava os rascunhos pendentes num único upsert. Retorna a quantidade gravada.
+        Se o lote for rejeitado por uma linha inválida (ex.: questão removida durante
+        a prova), grava linha a linha e descarta só as rejeitadas; em outras falhas
+        (banco indisponível) os rascunhos voltam ao buffer.
+        """
+        with self._lock:
+            pendentes, self._pendentes, self._total = self._pendentes, {}, 0
+        linhas = [
+            {
+                'aluno_id': aluno_id,
+                'questao_id': questao_id,
+                'atividade_id': atividade_id,
+                'resposta': resposta,
+                'atualizado_em': carimbo
+            }
+            for (aluno_id, atividade_id), rascunhos in pendentes.items()
+            for questao_id, (resposta, carimbo) in rascunhos.items()
+        ]
+        if not linhas:
+            return 0
+        try:
+            try:
+                with db.engine.begin() as conn:
+                    gravadas = _gravar_rascunhos(conn, linhas)
+            except IntegrityError:
+                gravadas = _gravar_linha_a_linha(linhas)
+        except Exception:
+            # Devolve ao buffer sem sobrescrever gravações mais novas feitas nesse meio tempo
+            with self._lock:
+                for (aluno_id, atividade_id), rascunhos in pendentes.items():
+                    atuais = self._pendentes.setdefault((aluno_id, atividade_id), {})
+                    for questao_id, valor in rascunhos.items():
+                        if questao_id not in atuais:
+                            atuais[questao_id] = valor
+                            self._total += 1
+            raise
+        return gravadas
+
+    def _descarregar_no_contexto(self):
+        try:
+            with self.app.app_context():
+                self.descarregar()
+        except Exception:
+            logger.exception('Falha ao gravar os rascunhos pendentes')
+
+    def _executar(self):
+        while True:
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            self._descarregar_no_contexto()
+
+def _sem_respostas_enviadas(conn, linhas):
+    """
+    Remove os rascunhos de questões que o aluno já respondeu: o envio final feito
+    em outro worker já consumiu os rascunhos e o buffer deste ainda os tinha.
+    """
+    respostas = Resposta.__table__
+    pares = {(linha['aluno_id'], linha['questao_id']) for linha in linhas}
+    respondidas = set(conn.execute(
+        select(respostas.c.aluno_id, respostas.c.questao_id)
+        .where(tuple_(respostas.c.aluno_id, respostas.c.questao_id).in_(pares))
+    ).all())
+    return [linha for linha in linhas if (linha['aluno_id'], linha['questao_id']) not in respondidas]
+
+def _gravar_rascunhos(conn, linhas):
+    """
+    Upsert que só substitui rascunhos mais antigos (PostgreSQL e SQLite), sem as
+    questões já respondidas. Retorna a quantidade gravada.
+    """
+    linhas = _sem_respostas_enviadas(conn, linhas)
+    if not linhas:
+        return 0
+    tabela = RascunhoResposta.__table__
+    dialetos = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+    construtor = dialetos.get(conn.dialect.name)
+    if construtor is None:
+        # Demais bancos: remove e insere (sem a comparação de carimbos entre workers)
+        for linha in linhas:
+            conn.execute(delete(tabela).where(
+                tabela.c.aluno_id == linha['aluno_id'],
+                tabela.c.questao_id == linha['questao_id']
+            ))
+        conn.execute(insert(tabela), linhas)
+        return len(linhas)
+
+    stmt = construtor(tabela)
+    conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=['aluno_id', 'questao_id'],
+            set_={
+                'resposta': stmt.excluded.resposta,
+                'atualizado_em': stmt.excluded.atualizado_em,
+                'atividade_id': stmt.excluded.atividade_id
+            },
+            where=tabela.c.atualizado_em <= stmt.excluded.atualizado_em
+        ),
+        linhas
+    )
+    return len(linhas)
+
+def _gravar_linha_a_linha(linhas):
+    """Grava cada rascunho num savepoint; os rejeitados pelo banco são descartados"""
+    gravadas = 0
+    with db.engine.begin() as conn:
+        for linha in linhas:
+            try:
+                with conn.begin_nested():
+                    gravadas += _gravar_rascunhos(conn, [linha])
+            except IntegrityError:
+                logger.warning('Rascunho descartado (aluno %s, questão %s): rejeitado pelo banco',
+                               linha['aluno_id'], linha['questao_id'])
+    return gravadas
+
+def init_autosave(app):
+    """Cria o buffer de autosave do worker"""
+    app.extensions['autosave'] = AutosaveBuffer(
+        app,
+        intervalo=app.config.get('AUTOSAVE_FLUSH_INTERVAL', 2),
+        max_pendentes=app.config.get('AUTOSAVE_MAX_PENDING', 5000)
+    )
+
+def get_autosave(app=None):
+    """Buffer de autosave da aplicação"""
+    return (app or current_app).extensions['autosave']
+
+def _decodificar(texto):
+    try:
+        return json.loads(texto) if texto else None
+    except ValueError:
+        return None
+
+def ler_rascunhos(aluno_id, atividade_id):
+    """Rascunhos do aluno (banco + buffer do worker; vale o mais recente) por questão"""
+    tabela = RascunhoResposta.__table__
+    rascunhos = {
+        questao_id: (resposta, carimbo)
+        for questao_id, resposta, carimbo in db.session.execute(
+            select(tabela.c.questao_id, tabela.c.resposta, tabela.c.atualizado_em)
+            .where(tabela.c.aluno_id == aluno_id, tabela.c.atividade_id == atividade_id)
+        )
+    }
+    return _mesclar(rascunhos, get_autosave().pendentes(aluno_id, atividade_id))
+
+def consumir_rascunhos(aluno_id, atividade_id):
+    """
+    Remove e retorna os rascunhos do aluno na atividade (banco + buffer do worker)
+    num único DELETE ... RETURNING, na transação da sessão. Não faz commit.
+    """
+    tabela = RascunhoResposta.__table__
+    filtro = (tabela.c.aluno_id == aluno_id, tabela.c.atividade_id == atividade_id)
+    colunas = (tabela.c.questao_id, tabela.c.resposta, tabela.c.atualizado_em)
+    if db.session.get_bind().dialect.delete_returning:
+        linhas = db.session.execute(delete(tabela).where(*filtro).returning(*colunas)).all()
+    else:
+        linhas = db.session.execute(select(*colunas).where(*filtro)).all()
+        db.session.execute(delete(tabela).where(*filtro))
+    rascunhos = {questao_id: (resposta, carimbo) for questao_id, resposta, carimbo in linhas}
+    return _mesclar(rascunhos, get_autosave().pendentes(aluno_id, atividade_id))
+
+def _mesclar(gravados, pendentes):
+    """{questao_id: (resposta, carimbo)} com o mais recente de cada questão, decodificado"""
+    for questao_id, (resposta, carimbo) in pendentes.items():
+        if questao_id not in gravados or gravados[questao_id][1] <= carimbo:
+            gravados[questao_id] = (resposta, carimbo)
+    return {
+        questao_id: (_decodificar(resposta), carimbo)
+        for questao_id, (resposta, carimbo) in gravados.items()
+    }
@@ -0,0 +1,78 @@
+"""
+Utilitário de cache em memória (LRU com expiração por TTL)
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Cache LRU thread-safe com tempo de vida por entrada.
+    Usado para evitar consultas repetidas dentro do mesmo processo (worker).
+    Com maxsize ou ttl igual a 0 o cache fica desativado.
+    """
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key, default=None):
+        """Retorna o valor da chave ou default se ausente/expirado"""
+        if not self.enabled:
+            return default
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expira_em, valor = item
+            if expira_em < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return valor
+
+    def set(self, key, valor):
+        """Armazena um valor, descartando a entrada menos usada se necessário"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, valor)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove uma chave do cache"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Esvazia o cache"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Retorna métricas de uso do cache"""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def __len__(self):
+        return len(self._data)
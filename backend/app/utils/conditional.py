@@ -0,0 +1,72 @@
+"""
+GET condicional (ETag / Last-Modified / 304) para as rotas de leitura.
+
+Detalhe: ETag a partir do id e do atualizado_em do registro.
+Listagem: impressão digital barata do conjunto filtrado, count + max(atualizado_em),
+lida de índices (turma/aluno/atividade + atualizado_em) sem carregar as linhas.
+Alterar, criar ou remover um item muda a impressão; o cliente que reenvia a ETag
+recebe 304 sem corpo e a página não é montada.
+
+Listagens cujo plano traz relações (?include= ou relações em ?fields=) dependem
+de outras tabelas e não recebem ETag (ex.: membros de um grupo trazem o nome do
+aluno, que muda sem tocar o atualizado_em do grupo).
+"""
+import hashlib
+from datetime import timezone
+from flask import Response, make_response, request, session
+from sqlalchemy import func
+
+def _etag(*partes):
+    # Rota, query string (página, cursor, fields...) e usuário fazem parte da representação
+    bruto = '|'.join(str(p) for p in (request.full_path, session.get('user_id'), *partes))
+    return hashlib.sha1(bruto.encode('utf-8')).hexdigest()
+
+def _nao_modificado(etag, ultima_modificacao):
+    # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if ultima_modificacao and request.if_modified_since:
+        return ultima_modificacao.replace(microsecond=0, tzinfo=timezone.utc) <= request.if_modified_since
+    return False
+
+def resposta_condicional(etag, gerar, ultima_modificacao=None):
+    """
+    304 se o cliente já tem a versão `etag`; senão monta a resposta com gerar()
+    (o mesmo retorno de uma view) e acrescenta ETag/Last-Modified.
+    """
+    if _nao_modificado(etag, ultima_modificacao):
+        resposta = Response(status=304)
+    else:
+        resposta = make_response(gerar())
+    resposta.set_etag(etag, weak=True)
+    if ultima_modificacao:
+        resposta.last_modified = ultima_modificacao.replace(tzinfo=timezone.utc)
+    # O navegador pode guardar, mas sempre revalida (respostas dependem do usuário)
+    resposta.headers['Cache-Control'] = 'private, no-cache'
+    return resposta
+
+def detalhe_condicional(registro, gerar):
+    """GET condicional de um registro com atualizado_em"""
+    if registro.atualizado_em is None:
+        return gerar()
+    etag = _etag(type(registro).__tablename__, registro.id, registro.atualizado_em.isoformat())
+    return resposta_condicional(etag, gerar, registro.atualizado_em)
+
+def impressao_lista(query, coluna_atualizado):
+    """(count, max(atualizado_em)) do conjunto filtrado, sem ordenação nem paginação"""
+    return tuple(query.with_entities(
+        func.count(), func.max(coluna_atualizado)
+    ).order_by(None).one())
+
+def lista_condicional(query, coluna_atualizado, gerar, plano=None):
+    """
+    GET condicional de uma listagem.
+    `plano`: plano de serialização; relações mudam sem alterar a impressão,
+    então planos com relações não recebem ETag.
+    Last-Modified não é usado: uma remoção pode diminuir o max(atualizado_em).
+    """
+    if plano is not None and plano.nomes_relacoes():
+        return gerar()
+    total, ultima = impressao_lista(query, coluna_atualizado)
+    etag = _etag(coluna_atualizado, total, ultima.isoformat() if ultima else None)
+    return resposta_condicional(etag, gerar)
@@ -0,0 +1,93 @@
+"""
+Revisão das respostas duplicadas (mesma questão e aluno) de versões anteriores.
+
+A migração do índice único uq_respostas_questao_aluno recusa enquanto houver
+duplicatas: as linhas já têm nota e nenhuma é apagada automaticamente. O
+comando `flask respostas-duplicadas` lista os conflitos e, só quando o critério
+é escolhido (--manter), remove as excedentes depois de gravá-las num backup.
+
+As consultas usam apenas colunas anteriores à migração do índice: o comando
+roda antes do `flask db upgrade` que cria o índice.
+"""
+import json
+from datetime import datetime
+from sqlalchemy import and_, delete, func, select
+from app import db
+from app.models.questao import Resposta
+from app.utils.response_cache import invalidar_cache
+
+# Critério -> chave de ordenação; a primeira resposta do par é mantida
+CRITERIOS = {
+    # A que o INSERT ... ON CONFLICT DO NOTHING teria mantido: o primeiro envio
+    'primeira': lambda r: (r.data_resposta or datetime.min, r.id),
+    # A de maior pontuação (empate: o primeiro envio)
+    'melhor': lambda r: (-float(r.pontos_obtidos or 0), r.data_resposta or datetime.min, r.id),
+}
+
+def listar_respostas_duplicadas():
+    """Respostas dos pares (questao_id, aluno_id) com mais de uma linha: {(questao, aluno): [linhas]}"""
+    pares = (
+        select(Resposta.questao_id, Resposta.aluno_id)
+        .group_by(Resposta.questao_id, Resposta.aluno_id)
+        .having(func.count(Resposta.id) > 1)
+        .subquery()
+    )
+    linhas = db.session.execute(
+        select(
+            Resposta.id,
+            Resposta.questao_id,
+            Resposta.aluno_id,
+            Resposta.atividade_id,
+            Resposta.resposta,
+            Resposta.correta,
+            Resposta.pontos_obtidos,
+            Resposta.data_resposta
+        )
+        .join(pares, and_(Resposta.questao_id == pares.c.questao_id,
+                          Resposta.aluno_id == pares.c.aluno_id))
+        .order_by(Resposta.questao_id, Resposta.aluno_id, Resposta.id)
+    ).all()
+
+    grupos = {}
+    for linha in linhas:
+        grupos.setdefault((linha.questao_id, linha.aluno_id), []).append(linha)
+    return grupos
+
+def escolher_mantidas(grupos, manter):
+    """Resposta mantida de cada par segundo o critério: {(questao, aluno): linha}"""
+    chave = CRITERIOS[manter]
+    return {par: min(linhas, key=chave) for par, linhas in grupos.items()}
+
+def remover_respostas_duplicadas(grupos, manter, backup):
+    """
+    Remove as respostas excedentes de cada par, mantendo a escolhida pelo critério.
+    As removidas são gravadas antes em `backup` (JSON). Retorna o total removido.
+    """
+    mantidas = escolher_mantidas(grupos, manter)
+    removidas = [
+        linha
+        for par, linhas in grupos.items()
+        for linha in linhas
+        if linha.id != mantidas[par].id
+    ]
+    if not removidas:
+        return 0
+
+    with open(backup, 'w', encoding='utf-8') as arquivo:
+        json.dump([{
+            'id': linha.id,
+            'questao_id': linha.questao_id,
+            'aluno_id': linha.aluno_id,
+            'atividade_id': linha.atividade_id,
+            'resposta': linha.resposta,
+            'correta': linha.correta,
+            'pontos_obtidos': float(linha.pontos_obtidos) if linha.pontos_obtidos is not None else None,
+            'data_resposta': linha.data_resposta.isoformat() if linha.data_resposta else None,
+            'mantida_id': mantidas[(linha.questao_id, linha.aluno_id)].id,
+        } for linha in removidas], arquivo, ensure_ascii=False, indent=2)
+
+    # Uma transação: ou todos os pares ficam resolvidos ou nenhum
+    db.session.execute(delete(Resposta).where(Resposta.id.in_([linha.id for linha in removidas])))
+    invalidar_cache(*{f'respostas:{linha.atividade_id}' for linha in removidas})
+    db.session.commit()
+    return len(removidas)
@@ -0,0 +1,187 @@
+"""
+Correção automática das atividades de múltipla escolha em lote.
+
+Um envio custa dois comandos, independente do número de questões: uma
+consulta com o gabarito da atividade e um único INSERT com todas as respostas.
+A correção é feita em memória contra o gabarito compilado (conjuntos para
+questões `multiple`).
+
+Questões já respondidas são descartadas pelo próprio banco: o índice único
+(questao_id, aluno_id) com INSERT ... ON CONFLICT DO NOTHING (PostgreSQL e
+SQLite) torna envios repetidos ou concorrentes seguros, sem verificar antes de
+inserir. Em outros bancos o INSERT é simples e uma duplicata gera IntegrityError.
+
+As estatísticas da atividade saem de um único GROUP BY (questão, resposta
+normalizada); a distribuição por alternativa é montada sobre esse resultado.
+"""
+import json
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.questao import Questao, Resposta, normalizar_resposta
+
+def _conjunto(valores):
+    """Conjunto comparável das alternativas (JSON canônico se não forem hasheáveis)"""
+    try:
+        return frozenset(valores)
+    except TypeError:
+        return frozenset(json.dumps(v, sort_keys=True) for v in valores)
+
+
+class Gabarito:
+    """
+    Gabarito compilado de uma atividade: questao_id -> (pontuação, resposta correta).
+    A resposta correta fica como conjunto (multiple), valor (single) ou None (sem correção).
+    """
+    __slots__ = ('itens',)
+
+    def __init__(self, itens):
+        self.itens = itens
+
+    @classmethod
+    def carregar(cls, atividade_id):
+        """Lê só as colunas do gabarito, numa consulta"""
+        linhas = db.session.execute(
+            select(Questao.id, Questao.resposta_correta, Questao.pontuacao)
+            .where(Questao.atividade_id == atividade_id)
+        )
+        itens = {}
+        for questao_id, resposta_correta, pontuacao in linhas:
+            correta = None
+            if resposta_correta:
+                try:
+                    correta = json.loads(resposta_correta)
+                except ValueError:
+                    correta = None
+            if isinstance(correta, list):
+                correta = _conjunto(correta)
+            itens[questao_id] = (float(pontuacao or 0), correta)
+        return cls(itens)
+
+    def __contains__(self, questao_id):
+        return questao_id in self.itens
+
+    def corrigir(self, questao_id, resposta):
+        """Retorna (correta, pontos obtidos, pontos possíveis) de uma resposta"""
+        pontuacao, correta = self.itens[questao_id]
+        if correta is None:
+            acertou = False
+        elif isinstance(correta, frozenset):
+            # Múltipla escolha (multiple): mesmo conjunto de alternativas
+            try:
+                acertou = isinstance(resposta, (list, tuple)) and _conjunto(resposta) == correta
+            except TypeError:
+                acertou = False
+        else:
+            # Única escolha (single)
+            acertou = resposta == correta
+        return acertou, (pontuacao if acertou else 0), pontuacao
+
+def _insert_respostas():
+    """INSERT de respostas que ignora (questão, aluno) já existentes, se o banco suportar"""
+    dialetos = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+    construtor = dialetos.get(db.session.get_bind().dialect.name)
+    if construtor is None:
+        return insert(Resposta)
+    return construtor(Resposta).on_conflict_do_nothing(index_elements=['questao_id', 'aluno_id'])
+
+def corrigir_envio(atividade_id, aluno_id, respostas_data, gabarito=None):
+    """
+    Corrige e grava um envio do aluno. Questões de outra atividade, já
+    respondidas ou repetidas no mesmo envio são ignoradas (e não contam na nota).
+    Não faz commit. Retorna (respostas criadas, nota total, pontos possíveis).
+    """
+    gabarito = gabarito or Gabarito.carregar(atividade_id)
+
+    linhas = []
+    no_envio = set()
+    for item in respostas_data:
+        questao_id = item.get('questao_id')
+        if not isinstance(questao_id, int) or questao_id not in gabarito or questao_id in no_envio:
+            continue
+        no_envio.add(questao_id)
+
+        resposta = item.get('resposta')
+        correta, pontos, _ = gabarito.corrigir(questao_id, resposta)
+        linhas.append({
+            'questao_id': questao_id,
+            'aluno_id': aluno_id,
+            'atividade_id': atividade_id,
+            'resposta': json.dumps(resposta),
+            'resposta_normalizada': normalizar_resposta(resposta),
+            'correta': correta,
+            'pontos_obtidos': pontos
+        })
+
+    if not linhas:
+        return [], 0, 0
+
+    # O RETURNING traz só as linhas inseridas: a nota conta apenas o que foi gravado
+    criadas = db.session.scalars(_insert_respostas().returning(Resposta), linhas).all()
+    nota_total = sum(float(r.pontos_obtidos or 0) for r in criadas)
+    pontos_possiveis = sum(gabarito.itens[r.questao_id][0] for r in criadas)
+    return criadas, nota_total, pontos_possiveis
+
+def _alternativas_marcadas(chave):
+    """Alternativas (JSON canônico de cada uma) de uma resposta agrupada"""
+    try:
+        resposta = json.loads(chave)
+    except (TypeError, ValueError):
+        return []
+    if resposta is None:
+        return []
+    itens = resposta if isinstance(resposta, list) else [resposta]
+    return list({json.dumps(item, sort_keys=True) for item in itens})
+
+def estatisticas_por_questao(atividade_id):
+    """
+    Taxa de acerto e distribuição por alternativa de cada questão da atividade,
+    em uma consulta: questões LEFT JOIN respostas agrupadas por resposta
+    normalizada (linhas antigas, sem a coluna, agrupam pelo JSON original).
+    """
+    chave = func.coalesce(Resposta.resposta_normalizada, Resposta.resposta)
+    linhas = db.session.execute(
+        select(
+            Questao.id,
+            Questao.enunciado,
+            Questao.alternativas,
+            chave,
+            func.count(Resposta.id),
+            func.sum(case((Resposta.correta == True, 1), else_=0))
+        )
+        .outerjoin(Resposta, Resposta.questao_id == Questao.id)
+        .where(Questao.atividade_id == atividade_id)
+        # Demais colunas da questão dependem da chave primária agrupada
+        .group_by(Questao.id, chave)
+        .order_by(Questao.ordem, Questao.id)
+    )
+
+    estatisticas = {}
+    for questao_id, enunciado, alternativas, resposta, total, corretas in linhas:
+        item = estatisticas.get(questao_id)
+        if item is None:
+            try:
+                opcoes = json.loads(alternativas) if alternativas else []
+            except ValueError:
+                opcoes = []
+            item = estatisticas[questao_id] = {
+                'questao_id': questao_id,
+                'enunciado': enunciado,
+                'total_respostas': 0,
+                'respostas_corretas': 0,
+                'distribuicao': {json.dumps(opcao, sort_keys=True): 0 for opcao in opcoes}
+            }
+        item['total_respostas'] += total
+        item['respostas_corretas'] += corretas
+        for alternativa in _alternativas_marcadas(resposta):
+            item['distribuicao'][alternativa] = item['distribuicao'].get(alternativa, 0) + total
+
+    for item in estatisticas.values():
+        total = item['total_respostas']
+        item['taxa_acerto'] = round(item['respostas_corretas'] / total * 100, 2) if total else 0
+        # Alternativas na ordem da questão; marcações fora da lista vêm no fim
+        item['distribuicao'] = [
+            {'alternativa': json.loads(alternativa), 'total': quantidade}
+            for alternativa, quantidade in item['distribuicao'].items()
+        ]
+    return list(estatisticas.values())
@@ -0,0 +1,84 @@
+"""
+Requisições idempotentes com o cabeçalho Idempotency-Key.
+
+O cliente gera uma chave por operação e a reenvia nas tentativas seguintes.
+O resultado da primeira execução é gravado na mesma transação da operação
+(tabela `respostas_idempotentes`); reenvios com a mesma chave recebem esse
+resultado sem executar a operação de novo. Chaves valem por
+IDEMPOTENCY_KEY_TTL e depois são removidas em lotes (`flask limpar-idempotencia`).
+"""
+import json
+from datetime import datetime
+from flask import abort, current_app, jsonify, make_response, request
+from sqlalchemy import delete, select, tuple_
+from app import db
+from app.models.resposta_idempotente import RespostaIdempotente
+
+HEADER = 'Idempotency-Key'
+
+# Tamanho máximo da chave (coluna String(128))
+_TAMANHO_MAXIMO = 128
+
+def chave_da_requisicao():
+    """Chave do cabeçalho Idempotency-Key (None se ausente; 400 se inválida)"""
+    chave = request.headers.get(HEADER)
+    if chave is None:
+        return None
+    chave = chave.strip()
+    if not chave or len(chave) > _TAMANHO_MAXIMO:
+        abort(make_response(jsonify({
+            'ok': False,
+            'error': f'{HEADER} deve ter entre 1 e {_TAMANHO_MAXIMO} caracteres'
+        }), 400))
+    return chave
+
+def _expirada(registro):
+    return registro.criado_em < datetime.utcnow() - current_app.config['IDEMPOTENCY_KEY_TTL']
+
+def resposta_gravada(usuario_id, chave, escopo):
+    """
+    Resposta gravada para a chave, pronta para reenvio, ou None se a chave ainda
+    não foi usada (ou expirou). Chave usada em outra requisição: 422.
+    """
+    registro = db.session.get(RespostaIdempotente, (usuario_id, chave))
+    if registro is None:
+        return None
+    if _expirada(registro):
+        db.session.delete(registro)
+        db.session.flush()
+        return None
+    if registro.escopo != escopo:
+        abort(make_response(jsonify({
+            'ok': False,
+            'error': f'{HEADER} já utilizada em outra requisição'
+        }), 422))
+
+    resposta = current_app.response_class(registro.corpo, status=registro.status, mimetype='application/json')
+    resposta.headers['Idempotent-Replayed'] = 'true'
+    return resposta
+
+def gravar_resposta(usuario_id, chave, escopo, corpo, status):
+    """Adiciona o resultado à sessão (gravado no commit da própria operação)"""
+    db.session.add(RespostaIdempotente(
+        usuario_id=usuario_id,
+        chave=chave,
+        escopo=escopo,
+        status=status,
+        corpo=json.dumps(corpo)
+    ))
+
+def limpar_chaves_expiradas(lote=1000):
+    """Remove chaves expiradas em lotes, cada um em sua própria transação. Retorna o total"""
+    tabela = RespostaIdempotente.__table__
+    limite = datetime.utcnow() - current_app.config['IDEMPOTENCY_KEY_TTL']
+    total = 0
+
+    while True:
+        chaves = select(tabela.c.usuario_id, tabela.c.chave).where(tabela.c.criado_em < limite).limit(lote)
+        with db.engine.begin() as conn:
+            removidas = conn.execute(
+                delete(tabela).where(tuple_(tabela.c.usuario_id, tabela.c.chave).in_(chaves))
+            ).rowcount
+        total += removidas
+        if removidas < lote:
+            return total
@@ -0,0 +1,180 @@
+"""
+Análise de itens (psicometria clássica) das atividades de múltipla escolha.
+
+As respostas da atividade vêm numa consulta e viram a matriz alunos x questões
+de acertos (0/1; questão não respondida conta como erro). Sobre ela, com NumPy:
+
+    dificuldade       proporção de acertos de cada questão (índice p)
+    discriminação     p do grupo superior - p do grupo inferior (27% extremos
+                      pela pontuação total)
+    ponto-bisserial   correlação entre o acerto na questão e a pontuação no
+                      restante da prova (total sem a própria questão)
+    alfa de Cronbach  confiabilidade da prova: k/(k-1) * (1 - Σ var(itens) / var(total))
+
+Para cada alternativa: proporção de alunos que a marcaram (geral, grupo
+superior e inferior). Um distrator (alternativa incorreta) é funcional quando
+marcado por ao menos LIMIAR_DISTRATOR dos alunos; a eficiência dos
+distratores da questão é a porcentagem de distratores funcionais.
+"""
+import json
+import numpy as np
+from sqlalchemy import func, select
+from app import db
+from app.models.questao import Questao, Resposta
+
+# Fração de cada extremo usada na discriminação (Kelley)
+FRACAO_GRUPO = 0.27
+
+# Proporção mínima de escolha para um distrator ser considerado funcional
+LIMIAR_DISTRATOR = 0.05
+
+def _canonicos(texto):
+    """Valores canônicos (JSON), sem repetição e na ordem original, de uma resposta ou gabarito"""
+    try:
+        valor = json.loads(texto) if texto else None
+    except ValueError:
+        return []
+    if valor is None:
+        return []
+    itens = valor if isinstance(valor, list) else [valor]
+    return list(dict.fromkeys(json.dumps(item, sort_keys=True) for item in itens))
+
+def _numero(valor, casas=4):
+    """float arredondado para o JSON (None para NaN)"""
+    valor = float(valor)
+    return None if np.isnan(valor) else round(valor, casas)
+
+def _correlacao_colunas(a, b):
+    """Correlação de Pearson coluna a coluna entre duas matrizes (NaN sem variância)"""
+    a = a - a.mean(axis=0)
+    b = b - b.mean(axis=0)
+    denominador = np.sqrt((a * a).sum(axis=0) * (b * b).sum(axis=0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominador > 0, (a * b).sum(axis=0) / denominador, np.nan)
+
+def analise_itens(atividade_id):
+    """Análise de itens da atividade (dicionário pronto para JSON)"""
+    questoes = db.session.execute(
+        select(Questao.id, Questao.enunciado, Questao.alternativas, Questao.resposta_correta)
+        .where(Questao.atividade_id == atividade_id)
+        .order_by(Questao.ordem, Questao.id)
+    ).all()
+    indice = {questao_id: i for i, (questao_id, _, _, _) in enumerate(questoes)}
+
+    linhas = [
+        linha for linha in db.session.execute(
+            select(
+                Resposta.aluno_id,
+                Resposta.questao_id,
+                Resposta.correta,
+                func.coalesce(Resposta.resposta_normalizada, Resposta.resposta)
+            ).where(Resposta.atividade_id == atividade_id)
+        )
+        if linha[1] in indice
+    ]
+
+    # Alternativas de todas as questões num só eixo: (questão, valor canônico) -> coluna
+    colunas = {}
+    gabarito = []
+    for i, (_, _, alternativas, resposta_correta) in enumerate(questoes):
+        for valor in _canonicos(alternativas):
+            colunas.setdefault((i, valor), len(colunas))
+        gabarito.append(set(_canonicos(resposta_correta)))
+
+    alunos, posicao_aluno = np.unique(
+        np.fromiter((linha[0] for linha in linhas), dtype=np.int64, count=len(linhas)),
+        return_inverse=True
+    )
+    posicao_item = np.fromiter((indice[linha[1]] for linha in linhas), dtype=np.int64, count=len(linhas))
+    n, k = len(alunos), len(questoes)
+
+    # Matriz de acertos alunos x questões
+    acertos = np.zeros((n, k))
+    acertos[posicao_aluno, posicao_item] = [bool(linha[2]) for linha in linhas]
+    respondidas = np.bincount(posicao_item, minlength=k)
+
+    # Marcações alunos x alternativas (respostas iguais decodificadas uma vez)
+    decodificadas = {}
+    marcacao_aluno, marcacao_coluna = [], []
+    for p, (linha, item) in enumerate(zip(linhas, posicao_item)):
+        chave = (int(item), linha[3])
+        if chave not in decodificadas:
+            decodificadas[chave] = [colunas.setdefault((chave[0], v), len(colunas)) for v in _canonicos(linha[3])]
+        for coluna in decodificadas[chave]:
+            marcacao_aluno.append(posicao_aluno[p])
+            marcacao_coluna.append(coluna)
+    marcadas = np.zeros((n, len(colunas)), dtype=bool)
+    marcadas[np.array(marcacao_aluno, dtype=np.int64), np.array(marcacao_coluna, dtype=np.int64)] = True
+
+    total = acertos.sum(axis=1)
+    grupo = max(1, int(round(FRACAO_GRUPO * n)))
+    ordem = np.argsort(total, kind='stable')
+    inferior, superior = ordem[:grupo], ordem[-grupo:]
+
+    dificuldade = acertos.mean(axis=0) if n else np.full(k, np.nan)
+    discriminacao = (
+        acertos[superior].mean(axis=0) - acertos[inferior].mean(axis=0)
+        if n >= 2 else np.full(k, np.nan)
+    )
+    proporcao = marcadas.mean(axis=0) if n else np.zeros(len(colunas))
+    proporcao_superior = marcadas[superior].mean(axis=0) if n else proporcao
+    proporcao_inferior = marcadas[inferior].mean(axis=0) if n else proporcao
+    # Correlação corrigida: acerto na questão x pontuação nas demais
+    ponto_bisserial = _correlacao_colunas(acertos, total[:, None] - acertos) if n >= 2 else np.full(k, np.nan)
+
+    alfa = np.nan
+    if k >= 2 and n >= 2:
+        variancia_total = total.var(ddof=1)
+        if variancia_total > 0:
+            alfa = k / (k - 1) * (1 - acertos.var(axis=0, ddof=1).sum() / variancia_total)
+
+    # Eficiência dos distratores por questão (bincount pelo item de cada coluna)
+    item_da_coluna = np.empty(len(colunas), dtype=np.int64)
+    correta_da_coluna = np.zeros(len(colunas), dtype=bool)
+    valores = [None] * len(colunas)
+    for (item, valor), coluna in colunas.items():
+        item_da_coluna[coluna] = item
+        correta_da_coluna[coluna] = valor in gabarito[item]
+        valores[coluna] = valor
+    distratores = ~correta_da_coluna
+    funcionais = distratores & (proporcao >= LIMIAR_DISTRATOR)
+    total_distratores = np.bincount(item_da_coluna[distratores], minlength=k)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        eficiencia = np.where(
+            total_distratores > 0,
+            np.bincount(item_da_coluna[funcionais], minlength=k) / total_distratores * 100,
+            np.nan
+        )
+
+    itens = []
+    for i, (questao_id, enunciado, _, _) in enumerate(questoes):
+        itens.append({
+            'questao_id': questao_id,
+            'enunciado': enunciado,
+            'respostas': int(respondidas[i]),
+            'dificuldade': _numero(dificuldade[i]),
+            'discriminacao': _numero(discriminacao[i]),
+            'ponto_bisserial': _numero(ponto_bisserial[i]),
+            'eficiencia_distratores': _numero(eficiencia[i], 2),
+            'alternativas': [
+                {
+                    'alternativa': json.loads(valores[c]),
+                    'correta': bool(correta_da_coluna[c]),
+                    'proporcao': _numero(proporcao[c]),
+                    'proporcao_superior': _numero(proporcao_superior[c]),
+                    'proporcao_inferior': _numero(proporcao_inferior[c]),
+                    'distrator_funcional': bool(funcionais[c]) if distratores[c] else None
+                }
+                for c in np.flatnonzero(item_da_coluna == i)
+            ]
+        })
+
+    return {
+        'alunos': int(n),
+        'questoes': itens,
+        'pontuacao_total': {
+            'media': _numero(total.mean()) if n else None,
+            'desvio_padrao': _numero(total.std(ddof=1)) if n >= 2 else None
+        },
+        'alfa_cronbach': _numero(alfa)
+    }
@@ -0,0 +1,90 @@
+"""
+Execução de tarefas longas em background (fora da requisição HTTP).
+
+A rota cria uma Tarefa, dispara a função num pool de threads do worker e
+responde 202 na hora. A função recebe `reportar(progresso, total)`, que grava
+o andamento na tabela `tarefas` numa conexão própria, para que o status possa
+ser consultado de qualquer worker (GET /api/tarefas/<id>).
+"""
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import update
+from app import db
+from app.models.tarefa import Tarefa
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def _get_executor(workers):
+    # Criado sob demanda para que as threads nasçam depois do fork do gunicorn
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='background-job')
+            _executor_pid = os.getpid()
+        return _executor
+
+def _atualizar_tarefa(tarefa_id, **valores):
+    """Atualiza a tarefa numa transação própria (não interfere na sessão da tarefa)"""
+    tabela = Tarefa.__table__
+    with db.engine.begin() as conn:
+        conn.execute(update(tabela).where(tabela.c.id == tarefa_id).values(**valores))
+
+def executar_tarefa(tarefa_id, fn, *args, **kwargs):
+    """
+    Executa fn(*args, reportar=..., **kwargs) registrando início, progresso,
+    resultado e erro da tarefa. Requer app context.
+    """
+    def reportar(progresso, total=None):
+        valores = {'progresso': progresso}
+        if total is not None:
+            valores['total'] = total
+        _atualizar_tarefa(tarefa_id, **valores)
+
+    _atualizar_tarefa(tarefa_id, status='executando', iniciado_em=datetime.utcnow())
+    try:
+        resultado = fn(*args, reportar=reportar, **kwargs)
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Falha na tarefa %s', tarefa_id)
+        _atualizar_tarefa(tarefa_id, status='erro', erro=str(e), concluido_em=datetime.utcnow())
+        return None
+
+    _atualizar_tarefa(
+        tarefa_id,
+        status='concluida',
+        resultado_json=json.dumps(resultado),
+        concluido_em=datetime.utcnow()
+    )
+    return resultado
+
+def iniciar_tarefa(tipo, fn, *args, criado_por=None, **kwargs):
+    """
+    Cria a Tarefa e agenda fn no pool de background. Retorna a Tarefa.
+    Com TESTING a função roda na hora (mesma thread), para testes determinísticos.
+    """
+    tarefa = Tarefa(tipo=tipo, status='pendente', progresso=0, criado_por=criado_por)
+    db.session.add(tarefa)
+    db.session.commit()
+    tarefa_id = tarefa.id
+
+    app = current_app._get_current_object()
+    if app.testing:
+        executar_tarefa(tarefa_id, fn, *args, **kwargs)
+        db.session.refresh(tarefa)
+        return tarefa
+
+    def executar():
+        with app.app_context():
+            executar_tarefa(tarefa_id, fn, *args, **kwargs)
+
+    _get_executor(app.config.get('BACKGROUND_JOB_WORKERS', 2)).submit(executar)
+    return tarefa
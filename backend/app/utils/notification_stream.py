@@ -0,0 +1,361 @@
+"""
+Canal de push de notificações (Server-Sent Events).
+
+Cada worker mantém um broadcaster em memória: cada conexão aberta se inscreve
+nos seus alvos (o próprio usuário e, para alunos ativos, a turma) e só consulta
+o banco quando uma alteração atinge um deles. Quem grava notificações (criação,
+leitura, limpeza) registra os alvos afetados na sessão; após o commit eles são
+publicados no worker e acrescentados como uma linha ao arquivo de sinal no
+diretório temporário, lido por uma thread em cada worker do host. Sem broker externo.
+"""
+import json
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Notificações reenviadas no máximo por reconexão (Last-Event-ID)
+LIMITE_REENVIO = 100
+
+# Alvo que acorda todas as conexões (avisos globais, limpeza)
+TODOS = '*'
+
+# Acima deste tamanho (bytes) o arquivo de sinal é truncado pelo próximo escritor
+LIMITE_ARQUIVO_SINAL = 64 * 1024
+
+
+def alvo_usuario(usuario_id):
+    return f'usuario:{usuario_id}'
+
+def alvo_turma(turma):
+    return f'turma:{turma}'
+
+
+class StreamLimitReached(Exception):
+    """Limite de conexões de stream do worker atingido (503)"""
+
+
+class Inscricao:
+    """Conexão de stream inscrita em um conjunto de alvos"""
+
+    def __init__(self, alvos=()):
+        self.alvos = frozenset(alvos)
+        self.evento = threading.Event()
+
+
+class NotificationBroadcaster:
+    """
+    Broadcaster em memória de um worker.
+    Cada publicação acorda apenas as inscrições com algum alvo em comum.
+    """
+
+    def __init__(self, arquivo_sinal, max_streams=50, intervalo_sinal=0.5):
+        self.arquivo_sinal = arquivo_sinal
+        self.max_streams = max_streams
+        self.intervalo_sinal = intervalo_sinal
+        self.versao = 0
+        self._inscricoes = set()
+        self._slots = threading.BoundedSemaphore(max_streams)
+        self._abertos = 0
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def inscrever(self, alvos=()):
+        """Registra uma conexão; acordada quando uma publicação atinge seus alvos"""
+        inscricao = Inscricao(alvos)
+        with self._lock:
+            self._inscricoes.add(inscricao)
+        return inscricao
+
+    def cancelar(self, inscricao):
+        with self._lock:
+            self._inscricoes.discard(inscricao)
+
+    def publicar(self, alvos=(TODOS,)):
+        """Acorda as conexões deste worker inscritas em algum dos alvos"""
+        alvos = frozenset(alvos)
+        with self._lock:
+            self.versao += 1
+            acordadas = [
+                inscricao for inscricao in self._inscricoes
+                if TODOS in alvos or inscricao.alvos & alvos
+            ]
+        for inscricao in acordadas:
+            inscricao.evento.set()
+        return len(acordadas)
+
+    def sinalizar(self, alvos=(TODOS,)):
+        """Acorda as conexões afetadas neste worker e nos demais workers do host"""
+        alvos = sorted(alvos)
+        self.publicar(alvos)
+        linha = json.dumps({'pid': os.getpid(), 'alvos': alvos}) + '\n'
+        try:
+            if self._tamanho() > LIMITE_ARQUIVO_SINAL:
+                # Cabeçalho novo: os leitores percebem a troca e acordam todas as conexões
+                with open(self.arquivo_sinal, 'w') as arquivo:
+                    arquivo.write(f'#{secrets.token_hex(8)}\n{linha}')
+            else:
+                with open(self.arquivo_sinal, 'a') as arquivo:
+                    arquivo.write(linha)
+        except OSError:
+            logger.warning('Não foi possível gravar o arquivo de sinal %s', self.arquivo_sinal)
+
+    def aguardar(self, inscricao, timeout):
+        """
+        Bloqueia até uma publicação atingir a inscrição ou o timeout expirar.
+        Retorna True se foi acordada.
+        """
+        self._iniciar_observador()
+        if inscricao.evento.wait(timeout):
+            inscricao.evento.clear()
+            return True
+        return False
+
+    def abrir(self):
+        """Reserva uma vaga de stream; levanta StreamLimitReached se não houver"""
+        if not self._slots.acquire(blocking=False):
+            raise StreamLimitReached('Limite de conexões de notificações atingido')
+        with self._lock:
+            self._abertos += 1
+
+    def fechar(self):
+        with self._lock:
+            self._abertos -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'abertos': self._abertos,
+                'inscricoes': len(self._inscricoes),
+                'max_streams': self.max_streams,
+                'versao': self.versao
+            }
+
+    def _iniciar_observador(self):
+        """Thread (uma por processo) que lê os sinais dos outros workers"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+
+        def observar():
+            posicao = self._posicao_inicial()
+            ultimo = self._mtime()
+            while True:
+                time.sleep(self.intervalo_sinal)
+                atual = self._mtime()
+                if atual == ultimo:
+                    continue
+                ultimo = atual
+                try:
+                    posicao = self._ler_sinais(posicao)
+                except Exception:
+                    logger.exception('Falha ao ler o arquivo de sinal')
+                    posicao = self._posicao_inicial()
+                    self.publicar()
+
+        threading.Thread(target=observar, name='notification-signal', daemon=True).start()
+
+    def _posicao_inicial(self):
+        """(cabeçalho, deslocamento) do fim atual do arquivo de sinal"""
+        try:
+            with open(self.arquivo_sinal, 'rb') as arquivo:
+                cabecalho = arquivo.readline()
+                arquivo.seek(0, os.SEEK_END)
+                return (cabecalho if cabecalho.endswith(b'\n') else None), arquivo.tell()
+        except OSError:
+            return None, 0
+
+    def _ler_sinais(self, posicao):
+        """Publica os alvos das linhas novas de outros processos; retorna a nova posição"""
+        cabecalho, deslocamento = posicao
+        try:
+            with open(self.arquivo_sinal, 'rb') as arquivo:
+                atual = arquivo.readline()
+                if cabecalho and atual != cabecalho:
+                    # Arquivo truncado por outro escritor: linhas podem ter sido perdidas
+                    self.publicar()
+                    deslocamento = len(atual) if atual.endswith(b'\n') else 0
+                cabecalho = atual if atual.endswith(b'\n') else None
+                arquivo.seek(deslocamento)
+                novos = arquivo.read()
+        except FileNotFoundError:
+            return None, 0
+
+        # Só linhas completas; o restante é lido na próxima rodada
+        completos = novos[:novos.rfind(b'\n') + 1]
+        alvos = set()
+        for linha in completos.splitlines():
+            if not linha or linha.startswith(b'#'):
+                continue
+            try:
+                sinal = json.loads(linha)
+            except ValueError:
+                alvos.add(TODOS)
+                continue
+            if sinal.get('pid') != os.getpid():
+                alvos.update(sinal.get('alvos') or (TODOS,))
+        if alvos:
+            self.publicar(alvos)
+        return cabecalho, deslocamento + len(completos)
+
+    def _tamanho(self):
+        try:
+            return os.stat(self.arquivo_sinal).st_size
+        except OSError:
+            return 0
+
+    def _mtime(self):
+        try:
+            return os.stat(self.arquivo_sinal).st_mtime_ns
+        except OSError:
+            return None
+
+def limite_streams(config):
+    """
+    Streams simultâneos por worker: as threads do worker (GUNICORN_THREADS) menos
+    a reserva para os demais endpoints (SSE_RESERVED_THREADS). SSE_MAX_STREAMS
+    pode baixar o teto, nunca ultrapassá-lo.
+    """
+    teto = max(config.get('GUNICORN_THREADS', 16) - config.get('SSE_RESERVED_THREADS', 8), 0)
+    configurado = config.get('SSE_MAX_STREAMS')
+    if configurado is None:
+        return teto
+    if configurado > teto:
+        logger.warning(
+            'SSE_MAX_STREAMS=%s deixaria menos de %s threads livres por worker; usando %s',
+            configurado, config.get('SSE_RESERVED_THREADS', 8), teto
+        )
+        return teto
+    return max(configurado, 0)
+
+def get_broadcaster(app=None):
+    """Retorna o broadcaster da aplicação (criado sob demanda)"""
+    app = app or current_app
+    broadcaster = app.extensions.get('notification_broadcaster')
+    if broadcaster is None:
+        broadcaster = NotificationBroadcaster(
+            app.config.get('SSE_SIGNAL_FILE') or os.path.join(
+                tempfile.gettempdir(), 'ativflow-notificacoes.signal'
+            ),
+            max_streams=limite_streams(app.config)
+        )
+        app.extensions['notification_broadcaster'] = broadcaster
+    return broadcaster
+
+def sinalizar_alteracao(usuarios=(), turmas=(), todos=False):
+    """
+    Marca a sessão atual com os alvos afetados: após o commit, só as conexões
+    de stream desses usuários/turmas (ou todas, com `todos`) serão acordadas.
+    """
+    alvos = db.session.info.setdefault('notificacoes_alteradas', set())
+    if todos:
+        alvos.add(TODOS)
+    alvos.update(alvo_usuario(usuario_id) for usuario_id in usuarios)
+    alvos.update(alvo_turma(turma) for turma in turmas if turma)
+
+@event.listens_for(Session, 'after_commit')
+def _acordar_streams(session):
+    alvos = session.info.pop('notificacoes_alteradas', None)
+    if not alvos:
+        return
+    if has_app_context():
+        get_broadcaster().sinalizar({TODOS} if TODOS in alvos else alvos)
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_sinal(session):
+    session.info.pop('notificacoes_alteradas', None)
+
+def _evento_sse(dados, evento=None, evento_id=None):
+    """Formata uma mensagem no protocolo text/event-stream"""
+    linhas = []
+    if evento_id is not None:
+        linhas.append(f'id: {evento_id}')
+    if evento:
+        linhas.append(f'event: {evento}')
+    linhas.append(f'data: {json.dumps(dados)}')
+    return '\n'.join(linhas) + '\n\n'
+
+def stream_notificacoes(app, usuario_id, ultimo_id=None):
+    """
+    Gerador do stream de um usuário. Envia `notificacao` (com id para o
+    Last-Event-ID), `nao_lidas` quando o contador muda e comentários de heartbeat.
+    Cada rodada abre e fecha seu próprio app context, sem segurar conexão do banco
+    enquanto espera. A vaga reservada com abrir() é liberada pela rota ao fechar a resposta.
+    """
+    from app.models.notificacao import Notificacao
+    from app.models.usuario import Usuario
+    from app.utils.notifications import consulta_caixa_entrada, contar_nao_lidas, turma_avisos
+
+    broadcaster = get_broadcaster(app)
+    heartbeat = app.config.get('SSE_HEARTBEAT_SECONDS', 20)
+    duracao_maxima = app.config.get('SSE_MAX_DURATION', 900)
+    fim = time.monotonic() + duracao_maxima
+    ultima_contagem = None
+
+    # Inscrita antes da primeira consulta: nenhuma alteração entre as rodadas se perde
+    inscricao = broadcaster.inscrever([alvo_usuario(usuario_id)])
+    try:
+        yield f"retry: {app.config.get('SSE_RETRY_MS', 5000)}\n\n"
+
+        while True:
+            with app.app_context():
+                usuario = db.session.get(Usuario, usuario_id)
+                if usuario is None or usuario.status != 'ativo':
+                    return
+
+                # A turma pode mudar durante a conexão
+                turma = turma_avisos(usuario)
+                inscricao.alvos = frozenset(
+                    [alvo_usuario(usuario_id)] + ([alvo_turma(turma)] if turma else [])
+                )
+
+                query, lida = consulta_caixa_entrada(usuario)
+                if ultimo_id is None:
+                    # Conexão nova: começar do presente, sem reenviar o histórico
+                    ultimo_id = query.with_entities(func.max(Notificacao.id)).scalar() or 0
+                    novas = []
+                else:
+                    novas = query.filter(Notificacao.id > ultimo_id).order_by(
+                        Notificacao.id
+                    ).limit(LIMITE_REENVIO).all()
+
+                mensagens = []
+                for notificacao, lida_usuario in novas:
+                    ultimo_id = notificacao.id
+                    mensagens.append(_evento_sse(
+                        notificacao.to_dict(lida=lida_usuario), 'notificacao', notificacao.id
+                    ))
+
+                contagem = contar_nao_lidas(usuario)
+                if contagem != ultima_contagem:
+                    ultima_contagem = contagem
+                    mensagens.append(_evento_sse({'count': contagem}, 'nao_lidas'))
+
+            for mensagem in mensagens:
+                yield mensagem
+
+            if len(novas) == LIMITE_REENVIO:
+                continue  # Ainda há notificações a reenviar
+
+            # Esperar uma alteração que atinja este usuário; sem alteração, manter a conexão viva
+            while True:
+                restante = fim - time.monotonic()
+                if restante <= 0:
+                    return  # O cliente reconecta com Last-Event-ID
+                if broadcaster.aguardar(inscricao, timeout=min(heartbeat, restante)):
+                    break
+                yield ': heartbeat\n\n'
+    finally:
+        broadcaster.cancelar(inscricao)
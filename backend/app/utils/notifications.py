@@ -2,9 +2,39 @@
 Utilitário para criação de notificações automáticas
 """
 from datetime import datetime, timedelta
+from sqlalchemy import insert, update, delete, select, exists, literal, case, and_, or_, func, event, inspect
+from sqlalchemy.exc import IntegrityError
 from app import db
-from app.models.notificacao import Notificacao
+from app.models.notificacao import Notificacao, NotificacaoLeitura, NotificacaoMarcador
 from app.models.usuario import Usuario
+from app.utils.outbox import enfileirar_notificacao
+from app.utils.notification_stream import sinalizar_alteracao
+
+def _incrementar_nao_lidas(*filtros):
+    """
+    Soma 1 ao contador de não lidas dos marcadores selecionados (um UPDATE).
+    Usuários sem marcador têm o contador calculado na primeira leitura.
+    Quem chama sinaliza os alvos afetados (sinalizar_alteracao).
+    """
+    db.session.execute(
+        update(NotificacaoMarcador)
+        .where(*filtros)
+        .values(nao_lidas=NotificacaoMarcador.nao_lidas + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def _decrementar_nao_lidas(usuario_id, quantidade=1):
+    """Subtrai do contador de não lidas de um usuário (sem ficar negativo)"""
+    sinalizar_alteracao(usuarios=[usuario_id])
+    db.session.execute(
+        update(NotificacaoMarcador)
+        .where(NotificacaoMarcador.usuario_id == usuario_id, NotificacaoMarcador.nao_lidas > 0)
+        .values(nao_lidas=case(
+            (NotificacaoMarcador.nao_lidas > quantidade, NotificacaoMarcador.nao_lidas - quantidade),
+            else_=0
+        ))
+        .execution_options(synchronize_session=False)
+    )
 
 def criar_notificacao(usuario_id, titulo, mensagem, tipo='info'):
     """
@@ -17,6 +47,8 @@ def criar_notificacao(usuario_id, titulo, mensagem, tipo='info'):
         tipo=tipo
     )
     db.session.add(notificacao)
+    _incrementar_nao_lidas(NotificacaoMarcador.usuario_id == usuario_id)
+    sinalizar_alteracao(usuarios=[usuario_id])
     db.session.commit()
     return notificacao
 
@@ -31,98 +63,405 @@ def criar_notificacao_global(titulo, mensagem, tipo='info'):
         tipo=tipo
     )
     db.session.add(notificacao)
+    _incrementar_nao_lidas()
+    sinalizar_alteracao(todos=True)
     db.session.commit()
     return notificacao
 
-def notificar_turma(turma, titulo, mensagem, tipo='info'):
+def criar_notificacoes_em_lote(usuario_ids, titulo, mensagem, tipo='info', commit=True):
+    """
+    Cria a mesma notificação para vários usuários num único INSERT em lote.
+    Retorna a quantidade de notificações criadas.
+    """
+    usuario_ids = list(dict.fromkeys(usuario_ids))  # Remove duplicados mantendo a ordem
+    
+    if not usuario_ids:
+        return 0
+    
+    agora = datetime.utcnow()
+    db.session.execute(insert(Notificacao), [
+        {
+            'usuario_id': usuario_id,
+            'titulo': titulo,
+            'mensagem': mensagem,
+            'tipo': tipo,
+            'lida': False,
+            'data_envio': agora
+        }
+        for usuario_id in usuario_ids
+    ])
+    _incrementar_nao_lidas(NotificacaoMarcador.usuario_id.in_(usuario_ids))
+    sinalizar_alteracao(usuarios=usuario_ids)
+    
+    if commit:
+        db.session.commit()
+    
+    return len(usuario_ids)
+
+def criar_notificacao_turma(turma, titulo, mensagem, tipo='info', commit=True):
+    """
+    Cria um aviso para a turma, gravado uma única vez (lido por cada aluno
+    através da caixa de entrada). Retorna a quantidade de linhas criadas.
+    """
+    notificacao = Notificacao(
+        usuario_id=None,
+        turma=turma,
+        titulo=titulo,
+        mensagem=mensagem,
+        tipo=tipo
+    )
+    db.session.add(notificacao)
+    _incrementar_nao_lidas(NotificacaoMarcador.usuario_id.in_(
+        select(Usuario.id).where(Usuario.turma == turma, Usuario.tipo == 'aluno', Usuario.status == 'ativo')
+    ))
+    sinalizar_alteracao(turmas=[turma])
+    
+    if commit:
+        db.session.commit()
+    
+    return 1
+
+def notificar_turma(turma, titulo, mensagem, tipo='info', commit=True):
+    """
+    Cria um aviso para todos os alunos de uma turma.
+    """
+    return criar_notificacao_turma(turma, titulo, mensagem, tipo, commit=commit)
+
+def turma_avisos(usuario):
+    """Turma cujos avisos o usuário recebe: só alunos ativos (None para os demais)"""
+    if usuario.tipo == 'aluno' and usuario.status == 'ativo':
+        return usuario.turma
+    return None
+
+def filtro_caixa_entrada(usuario):
+    """
+    Condição das notificações visíveis ao usuário: pessoais, da sua turma
+    (alunos ativos) e globais. Cada ramo usa o índice de usuario_id ou de turma.
+    """
+    condicoes = [
+        Notificacao.usuario_id == usuario.id,
+        and_(Notificacao.usuario_id.is_(None), Notificacao.turma.is_(None))
+    ]
+    turma = turma_avisos(usuario)
+    if turma:
+        condicoes.append(and_(Notificacao.usuario_id.is_(None), Notificacao.turma == turma))
+    return or_(*condicoes)
+
+def marca_leitura(usuario_id):
+    """Id até o qual todas as notificações do usuário estão lidas"""
+    marcador = db.session.get(NotificacaoMarcador, usuario_id)
+    return marcador.lidas_ate_id if marcador else 0
+
+def consulta_caixa_entrada(usuario):
+    """
+    Consulta (Notificacao, lida) da caixa de entrada do usuário.
+    Uma notificação está lida se tiver a flag (pessoais), estiver abaixo do
+    marcador do usuário ou tiver recibo de leitura.
+    Retorna a consulta e a expressão de leitura (para filtrar por lida).
+    """
+    lida = or_(
+        Notificacao.lida == True,
+        Notificacao.id <= marca_leitura(usuario.id),
+        NotificacaoLeitura.notificacao_id.isnot(None)
+    )
+    query = db.session.query(Notificacao, lida.label('lida_usuario')).outerjoin(
+        NotificacaoLeitura,
+        and_(
+            NotificacaoLeitura.notificacao_id == Notificacao.id,
+            NotificacaoLeitura.usuario_id == usuario.id
+        )
+    ).filter(filtro_caixa_entrada(usuario))
+    return query, lida
+
+def marcar_notificacao_lida(notificacao, usuario):
+    """
+    Marca uma notificação como lida para o usuário.
+    Pessoais usam a flag; compartilhadas ganham um recibo (se acima do marcador).
+    """
+    if notificacao.usuario_id:
+        if not notificacao.lida:
+            notificacao.lida = True
+            _decrementar_nao_lidas(usuario.id)
+    elif notificacao.id > marca_leitura(usuario.id):
+        if not db.session.get(NotificacaoLeitura, (notificacao.id, usuario.id)):
+            db.session.add(NotificacaoLeitura(notificacao_id=notificacao.id, usuario_id=usuario.id))
+            _decrementar_nao_lidas(usuario.id)
+    db.session.commit()
+
+def marcar_todas_notificacoes_lidas(usuario):
+    """
+    Avança o marcador do usuário até a notificação mais recente visível,
+    marca as pessoais e descarta os recibos que o marcador passou a cobrir.
+    """
+    maximo = db.session.query(func.max(Notificacao.id)).filter(filtro_caixa_entrada(usuario)).scalar()
+    if not maximo:
+        return
+    
+    marcador = db.session.get(NotificacaoMarcador, usuario.id)
+    if marcador is None:
+        marcador = NotificacaoMarcador(usuario_id=usuario.id, lidas_ate_id=0)
+        db.session.add(marcador)
+    marcador.lidas_ate_id = max(marcador.lidas_ate_id or 0, maximo)
+    marcador.nao_lidas = 0
+    sinalizar_alteracao(usuarios=[usuario.id])
+    
+    Notificacao.query.filter_by(usuario_id=usuario.id, lida=False).update({'lida': True})
+    NotificacaoLeitura.query.filter(
+        NotificacaoLeitura.usuario_id == usuario.id,
+        NotificacaoLeitura.notificacao_id <= marcador.lidas_ate_id
+    ).delete(synchronize_session=False)
+    
+    db.session.commit()
+
+def contar_nao_lidas(usuario):
     """
-    Cria notificações para todos os alunos de uma turma.
+    Quantidade de notificações não lidas do usuário (leitura por chave primária).
+    Se o contador ainda não existir ou tiver sido invalidado, é calculado e gravado.
     """
-    alunos = Usuario.query.filter_by(turma=turma, tipo='aluno', status='ativo').all()
+    marcador = db.session.get(NotificacaoMarcador, usuario.id)
+    if marcador is not None and marcador.nao_lidas is not None:
+        return marcador.nao_lidas
     
-    for aluno in alunos:
-        criar_notificacao(aluno.id, titulo, mensagem, tipo)
+    if marcador is None:
+        db.session.add(NotificacaoMarcador(usuario_id=usuario.id, lidas_ate_id=0))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Outra requisição criou o marcador ao mesmo tempo
+            db.session.rollback()
+    
+    # Contagem e gravação num único UPDATE condicional: um incremento que chegue
+    # depois encontra o contador preenchido; se outra requisição gravou antes,
+    # nada é sobrescrito e o valor dela é lido de volta
+    query, lida = consulta_caixa_entrada(usuario)
+    total = query.filter(~lida).with_entities(func.count(Notificacao.id)).order_by(None).scalar_subquery()
+    db.session.execute(
+        update(NotificacaoMarcador)
+        .where(NotificacaoMarcador.usuario_id == usuario.id, NotificacaoMarcador.nao_lidas.is_(None))
+        .values(nao_lidas=total)
+        .execution_options(synchronize_session=False)
+    )
+    nao_lidas = db.session.scalar(
+        select(NotificacaoMarcador.nao_lidas).where(NotificacaoMarcador.usuario_id == usuario.id)
+    )
+    db.session.commit()
+    return nao_lidas
 
-def notificar_nova_atividade(atividade):
+def recalcular_contadores_nao_lidas():
+    """
+    Recalcula em lote o contador de não lidas de todos os usuários
+    (reparo de consistência). Retorna a quantidade de marcadores atualizados.
+    """
+    marcador = NotificacaoMarcador.__table__
+    notificacao = Notificacao.__table__
+    leitura = NotificacaoLeitura.__table__
+    usuario = Usuario.__table__
+    
+    # Um marcador por usuário
+    db.session.execute(insert(marcador).from_select(
+        ['usuario_id', 'lidas_ate_id'],
+        select(usuario.c.id, literal(0)).where(
+            ~exists().where(marcador.c.usuario_id == usuario.c.id)
+        )
+    ))
+    
+    # Turma só para alunos ativos (mesma regra de turma_avisos)
+    turma_usuario = select(usuario.c.turma).where(
+        usuario.c.id == marcador.c.usuario_id,
+        usuario.c.tipo == 'aluno',
+        usuario.c.status == 'ativo'
+    ).correlate(marcador).scalar_subquery()
+    
+    # Mesma regra de consulta_caixa_entrada, correlacionada por marcador
+    nao_lidas = select(func.count(notificacao.c.id)).where(
+        or_(
+            notificacao.c.usuario_id == marcador.c.usuario_id,
+            and_(
+                notificacao.c.usuario_id.is_(None),
+                or_(notificacao.c.turma.is_(None), notificacao.c.turma == turma_usuario)
+            )
+        ),
+        notificacao.c.lida == False,
+        notificacao.c.id > marcador.c.lidas_ate_id,
+        ~exists().where(
+            leitura.c.notificacao_id == notificacao.c.id,
+            leitura.c.usuario_id == marcador.c.usuario_id
+        ).correlate(notificacao, marcador)
+    ).scalar_subquery()
+    
+    atualizados = db.session.execute(update(marcador).values(nao_lidas=nao_lidas)).rowcount
+    db.session.commit()
+    return atualizados
+
+@event.listens_for(Usuario, 'after_update')
+def _turma_alterada(mapper, connection, target):
+    """Ao mudar de turma, tipo ou status os avisos visíveis mudam: invalida o contador do usuário"""
+    atributos = inspect(target).attrs
+    if any(getattr(atributos, nome).history.has_changes() for nome in ('turma', 'tipo', 'status')):
+        connection.execute(
+            update(NotificacaoMarcador.__table__)
+            .where(NotificacaoMarcador.__table__.c.usuario_id == target.id)
+            .values(nao_lidas=None)
+        )
+
+def notificar_nova_atividade(atividade, commit=False):
     """
     Notifica alunos sobre uma nova atividade criada.
+    Apenas enfileira o evento; o dispatcher da outbox cria as notificações.
     """
     titulo = f"Nova atividade: {atividade.titulo}"
     mensagem = f"Uma nova atividade foi criada. Prazo: {atividade.prazo.strftime('%d/%m/%Y %H:%M')}"
     
     if atividade.turma:
-        notificar_turma(atividade.turma, titulo, mensagem, tipo='info')
+        enfileirar_notificacao('turma', {
+            'turma': atividade.turma,
+            'titulo': titulo,
+            'mensagem': mensagem,
+            'tipo': 'info'
+        }, commit=commit)
 
-def notificar_entrega_recebida(entrega, professor_id):
+def notificar_entrega_recebida(entrega, professor_id, commit=False):
     """
-    Notifica o professor sobre uma nova entrega.
+    Notifica o professor sobre uma nova entrega (via outbox).
     """
     titulo = "Nova entrega recebida"
     mensagem = f"Uma nova entrega foi enviada para a atividade '{entrega.atividade.titulo}'"
-    criar_notificacao(professor_id, titulo, mensagem, tipo='info')
+    enfileirar_notificacao('usuarios', {
+        'usuario_ids': [professor_id],
+        'titulo': titulo,
+        'mensagem': mensagem,
+        'tipo': 'info'
+    }, commit=commit)
 
-def notificar_avaliacao_concluida(entrega):
+def notificar_avaliacao_concluida(entrega, commit=False):
     """
-    Notifica o aluno ou grupo sobre avaliação concluída.
+    Notifica o aluno ou grupo sobre avaliação concluída (via outbox).
     """
     titulo = "Atividade avaliada"
     mensagem = f"Sua entrega da atividade '{entrega.atividade.titulo}' foi avaliada. Nota: {entrega.nota}"
+    conteudo = {'titulo': titulo, 'mensagem': mensagem, 'tipo': 'info'}
     
     if entrega.aluno_id:
-        criar_notificacao(entrega.aluno_id, titulo, mensagem, tipo='info')
+        enfileirar_notificacao('usuarios', {'usuario_ids': [entrega.aluno_id], **conteudo}, commit=commit)
     elif entrega.grupo_id:
-        # Notificar todos os membros do grupo
-        for membro in entrega.grupo.membros:
-            criar_notificacao(membro.aluno_id, titulo, mensagem, tipo='info')
+        # Membros do grupo são resolvidos pelo dispatcher
+        enfileirar_notificacao('grupo', {'grupo_id': entrega.grupo_id, **conteudo}, commit=commit)
 
-def notificar_prazo_proximo(atividade):
+def notificar_prazo_proximo(atividade, commit=True):
     """
-    Notifica alunos sobre prazo próximo (48h).
+    Notifica alunos sobre prazo próximo.
     """
     titulo = f"Prazo próximo: {atividade.titulo}"
     mensagem = f"Atenção! O prazo da atividade '{atividade.titulo}' termina em {atividade.prazo.strftime('%d/%m/%Y %H:%M')}"
     
     if atividade.turma:
-        notificar_turma(atividade.turma, titulo, mensagem, tipo='prazo')
+        return notificar_turma(atividade.turma, titulo, mensagem, tipo='prazo', commit=commit)
+    return 0
 
-def verificar_prazos_proximos():
+def verificar_prazos_proximos(janelas=(48,)):
     """
-    Verifica atividades com prazo próximo (48h) e cria notificações.
-    Esta função deve ser executada periodicamente (cron/scheduler).
+    Envia os lembretes de prazo ainda não enviados e retorna quantos foram criados.
+    Cada lembrete é registrado em LembretePrazo por (atividade, janela), então
+    execuções repetidas não reenviam nada. Executado pelo agendador
+    (ver app.utils.scheduler) ou por `flask lembretes-prazo`.
+    
+    janelas: antecedências em horas (ex.: (48, 24)). Uma atividade que já está
+    dentro de várias janelas recebe só o lembrete da menor.
     """
     from app.models.atividade import Atividade
+    from app.models.lembrete_prazo import LembretePrazo
     
     agora = datetime.utcnow()
-    limite = agora + timedelta(hours=48)
+    enviados = set()
+    total = 0
+    
+    for horas in sorted(janelas):
+        janela = f'{horas}h'
+        
+        # Atividades na janela sem lembrete registrado (índice de prazo + PK do registro)
+        atividades = Atividade.query.filter(
+            Atividade.prazo >= agora,
+            Atividade.prazo <= agora + timedelta(hours=horas),
+            Atividade.ativo == True,
+            Atividade.turma.isnot(None),
+            ~exists().where(
+                LembretePrazo.atividade_id == Atividade.id,
+                LembretePrazo.janela == janela
+            )
+        ).all()
+        
+        for atividade in atividades:
+            db.session.add(LembretePrazo(atividade_id=atividade.id, janela=janela))
+            if atividade.id not in enviados:
+                enviados.add(atividade.id)
+                total += notificar_prazo_proximo(atividade, commit=False)
     
-    # Buscar atividades com prazo nas próximas 48h
-    atividades = Atividade.query.filter(
-        Atividade.prazo >= agora,
-        Atividade.prazo <= limite,
-        Atividade.ativo == True
-    ).all()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Outra execução registrou os mesmos lembretes primeiro
+        db.session.rollback()
+        return 0
     
-    for atividade in atividades:
-        # Verificar se já foi enviada notificação (evitar duplicatas)
-        # Aqui poderíamos adicionar uma flag na atividade ou verificar notificações existentes
-        notificar_prazo_proximo(atividade)
+    return total
 
-def limpar_notificacoes_antigas(dias=30):
+def limpar_notificacoes_antigas(dias=30, lote=1000, reportar=None):
     """
-    Remove notificações com mais de X dias.
+    Remove notificações com mais de X dias em lotes de `lote` linhas, cada lote
+    em sua própria transação (locks curtos, memória constante). Usa o índice de
+    data_envio; nenhuma notificação é carregada como objeto.
+    `reportar(removidas)` é chamado após cada lote. Retorna o total removido.
     """
     limite = datetime.utcnow() - timedelta(days=dias)
+    total = 0
+    contadores_invalidados = False
     
-    notificacoes_antigas = Notificacao.query.filter(
-        Notificacao.data_envio < limite
-    ).all()
-    
-    count = len(notificacoes_antigas)
-    
-    for notificacao in notificacoes_antigas:
-        db.session.delete(notificacao)
-    
-    db.session.commit()
-    
-    return count
-
+    while True:
+        # Ids do lote lidos uma vez: contadores, recibos e remoção tratam as mesmas linhas
+        lote_ids = db.session.scalars(
+            select(Notificacao.id).where(
+                Notificacao.data_envio < limite
+            ).order_by(Notificacao.data_envio, Notificacao.id).limit(lote)
+        ).all()
+        if not lote_ids:
+            return total
+        
+        # Contadores: pessoais não lidas são descontadas; avisos compartilhados
+        # invalidam os contadores (recalculados na próxima leitura)
+        nao_lidas_por_usuario = db.session.query(
+            Notificacao.usuario_id, func.count(Notificacao.id)
+        ).filter(
+            Notificacao.id.in_(lote_ids),
+            Notificacao.usuario_id.isnot(None),
+            Notificacao.lida == False
+        ).group_by(Notificacao.usuario_id).all()
+        for usuario_id, quantidade in nao_lidas_por_usuario:
+            _decrementar_nao_lidas(usuario_id, quantidade)
+        
+        if not contadores_invalidados and db.session.query(
+            exists().where(Notificacao.id.in_(lote_ids), Notificacao.usuario_id.is_(None))
+        ).scalar():
+            contadores_invalidados = True
+            sinalizar_alteracao(todos=True)
+            db.session.execute(
+                update(NotificacaoMarcador)
+                .values(nao_lidas=None)
+                .execution_options(synchronize_session=False)
+            )
+        
+        # Recibos de leitura dos avisos removidos e depois as notificações
+        db.session.execute(
+            delete(NotificacaoLeitura).where(NotificacaoLeitura.notificacao_id.in_(lote_ids))
+            .execution_options(synchronize_session=False)
+        )
+        removidas = db.session.execute(
+            delete(Notificacao).where(Notificacao.id.in_(lote_ids))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        
+        total += removidas
+        if reportar:
+            reportar(total)
+        if len(lote_ids) < lote:
+            return total
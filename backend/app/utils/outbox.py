@@ -0,0 +1,241 @@
+"""
+Outbox transacional de notificações.
+
+As rotas apenas gravam um EventoNotificacao na mesma transação da operação
+(criar atividade, entregar, avaliar...). Um dispatcher expande cada evento
+em linhas de Notificacao com um INSERT em lote, fora do caminho da requisição.
+
+Modos (NOTIFICATION_DISPATCHER):
+    thread   - pool de threads em cada processo web, acordado após o commit
+    external - o processo web só enfileira; `flask notificacoes-worker` processa
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, or_, and_, select, delete
+from sqlalchemy.orm import Session
+from app import db
+from app.models.evento_notificacao import EventoNotificacao
+
+logger = logging.getLogger(__name__)
+
+# Tentativas antes de marcar o evento como erro
+MAX_TENTATIVAS = 5
+
+# Eventos "processando" há mais tempo que isso são considerados abandonados
+# (dispatcher morreu no meio) e podem ser reivindicados de novo
+TEMPO_RECUPERACAO = timedelta(minutes=5)
+
+def enfileirar_notificacao(tipo, payload, commit=False):
+    """
+    Adiciona um evento à outbox na sessão atual.
+    Por padrão não faz commit: o evento é gravado junto com a operação da rota.
+    """
+    evento = EventoNotificacao(tipo=tipo, status='pendente', tentativas=0)
+    evento.set_payload(payload)
+    db.session.add(evento)
+    db.session.info['outbox_pendente'] = True
+
+    if commit:
+        db.session.commit()
+
+    return evento
+
+def _destinatarios(evento):
+    """Resolve a lista de usuários de um evento"""
+    from app.models.grupo import GrupoMembro
+
+    payload = evento.get_payload()
+
+    if evento.tipo == 'grupo':
+        return [
+            aluno_id for (aluno_id,) in
+            db.session.query(GrupoMembro.aluno_id).filter_by(grupo_id=payload['grupo_id'])
+        ]
+    if evento.tipo == 'usuarios':
+        return payload.get('usuario_ids', [])
+
+    raise ValueError(f'Tipo de evento desconhecido: {evento.tipo}')
+
+def _reivindicar(evento_id):
+    """
+    Marca o evento como 'processando' se ninguém o pegou antes.
+    O UPDATE condicional funciona como lock otimista entre threads e processos.
+    """
+    agora = datetime.utcnow()
+    reivindicado = EventoNotificacao.query.filter(
+        EventoNotificacao.id == evento_id,
+        or_(
+            EventoNotificacao.status == 'pendente',
+            and_(
+                EventoNotificacao.status == 'processando',
+                EventoNotificacao.bloqueado_em < agora - TEMPO_RECUPERACAO
+            )
+        )
+    ).update({
+        'status': 'processando',
+        'bloqueado_em': agora,
+        'tentativas': EventoNotificacao.tentativas + 1
+    }, synchronize_session=False)
+    db.session.commit()
+    return reivindicado == 1
+
+def processar_evento(evento):
+    """Expande um evento reivindicado em notificações (um INSERT em lote)"""
+    from app.utils.notifications import criar_notificacoes_em_lote, criar_notificacao_turma
+
+    payload = evento.get_payload()
+    conteudo = (payload['titulo'], payload['mensagem'], payload.get('tipo', 'info'))
+
+    if evento.tipo == 'turma':
+        # Avisos de turma são gravados uma vez e lidos por cada aluno na caixa de entrada
+        criadas = criar_notificacao_turma(payload['turma'], *conteudo, commit=False)
+    else:
+        criadas = criar_notificacoes_em_lote(_destinatarios(evento), *conteudo, commit=False)
+    evento.status = 'concluido'
+    evento.processado_em = datetime.utcnow()
+    evento.erro = None
+    db.session.commit()
+    return criadas
+
+def processar_outbox(lote=100):
+    """
+    Processa até `lote` eventos pendentes, cada um em sua própria transação.
+    Retorna (eventos processados, notificações criadas).
+    """
+    limite_recuperacao = datetime.utcnow() - TEMPO_RECUPERACAO
+    ids = [
+        evento_id for (evento_id,) in db.session.query(EventoNotificacao.id).filter(
+            or_(
+                EventoNotificacao.status == 'pendente',
+                and_(
+                    EventoNotificacao.status == 'processando',
+                    EventoNotificacao.bloqueado_em < limite_recuperacao
+                )
+            )
+        ).order_by(EventoNotificacao.id).limit(lote)
+    ]
+    db.session.commit()
+
+    eventos = 0
+    notificacoes = 0
+    for evento_id in ids:
+        if not _reivindicar(evento_id):
+            continue  # Outro dispatcher pegou primeiro
+
+        evento = db.session.get(EventoNotificacao, evento_id)
+        try:
+            notificacoes += processar_evento(evento)
+            eventos += 1
+        except Exception as e:
+            db.session.rollback()
+            evento = db.session.get(EventoNotificacao, evento_id)
+            evento.status = 'erro' if evento.tentativas >= MAX_TENTATIVAS else 'pendente'
+            evento.erro = str(e)
+            db.session.commit()
+            logger.exception('Falha ao processar evento de notificação %s', evento_id)
+
+    return eventos, notificacoes
+
+def limpar_eventos_concluidos(lote=1000):
+    """
+    Remove em lotes os eventos concluídos há mais de NOTIFICATION_OUTBOX_RETENTION,
+    cada lote em sua própria transação. Eventos com erro ficam para inspeção.
+    Retorna o total removido.
+    """
+    tabela = EventoNotificacao.__table__
+    limite = datetime.utcnow() - current_app.config['NOTIFICATION_OUTBOX_RETENTION']
+    total = 0
+
+    while True:
+        ids = select(tabela.c.id).where(
+            tabela.c.status == 'concluido', tabela.c.processado_em < limite
+        ).limit(lote)
+        with db.engine.begin() as conn:
+            removidos = conn.execute(delete(tabela).where(tabela.c.id.in_(ids))).rowcount
+        total += removidos
+        if removidos < lote:
+            return total
+
+
+class OutboxDispatcher:
+    """
+    Pool de threads que drena a outbox dentro do processo web.
+    As threads dormem até o próximo commit com eventos (ou até o intervalo de
+    varredura, para pegar eventos de outros processos e reprocessar falhas).
+    """
+
+    def __init__(self, app, workers=2, intervalo=5, lote=100):
+        self.app = app
+        self.workers = workers
+        self.intervalo = intervalo
+        self.lote = lote
+        self._acordar = threading.Event()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Inicia as threads (uma vez por processo, depois do fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._acordar = threading.Event()
+            for i in range(self.workers):
+                threading.Thread(
+                    target=self._executar,
+                    name=f'notification-outbox-{i}',
+                    daemon=True
+                ).start()
+
+    def acordar(self):
+        """Sinaliza que há eventos novos"""
+        self.iniciar()
+        self._acordar.set()
+
+    def _executar(self):
+        while True:
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            try:
+                with self.app.app_context():
+                    while True:
+                        eventos, notificacoes = processar_outbox(lote=self.lote)
+                        if eventos:
+                            logger.debug('%d eventos expandidos em %d notificações', eventos, notificacoes)
+                        if eventos < self.lote:
+                            break
+                    db.session.remove()
+            except Exception:
+                logger.exception('Falha no dispatcher de notificações')
+
+def init_outbox(app):
+    """Configura o dispatcher conforme NOTIFICATION_DISPATCHER"""
+    if app.config.get('NOTIFICATION_DISPATCHER', 'thread') != 'thread':
+        return
+    app.extensions['notification_outbox'] = OutboxDispatcher(
+        app,
+        workers=app.config.get('NOTIFICATION_DISPATCH_WORKERS', 2),
+        intervalo=app.config.get('NOTIFICATION_DISPATCH_INTERVAL', 5),
+        lote=app.config.get('NOTIFICATION_DISPATCH_BATCH', 100)
+    )
+
+@event.listens_for(Session, 'after_commit')
+def _acordar_dispatcher(session):
+    """Acorda o dispatcher quando um commit gravou eventos na outbox"""
+    if not session.info.pop('outbox_pendente', False):
+        return
+    from flask import current_app, has_app_context
+    if not has_app_context() or current_app.testing:
+        return  # Nos testes os eventos são processados explicitamente
+    dispatcher = current_app.extensions.get('notification_outbox')
+    if dispatcher is not None:
+        dispatcher.acordar()
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_sinal(session):
+    session.info.pop('outbox_pendente', None)
@@ -0,0 +1,123 @@
+"""
+Paginação das listagens: por página (paginate) ou por cursor (keyset).
+
+Modo página (padrão): ?page=2&per_page=20, com total e número de páginas.
+Modo cursor (opt-in): ?cursor= na primeira chamada e depois ?cursor=<next_cursor>.
+O cursor é opaco e guarda os valores da ordenação do último item (mais o id
+como desempate); a próxima página é um WHERE sobre esses valores, usando o
+índice, sem OFFSET. Em ambos os modos ?count=false dispensa o COUNT(*); no
+modo cursor o total só é calculado com ?count=true.
+"""
+import base64
+import json
+from datetime import date, datetime
+from flask import abort, jsonify, make_response, request
+from sqlalchemy import and_, or_
+from sqlalchemy.engine import Row
+
+# Limite de itens por página no modo cursor
+MAX_PER_PAGE = 100
+
+def _codificar_valor(valor):
+    if isinstance(valor, datetime):
+        return {'dt': valor.isoformat()}
+    if isinstance(valor, date):
+        return {'d': valor.isoformat()}
+    return valor
+
+def _decodificar_valor(valor):
+    if isinstance(valor, dict):
+        if 'dt' in valor:
+            return datetime.fromisoformat(valor['dt'])
+        if 'd' in valor:
+            return date.fromisoformat(valor['d'])
+        raise ValueError('Valor de cursor inválido')
+    return valor
+
+def codificar_cursor(valores):
+    """Codifica os valores de ordenação do último item num cursor opaco"""
+    bruto = json.dumps([_codificar_valor(v) for v in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(bruto.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decodificar_cursor(cursor, tamanho):
+    """Decodifica um cursor; levanta ValueError se estiver malformado"""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valores = [_decodificar_valor(v) for v in json.loads(bruto)]
+    except (ValueError, TypeError) as e:
+        raise ValueError('Cursor inválido') from e
+    if len(valores) != tamanho:
+        raise ValueError('Cursor inválido')
+    return valores
+
+def _depois_de(colunas, valores):
+    """
+    Condição keyset "depois do cursor" para ordenações mistas (asc/desc):
+    (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ...
+    """
+    condicoes = []
+    for i, (coluna, direcao) in enumerate(colunas):
+        iguais = [c == v for (c, _), v in zip(colunas[:i], valores[:i])]
+        passo = coluna > valores[i] if direcao == 'asc' else coluna < valores[i]
+        condicoes.append(and_(*iguais, passo))
+    return or_(*condicoes)
+
+def _valor_ordenacao(linha, coluna):
+    if isinstance(linha, Row):
+        # Linha de colunas projetadas: valor pelo nome da coluna.
+        # Consultas com várias entidades (ex.: (Notificacao, lida)) ordenam pela primeira
+        if coluna.key in linha._fields:
+            return getattr(linha, coluna.key)
+        linha = linha[0]
+    return getattr(linha, coluna.key)
+
+def paginar(query, ordem, id_coluna):
+    """
+    Aplica a ordenação e pagina a consulta conforme os parâmetros da requisição.
+
+    ordem: lista de (coluna, 'asc'|'desc'); id_coluna é acrescentada como desempate.
+    Retorna (itens, meta), onde meta vai direto para o JSON de resposta.
+    """
+    colunas = list(ordem) + [(id_coluna, ordem[-1][1] if ordem else 'asc')]
+    query = query.order_by(*[c.asc() if d == 'asc' else c.desc() for c, d in colunas])
+
+    per_page = request.args.get('per_page', 20, type=int)
+    contar = request.args.get('count')
+
+    if 'cursor' not in request.args:
+        paginado = query.paginate(
+            page=request.args.get('page', 1, type=int),
+            per_page=per_page,
+            error_out=False,
+            count=contar != 'false'
+        )
+        return paginado.items, {
+            'total': paginado.total,
+            'page': paginado.page,
+            'per_page': per_page,
+            'pages': paginado.pages
+        }
+
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    meta = {'per_page': per_page}
+    if contar == 'true':
+        meta['total'] = query.order_by(None).count()
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            valores = decodificar_cursor(cursor, len(colunas))
+        except ValueError:
+            abort(make_response(jsonify({'ok': False, 'error': 'Cursor inválido'}), 400))
+        query = query.filter(_depois_de(colunas, valores))
+
+    # Um item a mais indica se há próxima página, sem COUNT
+    itens = query.limit(per_page + 1).all()
+    tem_mais = len(itens) > per_page
+    itens = itens[:per_page]
+
+    meta['has_more'] = tem_mais
+    meta['next_cursor'] = codificar_cursor(
+        [_valor_ordenacao(itens[-1], c) for c, _ in colunas]
+    ) if tem_mais else None
+    return itens, meta
@@ -0,0 +1,179 @@
+"""
+Limite de hashing de senhas compartilhado pelos workers do host.
+
+O pbkdf2 é CPU-bound; numa leva de logins simultâneos ele ocupa todos os
+núcleos e os demais endpoints param de responder. Cada hash precisa de uma
+vaga: as vagas são arquivos travados com flock, vistos por todos os workers
+do host (a trava some com o processo, então um worker morto não prende
+vaga). O hash roda na própria thread da requisição, que esperaria o
+resultado de qualquer forma; o limite só decide quem pode começar. Sem vaga
+livre em PASSWORD_HASH_WAIT segundos a requisição é recusada (503).
+
+Sem fcntl (Windows) as vagas valem apenas para o processo.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+DEFAULT_HASH_METHOD = 'pbkdf2:sha256:600000'
+
+# Intervalo entre tentativas de pegar uma vaga (segundos)
+INTERVALO_TENTATIVA = 0.01
+
+# Espera padrão do pool (PASSWORD_HASH_WAIT); None em run() aguarda sem limite
+_ESPERA_PADRAO = object()
+
+
+class HashingPoolBusy(Exception):
+    """Nenhuma vaga de hashing livre no host; a requisição deve ser recusada (503)"""
+
+
+class PasswordHashingPool:
+    """
+    Vagas de hashing por host (flock) com espera curta e métricas do processo.
+    O hashlib libera o GIL durante o pbkdf2, então hashes em threads diferentes
+    rodam em paralelo até o número de vagas.
+    """
+
+    def __init__(self, vagas=2, espera=0.2, diretorio=None):
+        self.vagas = vagas
+        self.espera = espera
+        self.diretorio = diretorio
+        self._lock = threading.Lock()
+        self._semaforo = threading.BoundedSemaphore(vagas) if fcntl is None or not diretorio else None
+        self._em_uso = 0
+        self._concluidos = 0
+        self._recusados = 0
+        self._espera_total = 0.0
+        if self._semaforo is None:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def _tentar_vaga(self):
+        """Descritor da vaga travada, True (semáforo do processo) ou None se todas ocupadas"""
+        if self._semaforo is not None:
+            return True if self._semaforo.acquire(blocking=False) else None
+        # Começa de uma vaga aleatória para não disputar sempre o primeiro arquivo
+        inicio = random.randrange(self.vagas)
+        for deslocamento in range(self.vagas):
+            caminho = os.path.join(self.diretorio, f'vaga-{(inicio + deslocamento) % self.vagas}.lock')
+            fd = os.open(caminho, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def _liberar(self, vaga):
+        if self._semaforo is not None:
+            self._semaforo.release()
+        else:
+            fcntl.flock(vaga, fcntl.LOCK_UN)
+            os.close(vaga)
+
+    def _adquirir(self, espera):
+        """Aguarda até `espera` segundos (None: sem limite) por uma vaga livre"""
+        inicio = time.monotonic()
+        while True:
+            vaga = self._tentar_vaga()
+            if vaga is not None:
+                with self._lock:
+                    self._em_uso += 1
+                    self._espera_total += time.monotonic() - inicio
+                return vaga
+            if espera is not None and time.monotonic() - inicio >= espera:
+                with self._lock:
+                    self._recusados += 1
+                raise HashingPoolBusy('Nenhuma vaga de hashing de senhas livre')
+            time.sleep(INTERVALO_TENTATIVA)
+
+    def run(self, fn, *args, espera=_ESPERA_PADRAO):
+        """
+        Executa fn(*args) na thread atual ocupando uma vaga.
+        Levanta HashingPoolBusy se nenhuma vaga liberar em `espera` segundos
+        (padrão: PASSWORD_HASH_WAIT; None aguarda sem limite).
+        """
+        vaga = self._adquirir(self.espera if espera is _ESPERA_PADRAO else espera)
+        try:
+            return fn(*args)
+        finally:
+            self._liberar(vaga)
+            with self._lock:
+                self._em_uso -= 1
+                self._concluidos += 1
+
+    def map(self, fn, itens):
+        """
+        Executa fn para cada item em paralelo (até o número de vagas), aguardando
+        vagas sem limite: para lotes fora do caminho das requisições (scripts).
+        """
+        with ThreadPoolExecutor(max_workers=self.vagas, thread_name_prefix='password-hash') as executor:
+            return list(executor.map(lambda item: self.run(fn, item, espera=None), itens))
+
+    def stats(self):
+        """Métricas do processo (as vagas são do host)"""
+        with self._lock:
+            return {
+                'vagas': self.vagas,
+                'compartilhadas': self._semaforo is None,
+                'espera_maxima_ms': round(self.espera * 1000),
+                'pendentes': self._em_uso,
+                'concluidos': self._concluidos,
+                'recusados': self._recusados,
+                'espera_media_ms': round(
+                    self._espera_total / self._concluidos * 1000, 2
+                ) if self._concluidos else 0
+            }
+
+def get_hashing_pool():
+    """Retorna as vagas de hashing da aplicação atual"""
+    pool = current_app.extensions.get('password_hashing_pool')
+    if pool is None:
+        pool = PasswordHashingPool(
+            vagas=current_app.config.get('PASSWORD_HASH_CONCURRENCY', 2),
+            espera=current_app.config.get('PASSWORD_HASH_WAIT', 0.2),
+            diretorio=current_app.config.get('PASSWORD_HASH_LOCK_DIR')
+        )
+        current_app.extensions['password_hashing_pool'] = pool
+    return pool
+
+def get_hash_method():
+    """Método de hash configurado (ex.: pbkdf2:sha256:600000)"""
+    if not has_app_context():
+        return DEFAULT_HASH_METHOD
+    return current_app.config.get('PASSWORD_HASH_METHOD', DEFAULT_HASH_METHOD)
+
+def gerar_hash(senha):
+    """Gera o hash da senha de forma síncrona com o método configurado"""
+    return generate_password_hash(senha, method=get_hash_method())
+
+def hash_senha(senha):
+    """Gera o hash da senha ocupando uma vaga de hashing"""
+    return get_hashing_pool().run(generate_password_hash, senha, get_hash_method())
+
+def hash_senhas(senhas):
+    """Gera hashes de várias senhas em paralelo (criação em lote)"""
+    metodo = get_hash_method()
+    return get_hashing_pool().map(
+        lambda senha: generate_password_hash(senha, method=metodo),
+        senhas
+    )
+
+def verificar_senha(senha_hash, senha):
+    """Verifica a senha ocupando uma vaga de hashing"""
+    return get_hashing_pool().run(check_password_hash, senha_hash, senha)
+
+def precisa_rehash(senha_hash):
+    """Indica se o hash foi gerado com parâmetros diferentes dos configurados"""
+    if not senha_hash or '$' not in senha_hash:
+        return True
+    return senha_hash.split('$', 1)[0] != get_hash_method()
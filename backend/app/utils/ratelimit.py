@@ -0,0 +1,140 @@
+"""
+Backend de armazenamento do Flask-Limiter compartilhado entre processos.
+
+Os contadores ficam num arquivo SQLite local (modo WAL), de modo que todos os
+workers do gunicorn no mesmo host enxergam os mesmos limites. Uso:
+
+    RATELIMIT_STORAGE_URI = 'sqlite:////tmp/ativflow-ratelimit.db'
+"""
+import os
+import sqlite3
+import threading
+import time
+from flask import request, session
+from flask_limiter.util import get_remote_address
+from limits.storage import Storage
+
+
+class SQLiteStorage(Storage):
+    """
+    Storage de rate limit em SQLite com incremento atômico e compactação
+    periódica das chaves expiradas.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+
+    # Intervalo mínimo (segundos) entre compactações de chaves expiradas
+    COMPACT_INTERVAL = 60
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        # sqlite:///relativo.db ou sqlite:////caminho/absoluto.db
+        self.path = uri.split('://', 1)[1][1:] or ':memory:'
+        self.timeout = float(options.get('timeout', 5))
+        self._local = threading.local()
+        self._last_compact = 0.0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._create_schema()
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        # Uma conexão por thread e por processo (as conexões não sobrevivem ao fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _create_schema(self):
+        diretorio = os.path.dirname(self.path)
+        if diretorio and self.path != ':memory:':
+            os.makedirs(diretorio, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS rate_limits ('
+            ' key TEXT PRIMARY KEY,'
+            ' count INTEGER NOT NULL,'
+            ' expiry REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_rate_limits_expiry ON rate_limits (expiry)')
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        """Incrementa o contador da chave, reiniciando-o se a janela expirou"""
+        agora = time.time()
+        expira_em = agora + expiry
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT INTO rate_limits (key, count, expiry) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET '
+                ' count = CASE WHEN rate_limits.expiry <= ? THEN excluded.count'
+                '              ELSE rate_limits.count + excluded.count END,'
+                ' expiry = CASE WHEN rate_limits.expiry <= ? OR ? THEN excluded.expiry'
+                '               ELSE rate_limits.expiry END',
+                (key, amount, expira_em, agora, agora, bool(elastic_expiry))
+            )
+            (count,) = conn.execute(
+                'SELECT count FROM rate_limits WHERE key = ?', (key,)
+            ).fetchone()
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._maybe_compact(agora)
+        return count
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT count FROM rate_limits WHERE key = ? AND expiry > ?',
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connection().execute(
+            'SELECT expiry FROM rate_limits WHERE key = ?', (key,)
+        ).fetchone()
+        return row[0] if row and row[0] > time.time() else time.time()
+
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        cursor = self._connection().execute('DELETE FROM rate_limits')
+        return cursor.rowcount
+
+    def clear(self, key):
+        self._connection().execute('DELETE FROM rate_limits WHERE key = ?', (key,))
+
+    def _maybe_compact(self, agora):
+        """Remove em lote as chaves expiradas, no máximo uma vez por intervalo"""
+        if agora - self._last_compact < self.COMPACT_INTERVAL:
+            return
+        self._last_compact = agora
+        self._connection().execute('DELETE FROM rate_limits WHERE expiry <= ?', (agora,))
+
+
+def chave_rate_limit():
+    """
+    Chave padrão dos limites: o usuário autenticado ou, na falta dele, o IP.
+    Evita que uma escola inteira atrás do mesmo NAT divida o mesmo contador.
+    """
+    if 'user_id' in session:
+        return f"user:{session['user_id']}"
+    return f"ip:{get_remote_address()}"
+
+def chave_login():
+    """Chave do limite de tentativas de login: IP + e-mail informado"""
+    data = request.get_json(silent=True) or {}
+    email = str(data.get('email', '')).strip().lower()
+    return f"login:{get_remote_address()}:{email}"
@@ -0,0 +1,149 @@
+"""
+Recorreção em lote quando o gabarito (resposta_correta ou pontuação) muda.
+
+As respostas das questões afetadas são carregadas como arrays e comparadas de
+forma vetorizada: cada resposta vira um bitset das alternativas marcadas (um
+bit por valor distinto da questão, mais um bit indicando resposta em lista, que
+distingue 'a' de ['a'] como na correção original). O acerto é a máscara
+`bitset da resposta == bitset do gabarito`; os pontos, `np.where(acerto, pontuação, 0)`.
+Só as linhas que mudaram são gravadas, com UPDATE em lote por chave primária,
+um lote por transação. Atividades grandes rodam como Tarefa em background
+(REGRADE_SYNC_LIMIT).
+"""
+import json
+import numpy as np
+from sqlalchemy import func, select, update
+from app import db
+from app.models.questao import Questao, Resposta
+from app.utils.response_cache import invalidar_cache
+
+# Bit reservado para respostas em lista (questões `multiple`)
+_BIT_LISTA = 0
+
+def _valores(resposta):
+    """(é lista, valores canônicos) de uma resposta ou gabarito decodificado"""
+    if isinstance(resposta, list):
+        return True, [json.dumps(item, sort_keys=True) for item in resposta]
+    return False, [json.dumps(resposta, sort_keys=True)]
+
+
+class _Codificador:
+    """Bitsets de uma questão: cada valor distinto ganha um bit, na ordem em que aparece"""
+
+    def __init__(self):
+        self.bits = {}
+
+    def codificar(self, resposta):
+        lista, valores = _valores(resposta)
+        bitset = 1 << _BIT_LISTA if lista else 0
+        for valor in valores:
+            bit = self.bits.setdefault(valor, len(self.bits) + 1)
+            bitset |= 1 << bit
+        return bitset
+
+def _decodificar(texto):
+    try:
+        return json.loads(texto) if texto else None
+    except ValueError:
+        return None
+
+def contar_respostas(questao_ids):
+    """Quantidade de respostas das questões (decide entre recorrigir na hora ou em background)"""
+    return db.session.scalar(
+        select(func.count(Resposta.id)).where(Resposta.questao_id.in_(questao_ids))
+    ) or 0
+
+def recorrigir_questoes(questao_ids, lote=1000, reportar=None):
+    """
+    Recorrige todas as respostas das questões contra o gabarito atual.
+    Retorna o resumo com as variações de pontos por aluno.
+    """
+    gabaritos = db.session.execute(
+        select(Questao.id, Questao.resposta_correta, Questao.pontuacao, Questao.atividade_id)
+        .where(Questao.id.in_(questao_ids))
+    ).all()
+    indice = {questao_id: i for i, (questao_id, _, _, _) in enumerate(gabaritos)}
+    # Análises de itens em cache deixam de valer a cada lote gravado
+    namespaces = {f'respostas:{atividade_id}' for _, _, _, atividade_id in gabaritos}
+    codificadores = [_Codificador() for _ in gabaritos]
+
+    linhas = db.session.execute(
+        select(
+            Resposta.id,
+            Resposta.aluno_id,
+            Resposta.questao_id,
+            func.coalesce(Resposta.resposta_normalizada, Resposta.resposta),
+            Resposta.correta,
+            Resposta.pontos_obtidos
+        )
+        .where(Resposta.questao_id.in_(list(indice)))
+        .order_by(Resposta.id)
+    ).all()
+    total = len(linhas)
+    if reportar:
+        reportar(0, total)
+
+    # Respostas iguais da mesma questão são decodificadas uma vez
+    cache = {}
+    def bitset(questao, texto):
+        chave = (questao, texto)
+        if chave not in cache:
+            resposta = _decodificar(texto)
+            cache[chave] = 0 if resposta is None else codificadores[questao].codificar(resposta)
+        return cache[chave]
+
+    ids = np.fromiter((linha[0] for linha in linhas), dtype=np.int64, count=total)
+    alunos = np.fromiter((linha[1] for linha in linhas), dtype=np.int64, count=total)
+    questoes = np.fromiter((indice[linha[2]] for linha in linhas), dtype=np.int64, count=total)
+    respostas = [bitset(indice[linha[2]], linha[3]) for linha in linhas]
+    # -1: correção nunca calculada (sempre regravada)
+    corretas_antes = np.fromiter(
+        (-1 if linha[4] is None else int(linha[4]) for linha in linhas), dtype=np.int8, count=total
+    )
+    pontos_antes = np.fromiter((float(linha[5] or 0) for linha in linhas), dtype=np.float64, count=total)
+
+    # Gabarito codificado com os mesmos bits das respostas (0 = sem gabarito, nunca acerta)
+    gabarito = []
+    for i, (_, resposta_correta, _, _) in enumerate(gabaritos):
+        correta = _decodificar(resposta_correta)
+        gabarito.append(0 if correta is None else codificadores[i].codificar(correta))
+    pontuacao = np.array([float(p or 0) for _, _, p, _ in gabaritos], dtype=np.float64)
+
+    # Até 64 bits por questão cabem em uint64; acima disso, inteiros Python num array object
+    largura = max((len(c.bits) + 1 for c in codificadores), default=1)
+    dtype = np.uint64 if largura <= 64 else object
+    respostas = np.array(respostas, dtype=dtype)
+    gabarito = np.array(gabarito, dtype=dtype)
+
+    acerto = (respostas == gabarito[questoes]) & (gabarito[questoes] != 0)
+    pontos = np.where(acerto, pontuacao[questoes], 0.0)
+    alteradas = (acerto.astype(np.int8) != corretas_antes) | ~np.isclose(pontos, pontos_antes)
+
+    posicoes = np.flatnonzero(alteradas)
+    for inicio in range(0, len(posicoes), lote):
+        parte = posicoes[inicio:inicio + lote]
+        db.session.execute(update(Resposta), [
+            {'id': int(ids[p]), 'correta': bool(acerto[p]), 'pontos_obtidos': float(pontos[p])}
+            for p in parte
+        ])
+        invalidar_cache(*namespaces)
+        db.session.commit()
+        if reportar:
+            reportar(inicio + len(parte), total)
+
+    # Variação de pontos por aluno
+    delta = pontos - pontos_antes
+    alunos_unicos, posicao_aluno = np.unique(alunos[posicoes], return_inverse=True)
+    variacoes = np.bincount(posicao_aluno, weights=delta[posicoes], minlength=len(alunos_unicos))
+
+    if reportar:
+        reportar(total, total)
+    return {
+        'questoes': len(gabaritos),
+        'respostas': total,
+        'respostas_alteradas': int(len(posicoes)),
+        'alunos': [
+            {'aluno_id': int(aluno_id), 'delta': round(float(variacao), 2)}
+            for aluno_id, variacao in zip(alunos_unicos, variacoes)
+        ]
+    }
@@ -0,0 +1,269 @@
+"""
+Cache de respostas das rotas de leitura mais acessadas (ex.: questões durante a prova).
+
+Duas camadas:
+    local        - LRU com TTL em memória, por worker (RESPONSE_CACHE_SIZE / _TTL)
+    compartilhada - arquivo SQLite local (RESPONSE_CACHE_SHARED_PATH), opcional,
+                   visto por todos os workers do host
+
+A invalidação é por versão: cada namespace (ex.: 'atividade:42') tem um número
+de versão que faz parte da chave. As rotas de escrita marcam o namespace e,
+após o commit, a versão é incrementada; as entradas antigas deixam de ser
+lidas e expiram pelo TTL. Com a camada compartilhada as versões ficam no
+arquivo (todos os workers enxergam o incremento); sem ela ficam em memória e
+outros workers podem servir a versão anterior até o TTL expirar.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import current_app, has_app_context, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.utils.auth import get_current_user
+from app.utils.cache import TTLCache
+
+
+class SharedCacheStorage:
+    """Camada compartilhada entre os workers do host (SQLite em modo WAL)"""
+
+    # Intervalo mínimo (segundos) entre remoções de entradas expiradas
+    COMPACT_INTERVAL = 60
+
+    def __init__(self, path, timeout=5):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._last_compact = 0.0
+        self._create_schema()
+
+    def _connection(self):
+        # Uma conexão por thread e por processo (as conexões não sobrevivem ao fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _create_schema(self):
+        diretorio = os.path.dirname(self.path)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_respostas ('
+            ' chave TEXT PRIMARY KEY,'
+            ' etag TEXT NOT NULL,'
+            ' corpo BLOB NOT NULL,'
+            ' expira REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_respostas_expira ON cache_respostas (expira)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_versoes ('
+            ' namespace TEXT PRIMARY KEY,'
+            ' versao INTEGER NOT NULL)'
+        )
+
+    def get(self, chave):
+        linha = self._connection().execute(
+            'SELECT etag, corpo FROM cache_respostas WHERE chave = ? AND expira > ?',
+            (chave, time.time())
+        ).fetchone()
+        return (linha[0], bytes(linha[1])) if linha else None
+
+    def set(self, chave, entrada, ttl):
+        etag, corpo = entrada
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_respostas (chave, etag, corpo, expira) VALUES (?, ?, ?, ?)',
+            (chave, etag, corpo, time.time() + ttl)
+        )
+        self._compact(conn)
+
+    def versao(self, namespace):
+        linha = self._connection().execute(
+            'SELECT versao FROM cache_versoes WHERE namespace = ?', (namespace,)
+        ).fetchone()
+        return linha[0] if linha else 0
+
+    def incrementar(self, namespace):
+        self._connection().execute(
+            'INSERT INTO cache_versoes (namespace, versao) VALUES (?, 1) '
+            'ON CONFLICT(namespace) DO UPDATE SET versao = versao + 1',
+            (namespace,)
+        )
+
+    def clear(self):
+        conn = self._connection()
+        conn.execute('DELETE FROM cache_respostas')
+
+    def _compact(self, conn):
+        agora = time.time()
+        if agora - self._last_compact < self.COMPACT_INTERVAL:
+            return
+        self._last_compact = agora
+        conn.execute('DELETE FROM cache_respostas WHERE expira <= ?', (agora,))
+
+
+class ResponseCache:
+    """Cache de respostas em duas camadas com versões por namespace"""
+
+    def __init__(self, maxsize=512, ttl=30, compartilhado=None):
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.compartilhado = compartilhado
+        self._versoes = {}
+        self._lock = threading.Lock()
+        self._metricas = {'hits_local': 0, 'hits_compartilhado': 0, 'misses': 0, 'invalidacoes': 0}
+
+    @property
+    def enabled(self):
+        return self.local.enabled
+
+    def _contar(self, metrica):
+        with self._lock:
+            self._metricas[metrica] += 1
+
+    def versao(self, namespace):
+        if self.compartilhado is not None:
+            return self.compartilhado.versao(namespace)
+        with self._lock:
+            return self._versoes.get(namespace, 0)
+
+    def invalidar(self, namespace):
+        """Incrementa a versão do namespace (entradas antigas deixam de ser lidas)"""
+        if self.compartilhado is not None:
+            self.compartilhado.incrementar(namespace)
+        else:
+            with self._lock:
+                self._versoes[namespace] = self._versoes.get(namespace, 0) + 1
+        self._contar('invalidacoes')
+
+    def obter(self, chave):
+        """(etag, corpo) da camada local ou da compartilhada; None se ausente"""
+        entrada = self.local.get(chave)
+        if entrada is not None:
+            self._contar('hits_local')
+            return entrada
+        if self.compartilhado is not None:
+            entrada = self.compartilhado.get(chave)
+            if entrada is not None:
+                self.local.set(chave, entrada)
+                self._contar('hits_compartilhado')
+                return entrada
+        self._contar('misses')
+        return None
+
+    def guardar(self, chave, entrada):
+        self.local.set(chave, entrada)
+        if self.compartilhado is not None:
+            self.compartilhado.set(chave, entrada, self.ttl)
+
+    def clear(self):
+        self.local.clear()
+        if self.compartilhado is not None:
+            self.compartilhado.clear()
+
+    def stats(self):
+        with self._lock:
+            metricas = dict(self._metricas)
+        consultas = metricas['hits_local'] + metricas['hits_compartilhado'] + metricas['misses']
+        hits = metricas['hits_local'] + metricas['hits_compartilhado']
+        return {
+            **metricas,
+            'hit_ratio': round(hits / consultas, 4) if consultas else None,
+            'local': self.local.stats(),
+            'compartilhado': self.compartilhado.path if self.compartilhado is not None else None
+        }
+
+def get_response_cache(app=None):
+    """Retorna o cache de respostas da aplicação (criado sob demanda)"""
+    app = app or current_app
+    cache = app.extensions.get('response_cache')
+    if cache is None:
+        caminho = app.config.get('RESPONSE_CACHE_SHARED_PATH')
+        cache = ResponseCache(
+            maxsize=app.config.get('RESPONSE_CACHE_SIZE', 0),
+            ttl=app.config.get('RESPONSE_CACHE_TTL', 0),
+            compartilhado=SharedCacheStorage(caminho) if caminho else None
+        )
+        app.extensions['response_cache'] = cache
+    return cache
+
+def cache_resposta(namespace, variante=None):
+    """
+    Decorador de rotas GET: guarda o corpo das respostas 200.
+
+    namespace: formato com os argumentos da rota, ex.: 'atividade:{atividade_id}',
+               ou tupla de formatos (a entrada é invalidada por qualquer um deles)
+    variante: função(usuario) -> str que separa representações diferentes da
+              mesma URL (papel, turma...); retornar None não usa o cache.
+    A chave é namespace(s) + versão + variante + caminho com query string.
+    Deve ficar abaixo do decorador de autenticação.
+
+    O validador das respostas 200 é sempre a ETag pelo conteúdo (a mesma no HIT,
+    no MISS e com o cache desligado); a view não deve usar detalhe_condicional.
+    """
+    formatos = (namespace,) if isinstance(namespace, str) else tuple(namespace)
+
+    def decorador(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_response_cache()
+            chave = None
+            if cache.enabled:
+                var = variante(get_current_user()) if variante else ''
+                if var is not None:
+                    versoes = ':'.join(
+                        f'{ns}:v{cache.versao(ns)}'
+                        for ns in (formato.format(**kwargs) for formato in formatos)
+                    )
+                    chave = f'{versoes}:{var}:{request.full_path}'
+
+            entrada = cache.obter(chave) if chave else None
+            if entrada is not None:
+                etag, corpo = entrada
+                resposta = current_app.response_class(corpo, status=200, mimetype='application/json')
+                resposta.headers['X-Cache'] = 'HIT'
+            else:
+                resposta = make_response(view(*args, **kwargs))
+                if resposta.status_code != 200 or resposta.is_streamed:
+                    return resposta
+                corpo = resposta.get_data()
+                etag = hashlib.sha1(corpo).hexdigest()
+                if chave:
+                    cache.guardar(chave, (etag, corpo))
+                    resposta.headers['X-Cache'] = 'MISS'
+
+            # ETag pelo conteúdo: o cliente revalida e recebe 304 sem corpo
+            resposta.set_etag(etag)
+            resposta.headers['Cache-Control'] = 'private, no-cache'
+            return resposta.make_conditional(request)
+        return wrapper
+    return decorador
+
+def invalidar_cache(*namespaces):
+    """
+    Marca namespaces da sessão atual: após o commit, suas versões são incrementadas
+    (antes disso um leitor poderia guardar os dados antigos na versão nova).
+    """
+    db.session.info.setdefault('cache_invalidar', set()).update(namespaces)
+
+@event.listens_for(Session, 'after_commit')
+def _incrementar_versoes(session):
+    namespaces = session.info.pop('cache_invalidar', None)
+    if not namespaces or not has_app_context():
+        return
+    cache = get_response_cache()
+    for namespace in namespaces:
+        cache.invalidar(namespace)
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_invalidacoes(session):
+    session.info.pop('cache_invalidar', None)
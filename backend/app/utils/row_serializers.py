@@ -0,0 +1,365 @@
+"""
+Serialização rápida das listagens, sem ORM.
+
+As rotas de listagem selecionam só as colunas usadas no JSON (linhas do Core,
+sem identity map nem estado de objeto) e cada modelo declara seus campos: a
+coluna (ou colunas) de origem e o conversor. O resultado é idêntico ao
+to_dict() do modelo; o to_dict continua sendo o caminho para objetos
+carregados (detalhe, criação, edição).
+
+Parâmetros das listagens:
+    ?fields=id,titulo,prazo  - só esses campos (e só essas colunas no SELECT)
+    ?include=questoes        - relações declaradas, carregadas em lote com uma
+                               consulta `WHERE chave IN (...)` por relação
+"""
+import json
+from operator import itemgetter
+from flask import abort, jsonify, make_response, request
+from app import db
+from app.models.atividade import Atividade
+from app.models.avaliacao import Avaliacao
+from app.models.entrega import Entrega
+from app.models.grupo import Grupo, GrupoMembro
+from app.models.notificacao import Notificacao
+from app.models.questao import Questao, Resposta
+from app.models.usuario import Usuario
+
+
+class Plano:
+    """Colunas a selecionar e como montar cada item, para um conjunto de campos"""
+    __slots__ = ('colunas', 'leitores', 'relacoes')
+
+    def __init__(self, colunas, leitores, relacoes):
+        self.colunas = colunas
+        self.leitores = leitores
+        self.relacoes = relacoes
+
+    def consulta(self, query):
+        """Troca as entidades da consulta pelas colunas do plano"""
+        return query.with_entities(*self.colunas)
+
+    def nomes_relacoes(self):
+        """Relações carregadas pelo plano"""
+        return [nome for nome, _, _, _ in self.relacoes]
+
+    def serializar(self, linhas):
+        leitores = self.leitores
+        itens = [{nome: ler(linha) for nome, ler in leitores} for linha in linhas]
+        for nome, indice, carregar, vazio in self.relacoes:
+            chaves = {linha[indice] for linha in linhas if linha[indice] is not None}
+            valores = carregar(chaves) if chaves else {}
+            for item, linha in zip(itens, linhas):
+                item[nome] = valores.get(linha[indice], vazio)
+        return itens
+
+
+class RowSerializer:
+    """
+    Campos de um modelo para as listagens.
+    campos: nome -> coluna ou (coluna, ..., conversor)
+    relacoes: nome -> (coluna chave, carregar(chaves) -> {chave: valor}, valor vazio)
+    padrao: relações incluídas quando ?fields= não é informado
+    """
+    __slots__ = ('campos', 'relacoes', 'padrao', '_plano_padrao')
+
+    def __init__(self, campos, relacoes=None, padrao=()):
+        self.campos = campos
+        self.relacoes = relacoes or {}
+        self.padrao = tuple(padrao)
+        self._plano_padrao = None
+
+    def com(self, **campos):
+        """Cópia com campos trocados ou acrescentados"""
+        return RowSerializer({**self.campos, **campos}, self.relacoes, self.padrao)
+
+    def sem(self, *nomes):
+        """Cópia sem os campos informados"""
+        campos = {nome: campo for nome, campo in self.campos.items() if nome not in nomes}
+        return RowSerializer(campos, self.relacoes, self.padrao)
+
+    def com_relacoes(self, **relacoes):
+        """Cópia com relações trocadas ou acrescentadas"""
+        return RowSerializer(self.campos, {**self.relacoes, **relacoes}, self.padrao)
+
+    def plano(self, fields=None, include=None, garantir=()):
+        """
+        Monta o plano para os campos pedidos (None = todos) e as relações em include.
+        `garantir` são colunas selecionadas mesmo fora do JSON (ex.: ordenação do cursor).
+        Levanta ValueError para campos ou relações desconhecidos.
+        """
+        if fields is None:
+            nomes = list(self.campos)
+            relacoes = list(self.padrao)
+        else:
+            nomes = [n for n in fields if n not in self.relacoes]
+            relacoes = [n for n in fields if n in self.relacoes]
+        for nome in include or ():
+            if nome not in relacoes:
+                relacoes.append(nome)
+
+        desconhecidos = [n for n in nomes if n not in self.campos]
+        desconhecidos += [n for n in relacoes if n not in self.relacoes]
+        if desconhecidos:
+            raise ValueError(', '.join(desconhecidos))
+
+        colunas = []
+
+        def indice(coluna):
+            # Compara por identidade: == em colunas gera uma expressão SQL
+            for i, existente in enumerate(colunas):
+                if existente is coluna:
+                    return i
+            colunas.append(coluna)
+            return len(colunas) - 1
+
+        leitores = []
+        for nome in nomes:
+            campo = self.campos[nome]
+            if not isinstance(campo, tuple):
+                leitores.append((nome, itemgetter(indice(campo))))
+            elif len(campo) == 2:
+                leitores.append((nome, _ler(indice(campo[0]), campo[1])))
+            else:
+                leitores.append((nome, _ler_varias([indice(c) for c in campo[:-1]], campo[-1])))
+
+        carregamentos = []
+        for nome in relacoes:
+            chave, carregar, vazio = self.relacoes[nome]
+            carregamentos.append((nome, indice(chave), carregar, vazio))
+
+        for coluna in garantir:
+            indice(coluna)
+
+        return Plano(colunas, leitores, carregamentos)
+
+    def plano_padrao(self):
+        if self._plano_padrao is None:
+            self._plano_padrao = self.plano()
+        return self._plano_padrao
+
+    def consulta(self, query):
+        """Projeta a consulta em todos os campos (plano padrão)"""
+        return self.plano_padrao().consulta(query)
+
+    def serializar(self, linhas):
+        return self.plano_padrao().serializar(linhas)
+
+def _ler(indice, conversor):
+    return lambda linha: conversor(linha[indice])
+
+def _ler_varias(indices, conversor):
+    return lambda linha: conversor(*[linha[i] for i in indices])
+
+def _lista_parametro(nome):
+    valor = request.args.get(nome)
+    if valor is None:
+        return None
+    return [parte.strip() for parte in valor.split(',') if parte.strip()]
+
+def plano_da_requisicao(serializer, garantir=()):
+    """Plano conforme ?fields= e ?include= da requisição (400 se houver nome inválido)"""
+    try:
+        return serializer.plano(
+            fields=_lista_parametro('fields'),
+            include=_lista_parametro('include'),
+            garantir=garantir
+        )
+    except ValueError as e:
+        abort(make_response(jsonify({'ok': False, 'error': f'Campo ou relação inválida: {e}'}), 400))
+
+def _agrupar(linhas, chave):
+    """{chave: [item, ...]} a partir de itens serializados"""
+    grupos = {}
+    for item in linhas:
+        grupos.setdefault(item[chave], []).append(item)
+    return grupos
+
+def _iso(valor):
+    return valor.isoformat() if valor else None
+
+def _json(texto, vazio):
+    """json.loads tolerante, como get_config/get_arquivos (vazio: dict, list ou None)"""
+    if not texto:
+        return vazio()
+    try:
+        return json.loads(texto)
+    except ValueError:
+        return vazio()
+
+def _json_dict(texto):
+    return _json(texto, dict)
+
+def _json_lista(texto):
+    return _json(texto, list)
+
+def _json_ou_nulo(texto):
+    return _json(texto, lambda: None)
+
+def _float_ou_nulo(valor):
+    return float(valor) if valor else None
+
+def _float_ou_zero(valor):
+    return float(valor) if valor else 0
+
+
+serializar_avaliacao = RowSerializer({
+    'id': Avaliacao.id,
+    'entrega_id': Avaliacao.entrega_id,
+    'professor_id': Avaliacao.professor_id,
+    'nota': (Avaliacao.nota, _float_ou_zero),
+    'feedback': Avaliacao.feedback,
+    'data_avaliacao': (Avaliacao.data_avaliacao, _iso),
+    'rejeitado': Avaliacao.rejeitado
+})
+
+serializar_resposta = RowSerializer({
+    'id': Resposta.id,
+    'questao_id': Resposta.questao_id,
+    'aluno_id': Resposta.aluno_id,
+    'atividade_id': Resposta.atividade_id,
+    'resposta': (Resposta.resposta, _json_ou_nulo),
+    'correta': Resposta.correta,
+    'pontos_obtidos': (Resposta.pontos_obtidos, _float_ou_zero),
+    'data_resposta': (Resposta.data_resposta, _iso)
+})
+
+serializar_membro = RowSerializer({
+    'id': GrupoMembro.id,
+    'grupo_id': GrupoMembro.grupo_id,
+    'aluno_id': GrupoMembro.aluno_id,
+    'aluno_nome': Usuario.nome_completo,
+    'papel': GrupoMembro.papel,
+    'status_membro': GrupoMembro.status_membro,
+    'data_entrada': (GrupoMembro.data_entrada, _iso)
+})
+
+def _atividades_resumo(ids):
+    plano = serializar_atividade.plano(['id', 'titulo', 'tipo', 'prazo', 'turma'])
+    linhas = plano.consulta(Atividade.query.filter(Atividade.id.in_(ids))).all()
+    return {item['id']: item for item in plano.serializar(linhas)}
+
+def _questoes_por_atividade(ids):
+    # Questões sem a resposta correta (a listagem de questões decide quem a vê)
+    plano = serializar_questao.sem('resposta_correta').plano()
+    query = Questao.query.filter(Questao.atividade_id.in_(ids)).order_by(Questao.ordem, Questao.id)
+    return _agrupar(plano.serializar(plano.consulta(query).all()), 'atividade_id')
+
+def _grupos_por_atividade(ids):
+    plano = serializar_grupo.plano(include=['membros'])
+    query = Grupo.query.filter(Grupo.atividade_id.in_(ids)).order_by(Grupo.id)
+    return _agrupar(plano.serializar(plano.consulta(query).all()), 'atividade_id')
+
+def _avaliacoes_por_entrega(ids):
+    query = Avaliacao.query.filter(Avaliacao.entrega_id.in_(ids)).order_by(Avaliacao.id)
+    return _agrupar(
+        serializar_avaliacao.serializar(serializar_avaliacao.consulta(query).all()), 'entrega_id'
+    )
+
+def _alunos_resumo(ids):
+    linhas = db.session.query(Usuario.id, Usuario.nome_completo, Usuario.turma).filter(
+        Usuario.id.in_(ids)
+    )
+    return {id: {'id': id, 'nome_completo': nome, 'turma': turma} for id, nome, turma in linhas}
+
+def _membros_por_grupo(ids):
+    query = db.session.query(GrupoMembro).outerjoin(
+        Usuario, Usuario.id == GrupoMembro.aluno_id
+    ).filter(GrupoMembro.grupo_id.in_(ids)).order_by(GrupoMembro.id)
+    return _agrupar(
+        serializar_membro.serializar(serializar_membro.consulta(query).all()), 'grupo_id'
+    )
+
+def respostas_por_questao(ids, aluno_id=None):
+    """Respostas das questões (de um aluno, se informado), agrupadas por questão"""
+    query = Resposta.query.filter(Resposta.questao_id.in_(ids))
+    if aluno_id is not None:
+        query = query.filter(Resposta.aluno_id == aluno_id)
+    query = query.order_by(Resposta.id)
+    return _agrupar(
+        serializar_resposta.serializar(serializar_resposta.consulta(query).all()), 'questao_id'
+    )
+
+
+serializar_atividade = RowSerializer({
+    'id': Atividade.id,
+    'titulo': Atividade.titulo,
+    'descricao': Atividade.descricao,
+    'tipo': Atividade.tipo,
+    'prazo': (Atividade.prazo, _iso),
+    'criado_por': Atividade.criado_por,
+    'data_criacao': (Atividade.data_criacao, _iso),
+    'config': (Atividade.config_json, _json_dict),
+    'ativo': Atividade.ativo,
+    'turma': Atividade.turma,
+    'atualizado_em': (Atividade.atualizado_em, _iso)
+}, relacoes={
+    'questoes': (Atividade.id, _questoes_por_atividade, []),
+    'grupos': (Atividade.id, _grupos_por_atividade, [])
+})
+
+serializar_entrega = RowSerializer({
+    'id': Entrega.id,
+    'atividade_id': Entrega.atividade_id,
+    'aluno_id': Entrega.aluno_id,
+    'grupo_id': Entrega.grupo_id,
+    'data_envio': (Entrega.data_envio, _iso),
+    'status': Entrega.status,
+    'arquivos': (Entrega.arquivo_urls, _json_lista),
+    'observacoes': Entrega.observacoes,
+    'nota': (Entrega.nota, _float_ou_nulo),
+    'avaliado_por': Entrega.avaliado_por,
+    'data_avaliacao': (Entrega.data_avaliacao, _iso),
+    'destino_grupo': Entrega.destino_grupo,
+    'encaminhado_para': Entrega.encaminhado_para,
+    'consolidada': Entrega.consolidada,
+    'atualizado_em': (Entrega.atualizado_em, _iso)
+}, relacoes={
+    'atividade': (Entrega.atividade_id, _atividades_resumo, None),
+    'aluno': (Entrega.aluno_id, _alunos_resumo, None),
+    'avaliacoes': (Entrega.id, _avaliacoes_por_entrega, [])
+})
+
+serializar_grupo = RowSerializer({
+    'id': Grupo.id,
+    'nome': Grupo.nome,
+    'atividade_id': Grupo.atividade_id,
+    'lider_id': Grupo.lider_id,
+    'data_criacao': (Grupo.data_criacao, _iso),
+    'status': Grupo.status,
+    'observacoes': Grupo.observacoes,
+    'atualizado_em': (Grupo.atualizado_em, _iso)
+}, relacoes={
+    'membros': (Grupo.id, _membros_por_grupo, []),
+    'atividade': (Grupo.atividade_id, _atividades_resumo, None)
+}, padrao=['membros'])  # Grupo.to_dict sempre traz os membros
+
+serializar_questao = RowSerializer({
+    'id': Questao.id,
+    'atividade_id': Questao.atividade_id,
+    'enunciado': Questao.enunciado,
+    'tipo': Questao.tipo,
+    'alternativas': (Questao.alternativas, _json_lista),
+    'pontuacao': (Questao.pontuacao, lambda valor: float(valor) if valor else 1.0),
+    'ordem': Questao.ordem,
+    'resposta_correta': (Questao.resposta_correta, _json_ou_nulo),
+    'atualizado_em': (Questao.atualizado_em, _iso)
+}, relacoes={
+    'respostas': (Questao.id, respostas_por_questao, [])
+})
+
+def _publico(usuario_id, turma):
+    if usuario_id:
+        return 'usuario'
+    return 'turma' if turma else 'global'
+
+serializar_notificacao = RowSerializer({
+    'id': Notificacao.id,
+    'usuario_id': Notificacao.usuario_id,
+    'turma': Notificacao.turma,
+    'publico': (Notificacao.usuario_id, Notificacao.turma, _publico),
+    'titulo': Notificacao.titulo,
+    'mensagem': Notificacao.mensagem,
+    'tipo': Notificacao.tipo,
+    'lida': Notificacao.lida,  # Caixa de entrada: trocar pela expressão de leitura do usuário
+    'data_envio': (Notificacao.data_envio, _iso)
+})
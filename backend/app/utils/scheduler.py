@@ -0,0 +1,137 @@
+"""
+Agendador dos lembretes de prazo.
+
+Cada worker inicia uma thread, mas só o líder executa as tarefas. A liderança
+é um lock não bloqueante mantido enquanto o processo vive: pg_try_advisory_lock
+numa conexão dedicada no PostgreSQL, flock de arquivo nos demais bancos (mesmo
+host). Se o líder morre, o lock é liberado e outro worker assume na próxima volta.
+"""
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from sqlalchemy import text
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Chave do pg_advisory_lock do agendador (constante arbitrária do AtivFlow)
+_ADVISORY_LOCK_KEY = 731_530_002
+
+
+class LeaderLock:
+    """Lock de liderança entre processos, tentado sem bloquear"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._conn = None
+        self._arquivo = None
+
+    @property
+    def lider(self):
+        return self._conn is not None or self._arquivo is not None
+
+    def tentar(self):
+        """Tenta assumir a liderança; retorna True se este processo é o líder"""
+        if self.lider:
+            return True
+
+        if self.engine.dialect.name == 'postgresql':
+            conn = self.engine.connect()
+            obtido = conn.execute(
+                text('SELECT pg_try_advisory_lock(:k)'), {'k': _ADVISORY_LOCK_KEY}
+            ).scalar()
+            conn.commit()
+            if obtido:
+                self._conn = conn  # Mantida aberta: o lock vive com a sessão
+            else:
+                conn.close()
+            return bool(obtido)
+
+        try:
+            import fcntl
+        except ImportError:  # Windows: sem lock entre processos
+            self._arquivo = True
+            return True
+
+        arquivo = open(os.path.join(tempfile.gettempdir(), 'ativflow-scheduler.lock'), 'w')
+        try:
+            fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            arquivo.close()
+            return False
+        self._arquivo = arquivo
+        return True
+
+    def liberar(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()  # Fechar a sessão libera o advisory lock
+            finally:
+                self._conn = None
+        if self._arquivo is not None:
+            if self._arquivo is not True:
+                self._arquivo.close()
+            self._arquivo = None
+
+
+class DeadlineReminderScheduler:
+    """
+    Thread (uma por processo) que executa verificar_prazos_proximos a cada
+    `intervalo` segundos quando este processo é o líder.
+    """
+
+    def __init__(self, app, intervalo=600, janelas=(48,)):
+        self.app = app
+        self.intervalo = intervalo
+        self.janelas = janelas
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Inicia a thread (uma vez por processo, depois do fork)"""
+        if not self.intervalo or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._executar, name='deadline-reminders', daemon=True).start()
+
+    def executar_uma_vez(self):
+        """Envia os lembretes pendentes (requer app context)"""
+        from app.utils.notifications import verificar_prazos_proximos
+        return verificar_prazos_proximos(janelas=self.janelas)
+
+    def _executar(self):
+        with self.app.app_context():
+            lider = LeaderLock(db.engine)
+        while True:
+            # Jitter para os workers não disputarem o lock ao mesmo tempo
+            time.sleep(self.intervalo * random.uniform(0.9, 1.1))
+            try:
+                if not lider.tentar():
+                    continue
+                with self.app.app_context():
+                    enviados = self.executar_uma_vez()
+                if enviados:
+                    logger.info('%d lembretes de prazo enviados', enviados)
+            except Exception:
+                logger.exception('Falha no agendador de lembretes de prazo')
+                lider.liberar()
+
+def init_scheduler(app):
+    """Registra o agendador; a thread nasce na primeira requisição de cada worker"""
+    agendador = DeadlineReminderScheduler(
+        app,
+        intervalo=app.config.get('DEADLINE_REMINDER_INTERVAL', 600),
+        janelas=tuple(app.config.get('DEADLINE_REMINDER_WINDOWS', (48,)))
+    )
+    app.extensions['deadline_scheduler'] = agendador
+
+    @app.before_request
+    def _iniciar_agendador():
+        if not app.testing:
+            agendador.iniciar()
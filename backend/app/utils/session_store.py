@@ -0,0 +1,251 @@
+"""
+Armazenamento de sessões no banco principal (server-side).
+
+O cookie carrega apenas o identificador da sessão assinado; os dados ficam na
+tabela `sessoes`, buscada por chave primária. A expiração é indexada e a
+limpeza roda em lotes numa thread de fundo, sem varrer nada por requisição.
+"""
+import logging
+import os
+import random
+import secrets
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import Signer, BadSignature
+from sqlalchemy import select, update, delete, insert
+from werkzeug.datastructures import CallbackDict
+from app import db
+from app.models.sessao import Sessao
+
+logger = logging.getLogger(__name__)
+
+# Primeiro byte dos dados codificados
+_FORMATO_JSON = b'\x00'
+_FORMATO_ZLIB = b'\x01'
+
+# Acima deste tamanho (bytes) os dados são comprimidos
+_LIMITE_COMPRESSAO = 256
+
+_serializer = TaggedJSONSerializer()
+
+def codificar_sessao(dados):
+    """Codifica o dicionário da sessão em bytes compactos"""
+    bruto = _serializer.dumps(dict(dados)).encode('utf-8')
+    if len(bruto) > _LIMITE_COMPRESSAO:
+        return _FORMATO_ZLIB + zlib.compress(bruto)
+    return _FORMATO_JSON + bruto
+
+def decodificar_sessao(blob):
+    """Decodifica bytes gerados por codificar_sessao"""
+    formato, corpo = blob[:1], blob[1:]
+    if formato == _FORMATO_ZLIB:
+        corpo = zlib.decompress(corpo)
+    return _serializer.loads(corpo.decode('utf-8'))
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Sessão identificada por `sid`, com dados guardados no servidor"""
+
+    def __init__(self, initial=None, sid=None, new=False, expira_em=None):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expira_em = expira_em
+        self.sid_anterior = None
+        self.modified = False
+        self.accessed = False
+
+    def regenerar(self):
+        """
+        Troca o identificador da sessão (ex.: no login, contra fixação de sessão).
+        A linha do identificador anterior é removida em save_session.
+        """
+        if not self.new:
+            self.sid_anterior = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.new = True
+        self.expira_em = None
+        self.modified = True
+
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+
+    def setdefault(self, key, default=None):
+        self.accessed = True
+        return super().setdefault(key, default)
+
+
+class DatabaseSessionInterface(SessionInterface):
+    """
+    SessionInterface que persiste as sessões na tabela `sessoes`.
+    Para evitar uma escrita por requisição, a expiração só é renovada
+    quando já se passou SESSION_REFRESH_INTERVAL desde a última gravação.
+    """
+
+    session_class = ServerSession
+
+    def __init__(self):
+        self._varredura_pid = None
+        self._varredura_lock = threading.Lock()
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='ativflow-session', key_derivation='hmac')
+
+    def _nova_sessao(self):
+        return self.session_class(sid=secrets.token_urlsafe(32), new=True)
+
+    def open_session(self, app, request):
+        self._iniciar_varredura(app)
+
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if not cookie:
+            return self._nova_sessao()
+
+        try:
+            sid = self._signer(app).unsign(cookie).decode('utf-8')
+        except BadSignature:
+            return self._nova_sessao()
+
+        tabela = Sessao.__table__
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                select(tabela.c.dados, tabela.c.expira_em)
+                .where(tabela.c.id == sid, tabela.c.expira_em > datetime.utcnow())
+            ).first()
+
+        # Identificador desconhecido ou expirado: nunca reaproveitar (fixação de sessão)
+        if row is None:
+            return self._nova_sessao()
+
+        try:
+            dados = decodificar_sessao(row.dados)
+        except (ValueError, zlib.error):
+            return self._nova_sessao()
+
+        return self.session_class(dados, sid=sid, expira_em=row.expira_em)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        tabela = Sessao.__table__
+
+        # Identificadores a remover: o da sessão esvaziada e o anterior a regenerar()
+        removidos = [sid for sid in (session.sid_anterior, None if session.new else session.sid) if sid]
+        
+        # Sessão esvaziada (ex.: logout): remover do banco e o cookie
+        if not session:
+            if session.modified:
+                if removidos:
+                    with db.engine.begin() as conn:
+                        conn.execute(delete(tabela).where(tabela.c.id.in_(removidos)))
+                response.delete_cookie(
+                    name, domain=domain, path=path,
+                    secure=secure, samesite=samesite, httponly=httponly
+                )
+                response.vary.add('Cookie')
+            return
+
+        agora = datetime.utcnow()
+        lifetime = app.permanent_session_lifetime
+        intervalo = app.config.get('SESSION_REFRESH_INTERVAL', timedelta(hours=1))
+        expira_em = agora + lifetime
+
+        renovar = (
+            session.expira_em is not None
+            and session.permanent
+            and expira_em - session.expira_em >= intervalo
+        )
+
+        if session.new or session.modified or renovar:
+            dados = codificar_sessao(session)
+            with db.engine.begin() as conn:
+                if session.sid_anterior:
+                    conn.execute(delete(tabela).where(tabela.c.id == session.sid_anterior))
+                result = conn.execute(
+                    update(tabela)
+                    .where(tabela.c.id == session.sid)
+                    .values(dados=dados, expira_em=expira_em)
+                )
+                if result.rowcount == 0:
+                    conn.execute(insert(tabela).values(
+                        id=session.sid, dados=dados, expira_em=expira_em, criado_em=agora
+                    ))
+        elif not self.should_set_cookie(app, session):
+            return
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode('utf-8'),
+            expires=self.get_expiration_time(app, session),
+            httponly=httponly,
+            domain=domain,
+            path=path,
+            secure=secure,
+            samesite=samesite
+        )
+        response.vary.add('Cookie')
+
+    def _iniciar_varredura(self, app):
+        """Inicia (uma vez por processo) a thread de limpeza de sessões expiradas"""
+        intervalo = app.config.get('SESSION_SWEEP_INTERVAL', 0)
+        if not intervalo or self._varredura_pid == os.getpid():
+            return
+        with self._varredura_lock:
+            if self._varredura_pid == os.getpid():
+                return
+            self._varredura_pid = os.getpid()
+
+        def executar():
+            while True:
+                # Jitter para os workers não varrerem todos ao mesmo tempo
+                time.sleep(intervalo * random.uniform(0.75, 1.25))
+                try:
+                    with app.app_context():
+                        removidas = limpar_sessoes_expiradas(
+                            lote=app.config.get('SESSION_SWEEP_BATCH', 1000)
+                        )
+                    if removidas:
+                        logger.info('%d sessões expiradas removidas', removidas)
+                except Exception:
+                    logger.exception('Falha na limpeza de sessões expiradas')
+
+        threading.Thread(target=executar, name='session-sweep', daemon=True).start()
+
+
+def limpar_sessoes_expiradas(lote=1000):
+    """
+    Remove sessões expiradas em lotes, cada um em sua própria transação.
+    Usa o índice de expira_em. Retorna o total removido.
+    """
+    tabela = Sessao.__table__
+    agora = datetime.utcnow()
+    total = 0
+
+    while True:
+        ids = select(tabela.c.id).where(tabela.c.expira_em < agora).limit(lote)
+        with db.engine.begin() as conn:
+            removidas = conn.execute(delete(tabela).where(tabela.c.id.in_(ids))).rowcount
+        total += removidas
+        if removidas < lote:
+            return total
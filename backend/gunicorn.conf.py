@@ -0,0 +1,13 @@
+"""
+Configuração do gunicorn (render.yaml: gunicorn -c backend/gunicorn.conf.py ...)
+
+Workers gthread: cada requisição ocupa uma thread do worker, inclusive os
+streams de notificações (SSE), que ficam abertos por até SSE_MAX_DURATION.
+GUNICORN_THREADS também é lido pela aplicação: o teto de streams por worker
+é GUNICORN_THREADS - SSE_RESERVED_THREADS, para que sempre sobrem threads
+para os demais endpoints (ver app.config).
+"""
+import os
+
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
@@ -0,0 +1,39 @@
+"""sessoes e marcador do bootstrap
+
+Revision ID: 36d5f8e63cea
+Revises: 4edeb2fb0d5d
+Create Date: 2026-10-17 21:41:03.927114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '36d5f8e63cea'
+down_revision = '4edeb2fb0d5d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sessoes',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('dados', sa.LargeBinary(), nullable=False),
+    sa.Column('expira_em', sa.DateTime(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sessoes_expira_em'), 'sessoes', ['expira_em'], unique=False)
+    op.create_table('app_bootstrap',
+    sa.Column('chave', sa.String(length=50), nullable=False),
+    sa.Column('versao', sa.String(length=64), nullable=False),
+    sa.Column('executado_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('chave')
+    )
+
+
+def downgrade():
+    op.drop_table('app_bootstrap')
+    op.drop_index(op.f('ix_sessoes_expira_em'), table_name='sessoes')
+    op.drop_table('sessoes')
@@ -0,0 +1,194 @@
+"""esquema inicial
+
+Revision ID: 4edeb2fb0d5d
+Revises: 
+Create Date: 2026-10-17 21:40:12.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4edeb2fb0d5d'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bancos criados pelo db.create_all() das versões sem migrações já têm estas
+    # tabelas: a revisão apenas as adota e o upgrade segue para as seguintes
+    if sa.inspect(op.get_bind()).has_table('usuarios'):
+        return
+
+    op.create_table('usuarios',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nome_completo', sa.String(length=255), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('senha_hash', sa.String(length=255), nullable=False),
+    sa.Column('tipo', sa.String(length=20), nullable=False),
+    sa.Column('curso', sa.String(length=100), nullable=True),
+    sa.Column('turma', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=True),
+    sa.Column('ultimo_login', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_usuarios_email'), 'usuarios', ['email'], unique=True)
+    op.create_table('atividades',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('titulo', sa.String(length=255), nullable=False),
+    sa.Column('descricao', sa.Text(), nullable=True),
+    sa.Column('tipo', sa.String(length=30), nullable=False),
+    sa.Column('prazo', sa.DateTime(), nullable=False),
+    sa.Column('criado_por', sa.Integer(), nullable=False),
+    sa.Column('data_criacao', sa.DateTime(), nullable=True),
+    sa.Column('config_json', sa.Text(), nullable=True),
+    sa.Column('ativo', sa.Boolean(), nullable=True),
+    sa.Column('turma', sa.String(length=20), nullable=True),
+    sa.ForeignKeyConstraint(['criado_por'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_atividades_criado_por'), 'atividades', ['criado_por'], unique=False)
+    op.create_table('followups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('aluno_id', sa.Integer(), nullable=False),
+    sa.Column('atividade_realizada', sa.Text(), nullable=False),
+    sa.Column('assunto_aula', sa.String(length=255), nullable=True),
+    sa.Column('data', sa.Date(), nullable=False),
+    sa.Column('responsabilidade', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=30), nullable=True),
+    sa.Column('justificativa', sa.Text(), nullable=True),
+    sa.Column('feedback_professor', sa.Text(), nullable=True),
+    sa.Column('revisado', sa.Boolean(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.Column('pode_editar', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['aluno_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_followups_aluno_id'), 'followups', ['aluno_id'], unique=False)
+    op.create_index(op.f('ix_followups_data'), 'followups', ['data'], unique=False)
+    op.create_table('notificacoes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.Column('titulo', sa.String(length=255), nullable=False),
+    sa.Column('mensagem', sa.Text(), nullable=False),
+    sa.Column('tipo', sa.String(length=30), nullable=True),
+    sa.Column('lida', sa.Boolean(), nullable=True),
+    sa.Column('data_envio', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notificacoes_data_envio'), 'notificacoes', ['data_envio'], unique=False)
+    op.create_index(op.f('ix_notificacoes_usuario_id'), 'notificacoes', ['usuario_id'], unique=False)
+    op.create_table('grupos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nome', sa.String(length=255), nullable=False),
+    sa.Column('atividade_id', sa.Integer(), nullable=False),
+    sa.Column('lider_id', sa.Integer(), nullable=True),
+    sa.Column('data_criacao', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=30), nullable=True),
+    sa.Column('observacoes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['atividade_id'], ['atividades.id'], ),
+    sa.ForeignKeyConstraint(['lider_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_grupos_atividade_id'), 'grupos', ['atividade_id'], unique=False)
+    op.create_index(op.f('ix_grupos_lider_id'), 'grupos', ['lider_id'], unique=False)
+    op.create_table('questoes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('atividade_id', sa.Integer(), nullable=False),
+    sa.Column('enunciado', sa.Text(), nullable=False),
+    sa.Column('tipo', sa.String(length=30), nullable=True),
+    sa.Column('alternativas', sa.Text(), nullable=True),
+    sa.Column('resposta_correta', sa.Text(), nullable=True),
+    sa.Column('pontuacao', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('ordem', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['atividade_id'], ['atividades.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_questoes_atividade_id'), 'questoes', ['atividade_id'], unique=False)
+    op.create_table('entregas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('atividade_id', sa.Integer(), nullable=False),
+    sa.Column('aluno_id', sa.Integer(), nullable=True),
+    sa.Column('grupo_id', sa.Integer(), nullable=True),
+    sa.Column('data_envio', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=30), nullable=True),
+    sa.Column('arquivo_urls', sa.Text(), nullable=True),
+    sa.Column('observacoes', sa.Text(), nullable=True),
+    sa.Column('nota', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('avaliado_por', sa.Integer(), nullable=True),
+    sa.Column('data_avaliacao', sa.DateTime(), nullable=True),
+    sa.Column('destino_grupo', sa.Boolean(), nullable=True),
+    sa.Column('encaminhado_para', sa.Integer(), nullable=True),
+    sa.Column('consolidada', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['aluno_id'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['atividade_id'], ['atividades.id'], ),
+    sa.ForeignKeyConstraint(['avaliado_por'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['encaminhado_para'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['grupo_id'], ['grupos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_entregas_aluno_id'), 'entregas', ['aluno_id'], unique=False)
+    op.create_index(op.f('ix_entregas_atividade_id'), 'entregas', ['atividade_id'], unique=False)
+    op.create_index(op.f('ix_entregas_grupo_id'), 'entregas', ['grupo_id'], unique=False)
+    op.create_table('grupo_membros',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('grupo_id', sa.Integer(), nullable=False),
+    sa.Column('aluno_id', sa.Integer(), nullable=False),
+    sa.Column('papel', sa.String(length=50), nullable=True),
+    sa.Column('status_membro', sa.String(length=30), nullable=True),
+    sa.Column('data_entrada', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['aluno_id'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['grupo_id'], ['grupos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_grupo_membros_aluno_id'), 'grupo_membros', ['aluno_id'], unique=False)
+    op.create_index(op.f('ix_grupo_membros_grupo_id'), 'grupo_membros', ['grupo_id'], unique=False)
+    op.create_table('respostas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('questao_id', sa.Integer(), nullable=False),
+    sa.Column('aluno_id', sa.Integer(), nullable=False),
+    sa.Column('atividade_id', sa.Integer(), nullable=False),
+    sa.Column('resposta', sa.Text(), nullable=True),
+    sa.Column('correta', sa.Boolean(), nullable=True),
+    sa.Column('pontos_obtidos', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('data_resposta', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['aluno_id'], ['usuarios.id'], ),
+    sa.ForeignKeyConstraint(['atividade_id'], ['atividades.id'], ),
+    sa.ForeignKeyConstraint(['questao_id'], ['questoes.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_respostas_aluno_id'), 'respostas', ['aluno_id'], unique=False)
+    op.create_index(op.f('ix_respostas_atividade_id'), 'respostas', ['atividade_id'], unique=False)
+    op.create_index(op.f('ix_respostas_questao_id'), 'respostas', ['questao_id'], unique=False)
+    op.create_table('avaliacoes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entrega_id', sa.Integer(), nullable=False),
+    sa.Column('professor_id', sa.Integer(), nullable=False),
+    sa.Column('nota', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('feedback', sa.Text(), nullable=True),
+    sa.Column('data_avaliacao', sa.DateTime(), nullable=True),
+    sa.Column('rejeitado', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['entrega_id'], ['entregas.id'], ),
+    sa.ForeignKeyConstraint(['professor_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_avaliacoes_entrega_id'), 'avaliacoes', ['entrega_id'], unique=False)
+    op.create_index(op.f('ix_avaliacoes_professor_id'), 'avaliacoes', ['professor_id'], unique=False)
+
+
+def downgrade():
+    op.drop_table('avaliacoes')
+    op.drop_table('respostas')
+    op.drop_table('grupo_membros')
+    op.drop_table('entregas')
+    op.drop_table('questoes')
+    op.drop_table('grupos')
+    op.drop_table('notificacoes')
+    op.drop_table('followups')
+    op.drop_table('atividades')
+    op.drop_table('usuarios')
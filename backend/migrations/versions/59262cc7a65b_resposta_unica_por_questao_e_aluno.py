@@ -0,0 +1,52 @@
+"""resposta unica por questao e aluno e respostas idempotentes
+
+Revision ID: 59262cc7a65b
+Revises: fa2a5da8fd41
+Create Date: 2026-10-17 21:46:39.508213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '59262cc7a65b'
+down_revision = 'fa2a5da8fd41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Respostas duplicadas de versões anteriores têm nota: a migração não escolhe
+    # qual manter, apenas recusa até que sejam revisadas
+    duplicadas = op.get_bind().execute(sa.text(
+        'SELECT COUNT(*) FROM (SELECT 1 FROM respostas '
+        'GROUP BY questao_id, aluno_id HAVING COUNT(*) > 1) AS pares'
+    )).scalar()
+    if duplicadas:
+        raise RuntimeError(
+            f'{duplicadas} pares (questao_id, aluno_id) com mais de uma resposta; '
+            'revise com `flask respostas-duplicadas` e escolha quais manter antes do upgrade'
+        )
+
+    op.drop_index('ix_respostas_questao_aluno', table_name='respostas')
+    op.create_index('uq_respostas_questao_aluno', 'respostas', ['questao_id', 'aluno_id'], unique=True)
+
+    op.create_table('respostas_idempotentes',
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('chave', sa.String(length=128), nullable=False),
+    sa.Column('escopo', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.Integer(), nullable=False),
+    sa.Column('corpo', sa.Text(), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('usuario_id', 'chave')
+    )
+    op.create_index(op.f('ix_respostas_idempotentes_criado_em'), 'respostas_idempotentes', ['criado_em'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_respostas_idempotentes_criado_em'), table_name='respostas_idempotentes')
+    op.drop_table('respostas_idempotentes')
+    op.drop_index('uq_respostas_questao_aluno', table_name='respostas')
+    op.create_index('ix_respostas_questao_aluno', 'respostas', ['questao_id', 'aluno_id'], unique=False)
@@ -0,0 +1,40 @@
+"""indices compostos e parciais das listagens
+
+Revision ID: 67d0f87d5496
+Revises: bda658052203
+Create Date: 2026-10-17 21:43:51.662090
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '67d0f87d5496'
+down_revision = 'bda658052203'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_usuarios_tipo_turma_status', 'usuarios', ['tipo', 'turma', 'status'], unique=False)
+    op.create_index('ix_atividades_turma_ativo_prazo', 'atividades', ['turma', 'ativo', 'prazo'], unique=False)
+    op.create_index('ix_entregas_aluno_data_envio', 'entregas', ['aluno_id', 'data_envio'], unique=False)
+    op.create_index('ix_entregas_destino_encaminhado', 'entregas', ['destino_grupo', 'encaminhado_para'], unique=False)
+    op.create_index('ix_followups_aluno_data', 'followups', ['aluno_id', 'data'], unique=False)
+    op.create_index('ix_respostas_questao_aluno', 'respostas', ['questao_id', 'aluno_id'], unique=False)
+    op.create_index('ix_notificacoes_usuario_lida_data', 'notificacoes', ['usuario_id', 'lida', 'data_envio'], unique=False)
+    # Parcial: só os avisos compartilhados (usuario_id NULL)
+    op.create_index('ix_notificacoes_compartilhadas', 'notificacoes', ['turma', 'data_envio'], unique=False,
+                    sqlite_where=sa.text('usuario_id IS NULL'), postgresql_where=sa.text('usuario_id IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_notificacoes_compartilhadas', table_name='notificacoes')
+    op.drop_index('ix_notificacoes_usuario_lida_data', table_name='notificacoes')
+    op.drop_index('ix_respostas_questao_aluno', table_name='respostas')
+    op.drop_index('ix_followups_aluno_data', table_name='followups')
+    op.drop_index('ix_entregas_destino_encaminhado', table_name='entregas')
+    op.drop_index('ix_entregas_aluno_data_envio', table_name='entregas')
+    op.drop_index('ix_atividades_turma_ativo_prazo', table_name='atividades')
+    op.drop_index('ix_usuarios_tipo_turma_status', table_name='usuarios')
@@ -0,0 +1,26 @@
+"""resposta_normalizada
+
+Revision ID: 8552feb8d380
+Revises: 59262cc7a65b
+Create Date: 2026-10-17 21:47:15.873406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8552feb8d380'
+down_revision = '59262cc7a65b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Respostas antigas ficam NULL: as agregações usam coalesce com a resposta original
+    op.add_column('respostas', sa.Column('resposta_normalizada', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('respostas') as batch_op:
+        batch_op.drop_column('resposta_normalizada')
@@ -0,0 +1,36 @@
+"""rascunhos de respostas
+
+Revision ID: 9433d4b4a5eb
+Revises: 8552feb8d380
+Create Date: 2026-10-17 21:48:02.261937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9433d4b4a5eb'
+down_revision = '8552feb8d380'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rascunhos_respostas',
+    sa.Column('aluno_id', sa.Integer(), nullable=False),
+    sa.Column('questao_id', sa.Integer(), nullable=False),
+    sa.Column('atividade_id', sa.Integer(), nullable=False),
+    sa.Column('resposta', sa.Text(), nullable=True),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['aluno_id'], ['usuarios.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['atividade_id'], ['atividades.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['questao_id'], ['questoes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('aluno_id', 'questao_id')
+    )
+    op.create_index('ix_rascunhos_aluno_atividade', 'rascunhos_respostas', ['aluno_id', 'atividade_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_rascunhos_aluno_atividade', table_name='rascunhos_respostas')
+    op.drop_table('rascunhos_respostas')
@@ -0,0 +1,93 @@
+"""outbox, avisos compartilhados, lembretes e tarefas
+
+Revision ID: bda658052203
+Revises: 36d5f8e63cea
+Create Date: 2026-10-17 21:42:27.305871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bda658052203'
+down_revision = '36d5f8e63cea'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notificacao_eventos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=30), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('tentativas', sa.Integer(), nullable=False),
+    sa.Column('erro', sa.Text(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.Column('bloqueado_em', sa.DateTime(), nullable=True),
+    sa.Column('processado_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notificacao_eventos_status'), 'notificacao_eventos', ['status'], unique=False)
+
+    # Avisos de turma/gerais gravados uma vez (usuario_id NULL), com leitura por usuário
+    op.add_column('notificacoes', sa.Column('turma', sa.String(length=50), nullable=True))
+    op.create_index(op.f('ix_notificacoes_turma'), 'notificacoes', ['turma'], unique=False)
+    op.create_table('notificacao_leituras',
+    sa.Column('notificacao_id', sa.Integer(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('lida_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['notificacao_id'], ['notificacoes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('notificacao_id', 'usuario_id')
+    )
+    # nao_lidas NULL = contador ainda não calculado (preenchido na primeira consulta)
+    op.create_table('notificacao_marcadores',
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('lidas_ate_id', sa.Integer(), nullable=False),
+    sa.Column('nao_lidas', sa.Integer(), nullable=True),
+    sa.Column('atualizado_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('usuario_id')
+    )
+
+    op.create_index(op.f('ix_atividades_prazo'), 'atividades', ['prazo'], unique=False)
+    op.create_table('lembretes_prazo',
+    sa.Column('atividade_id', sa.Integer(), nullable=False),
+    sa.Column('janela', sa.String(length=10), nullable=False),
+    sa.Column('enviado_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['atividade_id'], ['atividades.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('atividade_id', 'janela')
+    )
+
+    op.create_table('tarefas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('progresso', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('resultado_json', sa.Text(), nullable=True),
+    sa.Column('erro', sa.Text(), nullable=True),
+    sa.Column('criado_por', sa.Integer(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=True),
+    sa.Column('iniciado_em', sa.DateTime(), nullable=True),
+    sa.Column('concluido_em', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['criado_por'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tarefas_status'), 'tarefas', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_tarefas_status'), table_name='tarefas')
+    op.drop_table('tarefas')
+    op.drop_table('lembretes_prazo')
+    op.drop_index(op.f('ix_atividades_prazo'), table_name='atividades')
+    op.drop_table('notificacao_marcadores')
+    op.drop_table('notificacao_leituras')
+    op.drop_index(op.f('ix_notificacoes_turma'), table_name='notificacoes')
+    with op.batch_alter_table('notificacoes') as batch_op:
+        batch_op.drop_column('turma')
+    op.drop_index(op.f('ix_notificacao_eventos_status'), table_name='notificacao_eventos')
+    op.drop_table('notificacao_eventos')
@@ -0,0 +1,43 @@
+"""atualizado_em para GET condicional
+
+Revision ID: fa2a5da8fd41
+Revises: 67d0f87d5496
+Create Date: 2026-10-17 21:45:08.140552
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fa2a5da8fd41'
+down_revision = '67d0f87d5496'
+branch_labels = None
+depends_on = None
+
+TABELAS = {
+    'atividades': ('ix_atividades_turma_ativo_atualizado', ['turma', 'ativo', 'atualizado_em']),
+    'entregas': ('ix_entregas_aluno_atualizado', ['aluno_id', 'atualizado_em']),
+    'grupos': ('ix_grupos_atividade_atualizado', ['atividade_id', 'atualizado_em']),
+    'questoes': ('ix_questoes_atividade_atualizado', ['atividade_id', 'atualizado_em']),
+}
+
+
+def upgrade():
+    agora = datetime.utcnow()
+    for tabela, (indice, colunas) in TABELAS.items():
+        op.add_column(tabela, sa.Column('atualizado_em', sa.DateTime(), nullable=True))
+        # Linhas existentes entram como alteradas agora (o default do modelo)
+        op.execute(
+            sa.table(tabela, sa.column('atualizado_em', sa.DateTime()))
+            .update().values(atualizado_em=agora)
+        )
+        op.create_index(indice, tabela, colunas, unique=False)
+
+
+def downgrade():
+    for tabela, (indice, colunas) in TABELAS.items():
+        op.drop_index(indice, table_name=tabela)
+        with op.batch_alter_table(tabela) as batch_op:
+            batch_op.drop_column('atualizado_em')
@@ -0,0 +1,204 @@
+"""
+Benchmark da correção de múltipla escolha: rajada de envios (padrão 50 questões
+x 40 alunos), comparando a correção questão a questão (anterior) com a
+correção em lote (app/utils/grading.py). Mede tempo e comandos SQL por envio,
+depois as estatísticas da atividade (consulta por questão x GROUP BY) e a
+recorreção após mudar o gabarito (objeto a objeto x vetorizada com NumPy).
+
+Uso: python scripts/benchmark_correcao.py [--questoes 50] [--alunos 40]
+Usa um banco SQLite em memória (ou DATABASE_URL, se definido).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+# Adicionar diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import event
+from app import create_app, db
+from app.models.usuario import Usuario
+from app.models.atividade import Atividade
+from app.models.questao import Questao, Resposta
+from app.utils.grading import corrigir_envio, estatisticas_por_questao
+from app.utils.regrading import recorrigir_questoes
+
+def corrigir_questao_a_questao(atividade_id, aluno_id, respostas_data):
+    """Correção anterior: duas consultas e um INSERT por resposta"""
+    criadas = []
+    nota_total = 0
+    pontos_possiveis = 0
+    for resp_data in respostas_data:
+        questao = Questao.query.get(resp_data['questao_id'])
+        if not questao or questao.atividade_id != atividade_id:
+            continue
+        if Resposta.query.filter_by(questao_id=questao.id, aluno_id=aluno_id,
+                                    atividade_id=atividade_id).first():
+            continue
+        correta_obj = questao.get_resposta_correta()
+        if isinstance(correta_obj, list):
+            correta = set(resp_data['resposta']) == set(correta_obj)
+        else:
+            correta = resp_data['resposta'] == correta_obj
+        pontos = float(questao.pontuacao) if correta else 0
+        resposta = Resposta(questao_id=questao.id, aluno_id=aluno_id, atividade_id=atividade_id,
+                            correta=correta, pontos_obtidos=pontos)
+        resposta.set_resposta(resp_data['resposta'])
+        db.session.add(resposta)
+        criadas.append(resposta)
+        nota_total += pontos
+        pontos_possiveis += float(questao.pontuacao)
+    return criadas, nota_total, pontos_possiveis
+
+def estatisticas_questao_a_questao(atividade_id):
+    """Estatísticas anteriores: uma consulta e todas as respostas carregadas por questão"""
+    estatisticas = []
+    for questao in Questao.query.filter_by(atividade_id=atividade_id).all():
+        respostas = Resposta.query.filter_by(questao_id=questao.id).all()
+        corretas = sum(1 for r in respostas if r.correta)
+        estatisticas.append({'questao_id': questao.id, 'total_respostas': len(respostas),
+                             'respostas_corretas': corretas})
+    return estatisticas
+
+def recorrigir_objeto_a_objeto(questao_ids):
+    """Recorreção ingênua: carrega cada Resposta como objeto ORM e compara em Python"""
+    for questao in Questao.query.filter(Questao.id.in_(questao_ids)).all():
+        correta_obj = questao.get_resposta_correta()
+        for resposta in questao.respostas:
+            valor = resposta.get_resposta()
+            if isinstance(correta_obj, list):
+                correta = isinstance(valor, list) and set(valor) == set(correta_obj)
+            else:
+                correta = valor == correta_obj
+            resposta.correta = correta
+            resposta.pontos_obtidos = float(questao.pontuacao) if correta else 0
+    db.session.commit()
+
+def alternar_gabarito(gabarito, inverter):
+    """Troca o gabarito de todas as questões (para forçar a recorreção)"""
+    for questao in Questao.query.filter(Questao.id.in_(list(gabarito))).all():
+        if questao.tipo == 'multiple':
+            questao.set_resposta_correta(['b', 'd'] if inverter else ['a', 'c'])
+        else:
+            questao.set_resposta_correta('c' if inverter else 'b')
+    db.session.commit()
+
+def popular(n_questoes, n_alunos):
+    """Cria a atividade, as questões (metade single, metade multiple) e os alunos"""
+    professor = Usuario(nome_completo='Prof Benchmark', email='prof.bench@test.com',
+                        tipo='professor', senha_hash='x')
+    db.session.add(professor)
+    db.session.flush()
+    atividade = Atividade(titulo='Prova', descricao='Benchmark', tipo='multipla_escolha',
+                          prazo=datetime(2030, 1, 1), criado_por=professor.id, turma='BENCH01')
+    db.session.add(atividade)
+    db.session.flush()
+
+    gabarito = {}
+    for i in range(n_questoes):
+        questao = Questao(atividade_id=atividade.id, enunciado=f'Questão {i}', ordem=i,
+                          tipo='multiple' if i % 2 else 'single', pontuacao=1.0)
+        questao.set_alternativas(['a', 'b', 'c', 'd'])
+        questao.set_resposta_correta(['a', 'c'] if i % 2 else 'b')
+        db.session.add(questao)
+        db.session.flush()
+        gabarito[questao.id] = questao.tipo
+
+    alunos = [
+        Usuario(nome_completo=f'Aluno {i}', email=f'aluno{i}.bench@test.com', tipo='aluno',
+                turma='BENCH01', senha_hash='x')
+        for i in range(n_alunos)
+    ]
+    db.session.add_all(alunos)
+    db.session.commit()
+    return atividade.id, gabarito, [a.id for a in alunos]
+
+def envio(gabarito, sorteio):
+    return [
+        {'questao_id': questao_id,
+         'resposta': sorteio.sample(['a', 'b', 'c', 'd'], 2) if tipo == 'multiple' else sorteio.choice('abcd')}
+        for questao_id, tipo in gabarito.items()
+    ]
+
+def rajada(corrigir, atividade_id, gabarito, alunos, manter=False):
+    """Um envio completo por aluno; retorna (segundos, comandos SQL por envio)"""
+    comandos = []
+    registrar = lambda *args: comandos.append(1)
+    sorteio = random.Random(42)
+    envios = [envio(gabarito, sorteio) for _ in alunos]
+
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    inicio = time.perf_counter()
+    try:
+        for aluno_id, respostas_data in zip(alunos, envios):
+            corrigir(atividade_id, aluno_id, respostas_data)
+            db.session.commit()
+    finally:
+        decorrido = time.perf_counter() - inicio
+        event.remove(db.engine, 'before_cursor_execute', registrar)
+
+    if not manter:
+        db.session.query(Resposta).delete()
+        db.session.commit()
+    return decorrido, len(comandos) / len(alunos)
+
+def medir_estatisticas(fn, atividade_id, repeticoes=5):
+    """Melhor tempo e comandos SQL de uma chamada das estatísticas"""
+    comandos = []
+    registrar = lambda *args: comandos.append(1)
+    melhor = None
+    for _ in range(repeticoes):
+        db.session.expunge_all()
+        comandos.clear()
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        inicio = time.perf_counter()
+        try:
+            fn(atividade_id)
+        finally:
+            decorrido = time.perf_counter() - inicio
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor, len(comandos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--questoes', type=int, default=50)
+    parser.add_argument('--alunos', type=int, default=40)
+    args = parser.parse_args()
+
+    app = create_app('development')
+    with app.app_context():
+        db.create_all()
+        atividade_id, gabarito, alunos = popular(args.questoes, args.alunos)
+
+        print(f'{args.questoes} questões x {args.alunos} alunos')
+        print(f'{"correção":<18}{"tempo (s)":>12}{"envios/s":>12}{"SQL/envio":>12}')
+        for nome, corrigir in (('questão a questão', corrigir_questao_a_questao), ('em lote', corrigir_envio)):
+            decorrido, comandos = rajada(corrigir, atividade_id, gabarito, alunos)
+            print(f'{nome:<18}{decorrido:>12.3f}{len(alunos) / decorrido:>12.1f}{comandos:>12.1f}')
+
+        rajada(corrigir_envio, atividade_id, gabarito, alunos, manter=True)
+        print(f'\n{"estatísticas":<18}{"tempo (ms)":>12}{"SQL":>12}')
+        for nome, fn in (('questão a questão', estatisticas_questao_a_questao),
+                         ('GROUP BY', estatisticas_por_questao)):
+            decorrido, comandos = medir_estatisticas(fn, atividade_id)
+            print(f'{nome:<18}{decorrido * 1000:>12.1f}{comandos:>12}')
+
+        print(f'\n{"recorreção":<18}{"tempo (ms)":>12}')
+        for i, (nome, fn) in enumerate((('objeto a objeto', recorrigir_objeto_a_objeto),
+                                        ('NumPy', recorrigir_questoes))):
+            alternar_gabarito(gabarito, inverter=i % 2 == 0)
+            db.session.expunge_all()
+            inicio = time.perf_counter()
+            fn(list(gabarito))
+            print(f'{nome:<18}{(time.perf_counter() - inicio) * 1000:>12.1f}')
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    main()
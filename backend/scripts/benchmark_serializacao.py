@@ -0,0 +1,111 @@
+"""
+Benchmark da serialização das listagens: ORM + to_dict() x colunas projetadas
+(app/utils/row_serializers.py). Mede linhas/segundo da consulta + serialização.
+
+Uso: python scripts/benchmark_serializacao.py [--linhas 5000] [--repeticoes 5]
+Usa um banco SQLite em memória (ou DATABASE_URL, se definido).
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Adicionar diretório pai ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from app import create_app, db
+from app.models.usuario import Usuario
+from app.models.atividade import Atividade
+from app.models.entrega import Entrega
+from app.models.notificacao import Notificacao
+from app.utils.notifications import consulta_caixa_entrada
+from app.utils.row_serializers import serializar_atividade, serializar_entrega, serializar_notificacao
+
+def popular(linhas):
+    """Cria `linhas` atividades, entregas e notificações para um aluno"""
+    professor = Usuario(nome_completo='Prof Benchmark', email='prof.bench@test.com',
+                        tipo='professor', senha_hash='x')
+    aluno = Usuario(nome_completo='Aluno Benchmark', email='aluno.bench@test.com',
+                    tipo='aluno', turma='BENCH01', status='ativo', senha_hash='x')
+    db.session.add_all([professor, aluno])
+    db.session.flush()
+
+    base = datetime(2030, 1, 1)
+    db.session.execute(db.insert(Atividade), [{
+        'titulo': f'Atividade {i}', 'descricao': 'Descrição da atividade ' * 5,
+        'tipo': 'individual', 'prazo': base + timedelta(hours=i), 'criado_por': professor.id,
+        'data_criacao': base, 'config_json': '{"peso": 2, "permite_atraso": true}',
+        'ativo': True, 'turma': 'BENCH01'
+    } for i in range(linhas)])
+    atividade_id = db.session.query(db.func.min(Atividade.id)).scalar()
+    db.session.execute(db.insert(Entrega), [{
+        'atividade_id': atividade_id, 'aluno_id': aluno.id, 'data_envio': base + timedelta(minutes=i),
+        'status': 'avaliado', 'arquivo_urls': '["/uploads/a.pdf", "/uploads/b.png"]',
+        'observacoes': 'Entrega de teste', 'nota': 8.5, 'avaliado_por': professor.id,
+        'data_avaliacao': base, 'destino_grupo': False, 'consolidada': False
+    } for i in range(linhas)])
+    db.session.execute(db.insert(Notificacao), [{
+        'usuario_id': aluno.id if i % 2 else None, 'turma': None if i % 2 else 'BENCH01',
+        'titulo': f'Aviso {i}', 'mensagem': 'Mensagem de teste', 'tipo': 'info',
+        'lida': False, 'data_envio': base + timedelta(minutes=i)
+    } for i in range(linhas)])
+    db.session.commit()
+    return aluno
+
+def medir(fn, repeticoes):
+    """Melhor tempo de `repeticoes` execuções (sessão limpa a cada uma)"""
+    melhor = None
+    for _ in range(repeticoes):
+        db.session.expunge_all()
+        inicio = time.perf_counter()
+        total = len(fn())
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return total, melhor
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--linhas', type=int, default=5000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('development')
+    with app.app_context():
+        db.create_all()
+        aluno = popular(args.linhas)
+
+        atividades = Atividade.query.filter_by(turma='BENCH01', ativo=True).order_by(Atividade.prazo)
+        entregas = Entrega.query.filter_by(aluno_id=aluno.id).order_by(Entrega.data_envio.desc())
+        caixa, lida = consulta_caixa_entrada(aluno)
+        caixa = caixa.order_by(Notificacao.data_envio.desc())
+        caixa_entrada = serializar_notificacao.com(lida=(lida.label('lida_usuario'), bool))
+        calendario = serializar_atividade.plano(['id', 'titulo', 'prazo'])
+
+        casos = [
+            ('atividades',
+             lambda: [a.to_dict() for a in atividades.all()],
+             lambda: serializar_atividade.serializar(serializar_atividade.consulta(atividades).all())),
+            ('entregas',
+             lambda: [e.to_dict() for e in entregas.all()],
+             lambda: serializar_entrega.serializar(serializar_entrega.consulta(entregas).all())),
+            ('notificacoes',
+             lambda: [n.to_dict(lida=l) for n, l in caixa.all()],
+             lambda: caixa_entrada.serializar(caixa_entrada.consulta(caixa).all())),
+            ('calendario',  # ?fields=id,titulo,prazo
+             lambda: [a.to_dict() for a in atividades.all()],
+             lambda: calendario.serializar(calendario.consulta(atividades).all())),
+        ]
+
+        print(f'{"listagem":<14}{"to_dict (linhas/s)":>22}{"projeção (linhas/s)":>22}{"ganho":>8}')
+        for nome, orm, projetado in casos:
+            linhas, t_orm = medir(orm, args.repeticoes)
+            _, t_proj = medir(projetado, args.repeticoes)
+            print(f'{nome:<14}{linhas / t_orm:>22,.0f}{linhas / t_proj:>22,.0f}{t_orm / t_proj:>7.1f}x')
+
+        db.session.remove()
+        db.drop_all()
+
+if __name__ == '__main__':
+    main()
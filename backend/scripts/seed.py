@@ -14,6 +14,7 @@ from app.models.usuario import Usuario
 from app.models.atividade import Atividade
 from app.models.grupo import Grupo, GrupoMembro
 from app.models.questao import Questao
+from app.utils.password_hashing import hash_senhas
 
 def seed_database():
     """Popula o banco de dados com dados de exemplo"""
@@ -82,10 +83,13 @@ def seed_database():
                 turma='321530',
                 status='ativo'
             )
-            aluno.set_password('Aluno@123')
             db.session.add(aluno)
             alunos.append(aluno)
         
+        # Hashes gerados em lote, em paralelo nas vagas de hashing
+        for aluno, senha_hash in zip(alunos, hash_senhas(['Aluno@123'] * len(alunos))):
+            aluno.senha_hash = senha_hash
+        
         db.session.commit()
         
         print("Criando 3 atividades...")
@@ -2,17 +2,19 @@
 Configurações de fixtures para testes Pytest
 """
 import pytest
-from app import create_app, db
+from app import create_app, db, limiter
 from app.models.usuario import Usuario
+from app.models.atividade import Atividade
+from app.models.questao import Questao
 from datetime import datetime
 
-@pytest.fixture(scope=\'module\')
+@pytest.fixture(scope='module')
 def test_app():
     """Fixture para criar uma instância da aplicação Flask para testes."""
-    app = create_app(\'development\')
+    app = create_app('development')
     app.config.update({
-        \'TESTING\': True,
-        \'SQLALCHEMY_DATABASE_URI\': \'sqlite:///:memory:\'  # Usar banco de dados em memória para testes
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'  # Usar banco de dados em memória para testes
     })
     
     with app.app_context():
@@ -21,12 +23,17 @@ def test_app():
         db.session.remove()
         db.drop_all()
 
-@pytest.fixture(scope=\'module\')
+@pytest.fixture(autouse=True)
+def limpar_rate_limit():
+    """Zera os contadores do rate limit a cada teste (os fixtures fazem login repetidas vezes)."""
+    limiter.reset()
+
+@pytest.fixture(scope='module')
 def test_client(test_app):
     """Fixture para obter um cliente de teste da aplicação."""
     return test_app.test_client()
 
-@pytest.fixture(scope=\'module\')
+@pytest.fixture(scope='module')
 def init_database(test_app):
     """
     Fixture para inicializar o banco de dados com dados básicos para testes.
@@ -35,27 +42,27 @@ def init_database(test_app):
     with test_app.app_context():
         # Criar professor
         professor = Usuario(
-            nome_completo=\'Professor Teste\',
-            email=\'professor@test.com\',
-            tipo=\'professor\',
-            curso=\'Administração\',
-            turma=\'TESTE101\',
-            status=\'ativo\'
+            nome_completo='Professor Teste',
+            email='professor@test.com',
+            tipo='professor',
+            curso='Administração',
+            turma='TESTE101',
+            status='ativo'
         )
-        professor.set_password(\'testpass\')
+        professor.set_password('testpass')
         db.session.add(professor)
         db.session.commit()
 
         # Criar aluno
         aluno = Usuario(
-            nome_completo=\'Aluno Teste\',
-            email=\'aluno@test.com\',
-            tipo=\'aluno\',
-            curso=\'Administração\',
-            turma=\'TESTE101\',
-            status=\'ativo\'
+            nome_completo='Aluno Teste',
+            email='aluno@test.com',
+            tipo='aluno',
+            curso='Administração',
+            turma='TESTE101',
+            status='ativo'
         )
-        aluno.set_password(\'testpass\')
+        aluno.set_password('testpass')
         db.session.add(aluno)
         db.session.commit()
 
@@ -65,29 +72,74 @@ def init_database(test_app):
         db.session.query(Usuario).delete()
         db.session.commit()
 
-@pytest.fixture(scope=\'module\')
+@pytest.fixture
 def auth_headers_professor(test_client, init_database):
     """
     Fixture para obter headers de autenticação para um professor de teste.
-    Realiza o login e retorna os cookies de sessão.
+    Realiza o login a cada teste (o logout revoga a sessão no servidor),
+    retorna os cookies de sessão e os descarta do cliente ao final.
     """
     response = test_client.post(
-        \'/api/auth/login\',
-        json={\'email\': \'professor@test.com\', \'senha\': \'testpass\'}
+        '/api/auth/login',
+        json={'email': 'professor@test.com', 'senha': 'testpass'}
     )
     assert response.status_code == 200
-    return {\'Cookie\': response.headers[\'Set-Cookie\']}
+    yield {'Cookie': response.headers['Set-Cookie']}
+    test_client.delete_cookie('session')
 
-@pytest.fixture(scope=\'module\')
+@pytest.fixture
 def auth_headers_aluno(test_client, init_database):
     """
     Fixture para obter headers de autenticação para um aluno de teste.
-    Realiza o login e retorna os cookies de sessão.
+    Realiza o login a cada teste (o logout revoga a sessão no servidor),
+    retorna os cookies de sessão e os descarta do cliente ao final.
     """
     response = test_client.post(
-        \'/api/auth/login\',
-        json={\'email\': \'aluno@test.com\', \'senha\': \'testpass\'}
+        '/api/auth/login',
+        json={'email': 'aluno@test.com', 'senha': 'testpass'}
     )
     assert response.status_code == 200
-    return {\'Cookie\': response.headers[\'Set-Cookie\']}
+    yield {'Cookie': response.headers['Set-Cookie']}
+    test_client.delete_cookie('session')
+
+@pytest.fixture
+def login(test_client):
+    """
+    Fixture que autentica o cliente de teste (sessão por cookie).
+    Uso: login('aluno@test.com').
+    """
+    def entrar(email, senha='testpass'):
+        response = test_client.post('/api/auth/login', json={'email': email, 'senha': senha})
+        assert response.status_code == 200
+        return response
+    return entrar
 
+@pytest.fixture
+def criar_prova(test_app):
+    """
+    Fixture que cria uma atividade de múltipla escolha com suas questões.
+    Uso (dentro de um app context): criar_prova('TURMA', [(alternativas, correta, pontuação), ...]);
+    a pontuação é opcional e correta em lista gera uma questão multiple.
+    Sem professor_id a atividade é do professor de teste. Retorna (atividade, questões).
+    """
+    def criar(turma, questoes, professor_id=None):
+        if professor_id is None:
+            professor_id = Usuario.query.filter_by(email='professor@test.com').first().id
+        atividade = Atividade(titulo='Prova', descricao='Teste', tipo='multipla_escolha',
+                              prazo=datetime(2030, 1, 1), criado_por=professor_id, turma=turma)
+        db.session.add(atividade)
+        db.session.flush()
+        
+        criadas = []
+        for ordem, (alternativas, correta, *pontuacao) in enumerate(questoes, start=1):
+            questao = Questao(atividade_id=atividade.id, enunciado=f'Questão {ordem}', ordem=ordem,
+                              tipo='multiple' if isinstance(correta, list) else 'single')
+            if pontuacao:
+                questao.pontuacao = pontuacao[0]
+            questao.set_alternativas(alternativas)
+            questao.set_resposta_correta(correta)
+            criadas.append(questao)
+        db.session.add_all(criadas)
+        db.session.commit()
+        return atividade, criadas
+    return criar
@@ -0,0 +1,99 @@
+"""
+Testes da análise de itens (dificuldade, discriminação, ponto-bisserial, alfa de Cronbach)
+"""
+import pytest
+from app import db
+from app.models.usuario import Usuario
+from app.utils.grading import corrigir_envio
+from app.utils.response_cache import get_response_cache
+
+def test_analise_itens(test_client, init_database, login, criar_prova):
+    """
+    Testa as métricas sobre uma matriz de acertos conhecida e o cache até novas respostas.
+    """
+    app = test_client.application
+    with app.app_context():
+        alternativas = ['a', 'b', 'c', 'd']
+        atividade, questoes = criar_prova('TESTE101', [
+            (alternativas, 'a'), (alternativas, 'b'), (alternativas, ['a', 'b'])
+        ])
+        alunos = [
+            Usuario(nome_completo=f'Aluno Itens {i}', email=f'aluno.itens{i}@test.com',
+                    tipo='aluno', turma='TESTE101', senha_hash='x')
+            for i in range(4)
+        ]
+        db.session.add_all(alunos)
+        db.session.commit()
+        atividade_id = atividade.id
+        q1, q2, q3 = (q.id for q in questoes)
+
+        # Acertos: [1, 1, 1], [1, 1, 0], [1, 0, -], [0, 0, 0]
+        envios = [
+            [(q1, 'a'), (q2, 'b'), (q3, ['b', 'a'])],
+            [(q1, 'a'), (q2, 'b'), (q3, ['a'])],
+            [(q1, 'a'), (q2, 'c')],
+            [(q1, 'b'), (q2, 'c'), (q3, ['c'])],
+        ]
+        for aluno, envio in zip(alunos, envios):
+            corrigir_envio(atividade_id, aluno.id, [
+                {'questao_id': questao_id, 'resposta': resposta} for questao_id, resposta in envio
+            ])
+        db.session.commit()
+        get_response_cache().clear()
+
+    login('professor@test.com')
+    url = f'/api/atividades/{atividade_id}/analise-itens'
+    response = test_client.get(url)
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    data = response.get_json()
+
+    assert data['alunos'] == 4
+    assert data['alfa_cronbach'] == pytest.approx(0.75)
+    assert data['pontuacao_total'] == {'media': 1.5, 'desvio_padrao': pytest.approx(1.291, abs=1e-3)}
+
+    item1, item2, item3 = data['questoes']
+    assert [i['dificuldade'] for i in data['questoes']] == [0.75, 0.5, 0.25]
+    assert [i['discriminacao'] for i in data['questoes']] == [1.0, 1.0, 1.0]
+    assert item1['ponto_bisserial'] == pytest.approx(0.5222, abs=1e-4)
+    assert item3['respostas'] == 3
+
+    # Distratores: q1 só 'b' foi marcado (25%), q2 só 'c' (50%)
+    assert item1['eficiencia_distratores'] == 33.33
+    assert [(a['alternativa'], a['correta'], a['proporcao'], a['distrator_funcional'])
+            for a in item2['alternativas']] == [
+        ('a', False, 0.0, False), ('b', True, 0.5, None), ('c', False, 0.5, True), ('d', False, 0.0, False)
+    ]
+    marcadas_q3 = {a['alternativa']: a['proporcao'] for a in item3['alternativas']}
+    assert marcadas_q3 == {'a': 0.5, 'b': 0.25, 'c': 0.25, 'd': 0.0}
+    assert item3['alternativas'][0]['proporcao_superior'] == 1.0
+
+    assert test_client.get(url).headers['X-Cache'] == 'HIT'
+
+    # Nova resposta invalida a análise em cache
+    login('aluno@test.com')
+    response = test_client.post(f'/api/atividades/{atividade_id}/responder', json={
+        'respostas': [{'questao_id': q1, 'resposta': 'a'}]
+    })
+    assert response.status_code == 201
+
+    login('professor@test.com')
+    response = test_client.get(url)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['alunos'] == 5
+
+def test_analise_itens_sem_respostas(test_client, init_database, login, criar_prova):
+    """
+    Testa a análise de uma atividade ainda sem respostas.
+    """
+    app = test_client.application
+    with app.app_context():
+        atividade, _ = criar_prova('TESTE101', [(['a', 'b'], 'a')])
+        atividade_id = atividade.id
+
+    login('professor@test.com')
+    data = test_client.get(f'/api/atividades/{atividade_id}/analise-itens').get_json()
+    assert data['alunos'] == 0
+    assert data['alfa_cronbach'] is None
+    assert data['questoes'][0]['dificuldade'] is None
+    assert data['questoes'][0]['eficiencia_distratores'] == 0.0
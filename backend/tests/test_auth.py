@@ -39,15 +39,29 @@ def test_login_missing_fields(test_client, init_database):
     assert response.json['ok'] is False
     assert 'error' in response.json
 
-def test_logout(test_client, auth_headers_professor):
+def test_logout(test_client, init_database, login):
     """
-    Testa o logout de um usuário autenticado.
+    Testa o logout de um usuário autenticado (com login próprio, já que a sessão é revogada).
     """
-    response = test_client.post('/api/auth/logout', headers=auth_headers_professor)
+    login('professor@test.com')
+    response = test_client.post('/api/auth/logout')
     assert response.status_code == 200
     assert response.json['ok'] is True
     assert 'message' in response.json
 
+def test_logout_revoga_sessao(test_client, init_database, login):
+    """
+    Testa se o identificador de uma sessão encerrada é rejeitado ao ser reapresentado.
+    """
+    login('professor@test.com')
+    revogado = test_client.get_cookie('session').value
+    assert test_client.post('/api/auth/logout').status_code == 200
+
+    test_client.set_cookie('session', revogado)
+    response = test_client.get('/api/auth/me')
+    assert response.status_code == 401
+    assert response.json['ok'] is False
+
 def test_me_authenticated(test_client, auth_headers_professor):
     """
     Testa a rota /me para um usuário autenticado.
@@ -85,3 +99,129 @@ def test_check_unauthenticated(test_client):
     assert response.json['ok'] is True
     assert response.json['authenticated'] is False
 
+
+def test_current_user_cache_invalidation(test_app, init_database):
+    """
+    Testa se o cache de usuário é preenchido e invalidado quando a linha muda.
+    """
+    from flask import session
+    from app import db
+    from app.models.usuario import Usuario
+    from app.utils.auth import get_current_user, get_user_cache
+
+    with test_app.test_request_context():
+        usuario = Usuario.query.filter_by(email='aluno@test.com').first()
+        session['user_id'] = usuario.id
+
+        assert get_current_user() is get_current_user()
+        assert get_user_cache().get(usuario.id)['turma'] == usuario.turma
+
+        usuario.turma = 'OUTRA_TURMA'
+        db.session.commit()
+        assert get_user_cache().get(usuario.id) is None
+
+        usuario.turma = 'TESTE101'
+        db.session.commit()
+
+def test_autorizacao_confere_tipo_no_banco(test_app, init_database):
+    """
+    Testa se os decoradores ignoram o snapshot em cache quando tipo/status mudam
+    fora deste worker (update em lote não dispara a invalidação).
+    """
+    from flask import g, session
+    from app import db
+    from app.models.usuario import Usuario
+    from app.utils.auth import get_usuario_autorizado, get_user_cache
+
+    with test_app.app_context():
+        professor_id = Usuario.query.filter_by(email='professor@test.com').first().id
+
+    try:
+        with test_app.test_request_context():
+            session['user_id'] = professor_id
+            assert get_usuario_autorizado().tipo == 'professor'
+            assert get_user_cache().get(professor_id) is not None
+
+        with test_app.app_context():
+            Usuario.query.filter_by(id=professor_id).update({'tipo': 'aluno'})
+            db.session.commit()
+        assert get_user_cache().get(professor_id)['tipo'] == 'professor'
+
+        with test_app.test_request_context():
+            session['user_id'] = professor_id
+            assert get_usuario_autorizado().tipo == 'aluno'
+            assert get_user_cache().get(professor_id)['tipo'] == 'aluno'
+
+        with test_app.app_context():
+            Usuario.query.filter_by(id=professor_id).update({'tipo': 'professor', 'status': 'inativo'})
+            db.session.commit()
+        with test_app.test_request_context():
+            session['user_id'] = professor_id
+            assert get_usuario_autorizado() is None
+    finally:
+        with test_app.app_context():
+            Usuario.query.filter_by(id=professor_id).update({'tipo': 'professor', 'status': 'ativo'})
+            db.session.commit()
+            get_user_cache().delete(professor_id)
+
+def test_password_hashing_pool_rehash(test_app):
+    """
+    Testa o pool de hashing e a detecção de rehash quando as iterações mudam.
+    """
+    from app.utils.password_hashing import (
+        get_hashing_pool, hash_senha, hash_senhas, verificar_senha, precisa_rehash
+    )
+
+    with test_app.app_context():
+        senha_hash = hash_senha('segredo')
+        assert verificar_senha(senha_hash, 'segredo') is True
+        assert verificar_senha(senha_hash, 'errada') is False
+        assert precisa_rehash(senha_hash) is False
+
+        metodo_original = test_app.config['PASSWORD_HASH_METHOD']
+        test_app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+        try:
+            assert precisa_rehash(senha_hash) is True
+            hashes = hash_senhas(['a', 'b', 'c'])
+            assert all(h.startswith('pbkdf2:sha256:1000$') for h in hashes)
+        finally:
+            test_app.config['PASSWORD_HASH_METHOD'] = metodo_original
+
+        stats = get_hashing_pool().stats()
+        assert stats['concluidos'] >= 6
+        assert stats['pendentes'] == 0
+
+def test_vagas_de_hashing_compartilhadas_entre_workers(tmp_path):
+    """
+    Testa se as vagas de hashing valem para o host (dois pools no mesmo diretório,
+    como dois workers) e se a recusa é imediata quando estão todas ocupadas.
+    """
+    import threading
+    import time
+    import pytest
+    from app.utils.password_hashing import PasswordHashingPool, HashingPoolBusy
+
+    worker_a = PasswordHashingPool(vagas=1, espera=0.05, diretorio=str(tmp_path))
+    worker_b = PasswordHashingPool(vagas=1, espera=0.05, diretorio=str(tmp_path))
+    ocupada, liberar = threading.Event(), threading.Event()
+
+    def hash_lento():
+        ocupada.set()
+        liberar.wait(5)
+        return 'ok'
+
+    thread = threading.Thread(target=worker_a.run, args=(hash_lento,))
+    thread.start()
+    try:
+        assert ocupada.wait(5)
+        inicio = time.monotonic()
+        with pytest.raises(HashingPoolBusy):
+            worker_b.run(lambda: 'nunca')
+        assert time.monotonic() - inicio < 1
+        assert worker_b.stats()['recusados'] == 1
+    finally:
+        liberar.set()
+        thread.join()
+
+    assert worker_b.run(lambda: 'ok') == 'ok'
+    assert worker_a.stats()['pendentes'] == 0
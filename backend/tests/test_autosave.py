@@ -0,0 +1,117 @@
+"""
+Testes do autosave de rascunhos (buffer write-behind e consumo no envio final)
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import db
+from app.models.usuario import Usuario
+from app.models.questao import Resposta
+from app.models.rascunho_resposta import RascunhoResposta
+from app.utils.autosave import get_autosave
+
+PROVA = [(['a', 'b'], 'a')] * 3
+
+def test_autosave_em_lote(test_client, init_database, login, criar_prova):
+    """
+    Testa a última gravação valendo, a leitura antes da descarga e a descarga num único upsert
+    (mais a consulta das questões já respondidas).
+    """
+    app = test_client.application
+    with app.app_context():
+        atividade, questoes = criar_prova('TESTE101', PROVA)
+        atividade_id, (q1, q2, q3) = atividade.id, [q.id for q in questoes]
+        aluno_id = Usuario.query.filter_by(email='aluno@test.com').first().id
+
+    login('aluno@test.com')
+    url = f'/api/atividades/{atividade_id}/rascunho'
+    for resposta in ('b', 'a'):
+        response = test_client.put(url, json={'respostas': [{'questao_id': q1, 'resposta': resposta}]})
+        assert response.status_code == 202
+    assert test_client.put(url, json={'respostas': [{'questao_id': q2, 'resposta': 'b'}]}).status_code == 202
+    assert test_client.put(url, json={'respostas': [{'resposta': 'b'}]}).status_code == 400
+    # Questão de outra atividade (ou inexistente) não entra no buffer
+    assert test_client.put(url, json={'respostas': [{'questao_id': 999999, 'resposta': 'b'}]}).status_code == 400
+
+    # Ainda só no buffer: nada no banco, mas a leitura já enxerga
+    with app.app_context():
+        assert RascunhoResposta.query.count() == 0
+    rascunhos = test_client.get(url).get_json()['rascunhos']
+    assert [(r['questao_id'], r['resposta']) for r in rascunhos] == [(q1, 'a'), (q2, 'b')]
+
+    with app.app_context():
+        # Rascunho mais novo gravado por outro worker não é sobrescrito pelo buffer
+        db.session.add(RascunhoResposta(aluno_id=aluno_id, questao_id=q2, atividade_id=atividade_id,
+                                        resposta='"a"', atualizado_em=datetime.utcnow() + timedelta(minutes=1)))
+        db.session.commit()
+
+        comandos = []
+        registrar = lambda *args: comandos.append(1)
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            assert get_autosave().descarregar() == 2
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        assert len(comandos) == 2  # Questões já respondidas + um único upsert
+        assert get_autosave().descarregar() == 0
+
+        gravados = dict(db.session.query(RascunhoResposta.questao_id, RascunhoResposta.resposta)
+                        .filter_by(aluno_id=aluno_id).all())
+        assert gravados == {q1: '"a"', q2: '"a"'}
+
+def test_envio_consome_rascunhos(test_client, init_database, login, criar_prova):
+    """
+    Testa o envio final completando as questões ausentes com os rascunhos (banco e buffer).
+    """
+    app = test_client.application
+    with app.app_context():
+        atividade, questoes = criar_prova('TESTE101', PROVA)
+        atividade_id, (q1, q2, q3) = atividade.id, [q.id for q in questoes]
+        aluno_id = Usuario.query.filter_by(email='aluno@test.com').first().id
+
+    login('aluno@test.com')
+    url = f'/api/atividades/{atividade_id}/rascunho'
+    test_client.put(url, json={'respostas': [{'questao_id': q1, 'resposta': 'a'}, {'questao_id': q2, 'resposta': 'a'}]})
+    with app.app_context():
+        get_autosave().descarregar()
+    # q3 fica só no buffer
+    test_client.put(url, json={'respostas': [{'questao_id': q3, 'resposta': 'a'}]})
+
+    # O envio tem prioridade sobre o rascunho de q1
+    response = test_client.post(f'/api/atividades/{atividade_id}/responder', json={
+        'respostas': [{'questao_id': q1, 'resposta': 'b'}]
+    })
+    assert response.status_code == 201
+    data = response.get_json()
+    assert {(r['questao_id'], r['correta']) for r in data['respostas']} == {(q1, False), (q2, True), (q3, True)}
+    assert data['nota_total'] == 2.0
+
+    with app.app_context():
+        assert RascunhoResposta.query.filter_by(aluno_id=aluno_id, atividade_id=atividade_id).count() == 0
+        assert get_autosave().pendentes(aluno_id, atividade_id) == {}
+        assert Resposta.query.filter_by(aluno_id=aluno_id, atividade_id=atividade_id).count() == 3
+
+        # Rascunho que estava no buffer de outro worker na hora do envio não vira órfão
+        get_autosave().registrar(aluno_id, atividade_id, {q1: 'a'})
+        assert get_autosave().descarregar() == 0
+        assert RascunhoResposta.query.filter_by(aluno_id=aluno_id, atividade_id=atividade_id).count() == 0
+    assert test_client.get(url).get_json()['rascunhos'] == []
+
+def test_autosave_descarta_linha_invalida(test_client, init_database, login, criar_prova):
+    """
+    Testa se um rascunho rejeitado pelo banco é descartado sem travar os demais.
+    """
+    app = test_client.application
+    with app.app_context():
+        atividade, questoes = criar_prova('TESTE101', PROVA)
+        atividade_id, (q1, q2, _) = atividade.id, [q.id for q in questoes]
+        aluno_id = Usuario.query.filter_by(email='aluno@test.com').first().id
+
+        autosave = get_autosave()
+        autosave.registrar(aluno_id, atividade_id, {q1: 'a'})
+        autosave.registrar(aluno_id, None, {q2: 'b'})  # atividade_id obrigatória: viola NOT NULL
+
+        assert autosave.descarregar() == 1
+        assert autosave.descarregar() == 0
+        gravados = dict(db.session.query(RascunhoResposta.questao_id, RascunhoResposta.resposta)
+                        .filter_by(aluno_id=aluno_id, atividade_id=atividade_id).all())
+        assert gravados == {q1: '"a"'}
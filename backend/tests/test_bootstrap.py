@@ -0,0 +1,150 @@
+"""
+Testes para o bootstrap do banco (uma vez por deploy)
+"""
+import json
+import os
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import upgrade
+from sqlalchemy import inspect, text
+from app.bootstrap import bootstrap_database, schema_fingerprint, bootstrap_marker
+from app import create_app, db
+from app.config import config
+
+MIGRACOES = os.path.join(os.path.dirname(__file__), '..', 'migrations')
+
+@pytest.fixture
+def app_arquivo(tmp_path, monkeypatch):
+    """Aplicação apontando para um banco SQLite vazio em arquivo (sem create_all)"""
+    # O engine é criado no init_app: a URI precisa estar na configuração antes
+    monkeypatch.setattr(config['development'], 'SQLALCHEMY_DATABASE_URI',
+                        f'sqlite:///{tmp_path / "migracoes.db"}')
+    app = create_app('development')
+    app.config['TESTING'] = True
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+def diferencas_do_esquema():
+    """Diferenças entre o banco atual e os modelos (vazio = esquema igual)"""
+    with db.engine.connect() as conn:
+        return compare_metadata(MigrationContext.configure(conn), db.metadata)
+
+def test_bootstrap_executa_uma_vez(test_app):
+    """
+    Testa se o bootstrap é pulado quando o marcador corresponde ao esquema.
+    """
+    with test_app.app_context():
+        bootstrap_database(test_app, force=True)
+        assert bootstrap_database(test_app) is False
+
+        with db.engine.connect() as conn:
+            versao = conn.execute(bootstrap_marker.select()).first().versao
+        assert versao == schema_fingerprint()
+
+def test_startup_timings_registrados(test_app):
+    """
+    Testa se os tempos de cada fase da inicialização ficam disponíveis.
+    """
+    tempos = test_app.extensions['startup_timings']
+    for fase in ('extensoes', 'blueprints', 'bootstrap_db', 'total'):
+        assert tempos[fase] >= 0
+
+def test_migracoes_criam_o_esquema_dos_modelos(app_arquivo):
+    """
+    Testa se `flask db upgrade` num banco vazio chega ao esquema declarado nos modelos.
+    """
+    upgrade(directory=MIGRACOES)
+    
+    assert diferencas_do_esquema() == []
+
+def test_migracoes_adotam_banco_do_create_all(app_arquivo):
+    """
+    Testa se um banco criado pelo create_all das versões sem migrações é adotado
+    pela revisão inicial e recebe as colunas novas preenchidas.
+    """
+    upgrade(directory=MIGRACOES, revision='4edeb2fb0d5d')
+    with db.engine.begin() as conn:
+        # Banco legado: tabelas existentes, sem alembic_version
+        conn.execute(text('DROP TABLE alembic_version'))
+        conn.execute(text(
+            "INSERT INTO usuarios (id, nome_completo, email, senha_hash, tipo) "
+            "VALUES (1, 'Prof', 'prof@test.com', 'x', 'professor')"
+        ))
+        conn.execute(text(
+            "INSERT INTO atividades (id, titulo, tipo, prazo, criado_por) "
+            "VALUES (1, 'Antiga', 'individual', '2030-01-01 00:00:00', 1)"
+        ))
+        conn.execute(text("INSERT INTO grupos (nome, atividade_id) VALUES ('Antigo', 1)"))
+    
+    upgrade(directory=MIGRACOES)
+    
+    assert diferencas_do_esquema() == []
+    with db.engine.connect() as conn:
+        assert conn.execute(text(
+            "SELECT atualizado_em FROM grupos WHERE nome = 'Antigo'"
+        )).scalar() is not None
+
+def test_migracao_do_indice_unico_recusa_duplicatas(app_arquivo):
+    """
+    Testa se a migração do índice único não apaga respostas duplicadas:
+    recusa o upgrade e mantém as linhas para revisão.
+    """
+    upgrade(directory=MIGRACOES, revision='fa2a5da8fd41')
+    with db.engine.begin() as conn:
+        for resposta in ('"a"', '"b"'):
+            conn.execute(text(
+                'INSERT INTO respostas (questao_id, aluno_id, atividade_id, resposta) '
+                'VALUES (900, 900, 900, :resposta)'
+            ), {'resposta': resposta})
+    
+    # O Flask-Migrate registra o erro da migração e encerra o comando
+    with pytest.raises(SystemExit):
+        upgrade(directory=MIGRACOES)
+    
+    with db.engine.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM respostas')).scalar() == 2
+    assert 'uq_respostas_questao_aluno' not in {
+        i['name'] for i in inspect(db.engine).get_indexes('respostas')
+    }
+
+def test_respostas_duplicadas_revisadas_antes_do_indice(app_arquivo, tmp_path):
+    """
+    Testa se `flask respostas-duplicadas` só lista sem --manter e, com o critério
+    escolhido, mantém a resposta certa, grava o backup e libera a migração.
+    """
+    upgrade(directory=MIGRACOES, revision='fa2a5da8fd41')
+    with db.engine.begin() as conn:
+        for id_, data, pontos in ((1, '2030-01-01 10:00:00', 0), (2, '2030-01-01 10:05:00', 2)):
+            conn.execute(text(
+                'INSERT INTO respostas (id, questao_id, aluno_id, atividade_id, resposta, pontos_obtidos, data_resposta) '
+                'VALUES (:id, 900, 900, 900, :resposta, :pontos, :data)'
+            ), {'id': id_, 'resposta': '"a"', 'pontos': pontos, 'data': data})
+    runner = app_arquivo.test_cli_runner()
+    
+    resultado = runner.invoke(args=['respostas-duplicadas'])
+    assert 'Questão 900, aluno 900' in resultado.output
+    assert '1 pares duplicados' in resultado.output
+    resultado = runner.invoke(args=['respostas-duplicadas', '--manter', 'melhor'])
+    assert resultado.exit_code != 0
+    with db.engine.connect() as conn:
+        assert conn.execute(text('SELECT COUNT(*) FROM respostas')).scalar() == 2
+    
+    backup = tmp_path / 'removidas.json'
+    resultado = runner.invoke(args=['respostas-duplicadas', '--manter', 'melhor', '--backup', str(backup)])
+    assert '1 respostas removidas' in resultado.output
+    with db.engine.connect() as conn:
+        assert conn.execute(text('SELECT id FROM respostas')).scalars().all() == [2]
+    removidas = json.loads(backup.read_text(encoding='utf-8'))
+    assert [(r['id'], r['mantida_id']) for r in removidas] == [(1, 2)]
+    
+    upgrade(directory=MIGRACOES)
+    assert diferencas_do_esquema() == []
+
+def test_bootstrap_sem_tabelas_e_ignorado(app_arquivo):
+    """
+    Testa se o bootstrap não cria tabelas: sem as migrações aplicadas ele é pulado.
+    """
+    assert bootstrap_database(app_arquivo) is False
+    assert inspect(db.engine).get_table_names() == []
@@ -0,0 +1,122 @@
+"""
+Testes do GET condicional (ETag / Last-Modified / 304)
+"""
+from datetime import datetime
+from app import db
+from app.models.usuario import Usuario
+from app.models.atividade import Atividade
+from app.models.grupo import Grupo, GrupoMembro
+
+def _login_professor(test_client):
+    response = test_client.post(
+        '/api/auth/login',
+        json={'email': 'professor@test.com', 'senha': 'testpass'}
+    )
+    assert response.status_code == 200
+
+def test_listagem_304_ate_alterar(test_client, init_database):
+    """
+    Testa se a listagem responde 304 sem corpo enquanto o conjunto não muda.
+    """
+    app = test_client.application
+    with app.app_context():
+        professor = Usuario.query.filter_by(email='professor@test.com').first()
+        atividade = Atividade(titulo='Condicional', descricao='Teste', tipo='individual',
+                              prazo=datetime(2030, 1, 1), criado_por=professor.id, turma='COND01')
+        db.session.add(atividade)
+        db.session.commit()
+        atividade_id = atividade.id
+    
+    _login_professor(test_client)
+    
+    response = test_client.get('/api/atividades/?turma=COND01')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    
+    response = test_client.get('/api/atividades/?turma=COND01', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    
+    # Outra representação (fields) tem outra ETag
+    response = test_client.get('/api/atividades/?turma=COND01&fields=id', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    
+    with app.app_context():
+        db.session.get(Atividade, atividade_id).titulo = 'Condicional alterada'
+        db.session.commit()
+    
+    response = test_client.get('/api/atividades/?turma=COND01', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['atividades'][0]['titulo'] == 'Condicional alterada'
+    
+    # Detalhe em cache: um só validador (ETag pelo conteúdo) no MISS e no HIT
+    response = test_client.get(f'/api/atividades/{atividade_id}')
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    etag = response.headers['ETag']
+    response = test_client.get(f'/api/atividades/{atividade_id}')
+    assert response.headers['X-Cache'] == 'HIT'
+    assert response.headers['ETag'] == etag
+    assert response.headers.get('Last-Modified') is None
+    response = test_client.get(f'/api/atividades/{atividade_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+def test_membros_alteram_etag_do_grupo(test_client, init_database):
+    """
+    Testa se adicionar um membro muda a ETag do grupo (membros fazem parte do JSON).
+    """
+    app = test_client.application
+    with app.app_context():
+        professor = Usuario.query.filter_by(email='professor@test.com').first()
+        aluno = Usuario.query.filter_by(email='aluno@test.com').first()
+        atividade = Atividade(titulo='Grupo condicional', descricao='Teste', tipo='grupo',
+                              prazo=datetime(2030, 1, 1), criado_por=professor.id, turma='COND02')
+        db.session.add(atividade)
+        db.session.flush()
+        grupo = Grupo(nome='Grupo condicional', atividade_id=atividade.id)
+        db.session.add(grupo)
+        db.session.commit()
+        grupo_id, aluno_id = grupo.id, aluno.id
+        antes = grupo.atualizado_em
+    
+    _login_professor(test_client)
+    
+    response = test_client.get(f'/api/grupos/{grupo_id}')
+    etag = response.headers['ETag']
+    
+    with app.app_context():
+        db.session.add(GrupoMembro(grupo_id=grupo_id, aluno_id=aluno_id))
+        db.session.commit()
+        assert db.session.get(Grupo, grupo_id).atualizado_em > antes
+    
+    response = test_client.get(f'/api/grupos/{grupo_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(response.get_json()['grupo']['membros']) == 1
+
+def test_relacoes_em_fields_sem_etag(test_client, init_database):
+    """
+    Testa se listagens com relações pedidas em ?fields= (ou ?include=) não recebem ETag.
+    """
+    app = test_client.application
+    with app.app_context():
+        professor = Usuario.query.filter_by(email='professor@test.com').first()
+        atividade = Atividade(titulo='Relações', descricao='Teste', tipo='grupo',
+                              prazo=datetime(2030, 1, 1), criado_por=professor.id, turma='COND03')
+        db.session.add(atividade)
+        db.session.flush()
+        db.session.add(Grupo(nome='Grupo relações', atividade_id=atividade.id))
+        db.session.commit()
+        atividade_id = atividade.id
+    
+    _login_professor(test_client)
+    
+    assert 'ETag' in test_client.get('/api/atividades/?turma=COND03&fields=id,titulo').headers
+    assert 'ETag' not in test_client.get('/api/atividades/?turma=COND03&fields=id,grupos').headers
+    assert 'ETag' not in test_client.get('/api/atividades/?turma=COND03&include=grupos').headers
+    
+    # Membros (relação padrão do grupo) trazem o nome do aluno, que não toca o grupo
+    url = f'/api/grupos/?atividade_id={atividade_id}'
+    assert 'ETag' not in test_client.get(url).headers
+    assert 'ETag' in test_client.get(f'{url}&fields=id,nome').headers
@@ -0,0 +1,281 @@
+"""
+Testes da correção em lote das atividades de múltipla escolha
+"""
+from datetime import timedelta
+from sqlalchemy import event
+from app import db
+from app.models.usuario import Usuario
+from app.models.questao import Questao, Resposta
+from app.utils.grading import corrigir_envio
+from app.utils.idempotency import limpar_chaves_expiradas
+
+# Uma questão single (2 pontos) e uma multiple (1 ponto)
+QUESTOES = [(['3', '4'], '4', 2.0), (['1', '2', '3', '4'], ['2', '4'])]
+
+def test_corrigir_envio_em_dois_comandos(test_app, criar_prova):
+    """
+    Testa a correção (single e multiple sem ordem) e que o envio custa dois comandos SQL.
+    """
+    with test_app.app_context():
+        professor = Usuario(nome_completo='Prof Correcao', email='prof.correcao@test.com',
+                            tipo='professor', senha_hash='x')
+        aluno = Usuario(nome_completo='Aluno Correcao', email='aluno.correcao@test.com',
+                        tipo='aluno', turma='CORR01', senha_hash='x')
+        db.session.add_all([professor, aluno])
+        db.session.commit()
+        atividade, (single, multiple) = criar_prova('CORR01', QUESTOES, professor_id=professor.id)
+        outra, (questao_alheia, _) = criar_prova('CORR01', QUESTOES, professor_id=professor.id)
+        # Ler os ids antes da contagem (o commit expira os objetos)
+        atividade_id, aluno_id, outra_id = atividade.id, aluno.id, outra.id
+        single_id, multiple_id, alheia_id = single.id, multiple.id, questao_alheia.id
+
+        comandos = []
+        registrar = lambda *args: comandos.append(1)
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            criadas, nota, possiveis = corrigir_envio(atividade_id, aluno_id, [
+                {'questao_id': single_id, 'resposta': '4'},
+                {'questao_id': multiple_id, 'resposta': ['4', '2']},
+                {'questao_id': single_id, 'resposta': '3'},  # repetida no envio
+                {'questao_id': alheia_id, 'resposta': '4'},  # de outra atividade
+                {'questao_id': 'x', 'resposta': '4'},
+            ])
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        assert len(comandos) == 2
+        assert [(r.questao_id, r.correta, r.pontos_obtidos) for r in criadas] == [
+            (single_id, True, 2.0), (multiple_id, True, 1.0)
+        ]
+        assert (nota, possiveis) == (3.0, 3.0)
+        assert criadas[0].get_resposta() == '4'
+        db.session.commit()
+
+        # Questões já respondidas são descartadas pelo ON CONFLICT e não contam na nota
+        criadas, nota, possiveis = corrigir_envio(atividade_id, aluno_id, [
+            {'questao_id': single_id, 'resposta': '3'},
+        ])
+        assert (criadas, nota, possiveis) == ([], 0, 0)
+        assert Resposta.query.filter_by(questao_id=single_id, aluno_id=aluno_id).one().correta is True
+
+        criadas, nota, possiveis = corrigir_envio(outra_id, aluno_id, [
+            {'questao_id': alheia_id, 'resposta': '3'},
+        ])
+        db.session.commit()
+        assert (criadas[0].correta, nota, possiveis) == (False, 0, 2.0)
+        assert Resposta.query.filter_by(aluno_id=aluno_id).count() == 3
+
+def test_rota_responder_atividade(test_client, init_database, login, criar_prova):
+    """
+    Testa o endpoint de envio com a correção em lote (formato da resposta inalterado).
+    """
+    app = test_client.application
+    with app.app_context():
+        atividade, (single, multiple) = criar_prova('TESTE101', QUESTOES)
+        atividade_id, single_id, multiple_id = atividade.id, single.id, multiple.id
+
+    login('aluno@test.com')
+
+    response = test_client.post(f'/api/atividades/{atividade_id}/responder', json={'respostas': [
+        {'questao_id': single_id, 'resposta': '3'},
+        {'questao_id': multiple_id, 'resposta': ['2', '4']},
+    ]})
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data['ok'] is True
+    assert [r['correta'] for r in data['respostas']] == [False, True]
+    assert data['nota_total'] == 1.0
+    assert data['pontos_possiveis'] == 3.0
+    assert data['nota_percentual'] == 33.33
+
+    response = test_client.get(f'/api/atividades/{atividade_id}/minhas-respostas')
+    assert len(response.get_json()['respostas']) == 2
+
+def test_idempotency_key(test_client, init_database, login, criar_prova):
+    """
+    Testa o reenvio com a mesma Idempotency-Key (resultado gravado, sem nova correção)
+    e o reenvio sem chave (respostas duplicadas descartadas).
+    """
+    app = test_client.application
+    with app.app_context():
+        atividade, (single, multiple) = criar_prova('TESTE101', QUESTOES)
+        outra, _ = criar_prova('TESTE101', QUESTOES)
+        atividade_id, outra_id, single_id = atividade.id, outra.id, single.id
+
+    login('aluno@test.com')
+
+    url = f'/api/atividades/{atividade_id}/responder'
+    envio = {'respostas': [{'questao_id': single_id, 'resposta': '4'}]}
+    headers = {'Idempotency-Key': 'envio-1'}
+
+    primeira = test_client.post(url, json=envio, headers=headers)
+    assert primeira.status_code == 201
+    assert 'Idempotent-Replayed' not in primeira.headers
+
+    repetida = test_client.post(url, json=envio, headers=headers)
+    assert repetida.status_code == 201
+    assert repetida.headers['Idempotent-Replayed'] == 'true'
+    assert repetida.get_json() == primeira.get_json()
+
+    # Sem chave: nada é gravado de novo e a nota não é inflada
+    response = test_client.post(url, json=envio)
+    assert response.status_code == 201
+    assert response.get_json()['respostas'] == []
+    assert response.get_json()['nota_total'] == 0
+
+    # Mesma chave em outra atividade
+    response = test_client.post(f'/api/atividades/{outra_id}/responder', json=envio, headers=headers)
+    assert response.status_code == 422
+
+    response = test_client.post(url, json=envio, headers={'Idempotency-Key': 'x' * 200})
+    assert response.status_code == 400
+
+    with app.app_context():
+        assert Resposta.query.filter_by(questao_id=single_id).count() == 1
+        
+        # Chaves expiradas são removidas em lote
+        ttl = app.config['IDEMPOTENCY_KEY_TTL']
+        app.config['IDEMPOTENCY_KEY_TTL'] = timedelta(0)
+        try:
+            assert limpar_chaves_expiradas(lote=1) == 1
+        finally:
+            app.config['IDEMPOTENCY_KEY_TTL'] = ttl
+
+def test_estatisticas_em_uma_consulta(test_client, init_database, login, criar_prova):
+    """
+    Testa as estatísticas agregadas (taxa de acerto e distribuição por alternativa),
+    incluindo respostas antigas sem a coluna normalizada.
+    """
+    app = test_client.application
+    with app.app_context():
+        atividade, (single, multiple) = criar_prova('TESTE101', QUESTOES)
+        sem_respostas = Questao(atividade_id=atividade.id, enunciado='Vazia', ordem=3)
+        sem_respostas.set_alternativas(['a', 'b'])
+        db.session.add(sem_respostas)
+        alunos = [
+            Usuario(nome_completo=f'Aluno Estat {i}', email=f'aluno.estat{i}@test.com',
+                    tipo='aluno', turma='TESTE101', senha_hash='x')
+            for i in range(3)
+        ]
+        db.session.add_all(alunos)
+        db.session.commit()
+        atividade_id = atividade.id
+
+        corrigir_envio(atividade_id, alunos[0].id, [
+            {'questao_id': single.id, 'resposta': '4'},
+            {'questao_id': multiple.id, 'resposta': ['4', '2']},
+        ])
+        corrigir_envio(atividade_id, alunos[1].id, [
+            {'questao_id': single.id, 'resposta': '3'},
+            {'questao_id': multiple.id, 'resposta': ['2', '4']},
+        ])
+        # Resposta gravada antes da coluna normalizada existir
+        db.session.add(Resposta(questao_id=multiple.id, aluno_id=alunos[2].id, atividade_id=atividade_id,
+                                resposta='["1", "2"]', correta=False, pontos_obtidos=0))
+        db.session.commit()
+
+    login('professor@test.com')
+
+    comandos = []
+    registrar = lambda conn, cursor, sql, *args: comandos.append(sql)
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+    try:
+        response = test_client.get(f'/api/atividades/{atividade_id}/estatisticas')
+    finally:
+        with app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+    assert response.status_code == 200
+
+    single_stats, multiple_stats, vazia = response.get_json()['estatisticas']
+    assert single_stats['total_respostas'] == 2
+    assert single_stats['respostas_corretas'] == 1
+    assert single_stats['taxa_acerto'] == 50.0
+    assert single_stats['distribuicao'] == [
+        {'alternativa': '3', 'total': 1}, {'alternativa': '4', 'total': 1}
+    ]
+    assert multiple_stats['total_respostas'] == 3
+    assert multiple_stats['respostas_corretas'] == 2
+    assert multiple_stats['distribuicao'] == [
+        {'alternativa': '1', 'total': 1}, {'alternativa': '2', 'total': 3},
+        {'alternativa': '3', 'total': 0}, {'alternativa': '4', 'total': 2}
+    ]
+    assert vazia['total_respostas'] == 0 and vazia['taxa_acerto'] == 0
+    assert [d['total'] for d in vazia['distribuicao']] == [0, 0]
+
+    # Todas as questões e respostas em um único SELECT agrupado
+    assert len([sql for sql in comandos if 'respostas' in sql]) == 1
+
+def test_recorrecao_ao_alterar_gabarito(test_client, init_database, login, criar_prova):
+    """
+    Testa a recorreção vetorizada ao corrigir o gabarito (na requisição e como tarefa),
+    com as variações de pontos por aluno.
+    """
+    app = test_client.application
+    with app.app_context():
+        atividade, (single, multiple) = criar_prova('TESTE101', QUESTOES)
+        alunos = [
+            Usuario(nome_completo=f'Aluno Recor {i}', email=f'aluno.recor{i}@test.com',
+                    tipo='aluno', turma='TESTE101', senha_hash='x')
+            for i in range(3)
+        ]
+        db.session.add_all(alunos)
+        db.session.commit()
+        atividade_id, single_id, multiple_id = atividade.id, single.id, multiple.id
+        aluno_ids = [a.id for a in alunos]
+
+        corrigir_envio(atividade_id, aluno_ids[0], [
+            {'questao_id': single_id, 'resposta': '4'},
+            {'questao_id': multiple_id, 'resposta': ['2', '4']},
+        ])
+        corrigir_envio(atividade_id, aluno_ids[1], [
+            {'questao_id': single_id, 'resposta': '3'},
+            {'questao_id': multiple_id, 'resposta': ['4', '2', '1']},
+        ])
+        corrigir_envio(atividade_id, aluno_ids[2], [
+            {'questao_id': single_id, 'resposta': ['3']},  # lista numa questão single: nunca acerta
+        ])
+        db.session.commit()
+
+    login('professor@test.com')
+
+    # Gabarito corrigido: '3' passa a ser a correta
+    response = test_client.put(f'/api/questoes/{single_id}', json={'resposta_correta': '3'})
+    assert response.status_code == 200
+    recorrecao = response.get_json()['recorrecao']
+    assert recorrecao['respostas'] == 3
+    assert recorrecao['respostas_alteradas'] == 2
+    assert recorrecao['alunos'] == [
+        {'aluno_id': aluno_ids[0], 'delta': -2.0}, {'aluno_id': aluno_ids[1], 'delta': 2.0}
+    ]
+
+    # Sem mudança no gabarito não há recorreção
+    response = test_client.put(f'/api/questoes/{single_id}', json={'enunciado': 'Quanto é 1 + 2?'})
+    assert 'recorrecao' not in response.get_json()
+
+    # Acima do limite a recorreção vira tarefa (executada na hora com TESTING)
+    app.config['REGRADE_SYNC_LIMIT'] = 0
+    try:
+        response = test_client.put(f'/api/questoes/{multiple_id}', json={
+            'resposta_correta': ['1', '2', '4'], 'pontuacao': 3
+        })
+        tarefa = response.get_json()['tarefa']
+        assert tarefa['status'] == 'concluida'
+        assert tarefa['resultado']['alunos'] == [
+            {'aluno_id': aluno_ids[0], 'delta': -1.0}, {'aluno_id': aluno_ids[1], 'delta': 3.0}
+        ]
+        
+        response = test_client.post(f'/api/atividades/{atividade_id}/recorrigir')
+        assert response.status_code == 202
+        assert response.get_json()['tarefa']['resultado']['respostas_alteradas'] == 0
+    finally:
+        app.config['REGRADE_SYNC_LIMIT'] = 2000
+
+    with app.app_context():
+        pontos = dict(db.session.execute(
+            db.select(Resposta.aluno_id, db.func.sum(Resposta.pontos_obtidos))
+            .where(Resposta.atividade_id == atividade_id)
+            .group_by(Resposta.aluno_id)
+        ).all())
+        assert {aluno: float(total) for aluno, total in pontos.items()} == {
+            aluno_ids[0]: 0.0, aluno_ids[1]: 5.0, aluno_ids[2]: 0.0
+        }
@@ -0,0 +1,83 @@
+"""
+Testes dos índices: EXPLAIN QUERY PLAN das consultas principais das rotas (SQLite)
+"""
+import re
+from datetime import date
+from app import db
+from app.models.usuario import Usuario
+from app.models.atividade import Atividade
+from app.models.entrega import Entrega
+from app.models.notificacao import Notificacao
+from app.models.followup import FollowUp
+from app.models.questao import Resposta
+from app.utils.notifications import consulta_caixa_entrada
+
+# "SCAN tabela" sem índice = leitura da tabela inteira
+SCAN_COMPLETO = re.compile(r'^SCAN (\w+)$')
+
+def plano(query):
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN da consulta"""
+    stmt = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    with db.engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {stmt}')]
+
+def assert_sem_scan_completo(query):
+    detalhes = plano(query)
+    completos = [d for d in detalhes if SCAN_COMPLETO.match(d)]
+    assert not completos, f'Scan completo: {detalhes}'
+
+def test_consultas_das_rotas_usam_indices(test_app):
+    """
+    Testa se as consultas principais das listagens usam índice (sem scan completo).
+    """
+    with test_app.app_context():
+        aluno = Usuario(id=9001, nome_completo='Aluno Plano', email='aluno.plano@test.com',
+                        tipo='aluno', turma='PLANO01', status='ativo', senha_hash='x')
+        
+        consultas = {
+            # atividades.listar_atividades (aluno)
+            'atividades': Atividade.query.filter_by(turma='PLANO01', ativo=True)
+                .order_by(Atividade.prazo, Atividade.id),
+            # entregas.listar_entregas (aluno)
+            'entregas': Entrega.query.filter_by(aluno_id=1)
+                .order_by(Entrega.data_envio.desc(), Entrega.id.desc()),
+            # entregas.entregas_para_lider / consolidar_entrega_grupo
+            'entregas_lider': Entrega.query.filter_by(destino_grupo=True, encaminhado_para=1),
+            # notificacoes.minhas_notificacoes
+            'notificacoes': consulta_caixa_entrada(aluno)[0]
+                .order_by(Notificacao.data_envio.desc(), Notificacao.id.desc()),
+            # notificacoes pessoais não lidas
+            'notificacoes_nao_lidas': Notificacao.query.filter_by(usuario_id=1, lida=False)
+                .order_by(Notificacao.data_envio.desc()),
+            # followups.meus_followups / listar_followups_admin
+            'followups': FollowUp.query.filter_by(aluno_id=1)
+                .order_by(FollowUp.data.desc(), FollowUp.id.desc()),
+            # followups.criar_followup (um por dia)
+            'followup_do_dia': FollowUp.query.filter_by(aluno_id=1, data=date(2030, 1, 1)),
+            # questoes.responder_atividade (resposta existente)
+            'resposta_existente': Resposta.query.filter_by(questao_id=1, aluno_id=1),
+            # usuarios.listar_alunos
+            'alunos': Usuario.query.filter_by(tipo='aluno', turma='PLANO01', status='ativo')
+                .order_by(Usuario.id),
+        }
+        
+        for nome, query in consultas.items():
+            try:
+                assert_sem_scan_completo(query)
+            except AssertionError as erro:
+                raise AssertionError(f'{nome}: {erro}')
+
+def test_indices_compostos_escolhidos(test_app):
+    """
+    Testa se o planner escolhe os índices compostos nas consultas que eles cobrem.
+    """
+    with test_app.app_context():
+        detalhes = ' '.join(plano(
+            Atividade.query.filter_by(turma='PLANO01', ativo=True).order_by(Atividade.prazo)
+        ))
+        assert 'ix_atividades_turma_ativo_prazo' in detalhes
+        
+        detalhes = ' '.join(plano(
+            Usuario.query.filter_by(tipo='aluno', turma='PLANO01', status='ativo')
+        ))
+        assert 'ix_usuarios_tipo_turma_status' in detalhes
@@ -0,0 +1,463 @@
+"""
+Testes para o utilitário de notificações
+"""
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import event, update
+from app import db
+from app.models.usuario import Usuario
+from app.models.notificacao import Notificacao, NotificacaoLeitura, NotificacaoMarcador
+from app.models.evento_notificacao import EventoNotificacao
+from app.models.atividade import Atividade
+from app.utils.notifications import (
+    notificar_turma, notificar_nova_atividade, criar_notificacao, criar_notificacao_global,
+    criar_notificacao_turma, consulta_caixa_entrada,
+    marcar_notificacao_lida, marcar_todas_notificacoes_lidas,
+    contar_nao_lidas, recalcular_contadores_nao_lidas, verificar_prazos_proximos,
+    limpar_notificacoes_antigas
+)
+from app.utils.outbox import processar_outbox, limpar_eventos_concluidos
+from app.utils.scheduler import LeaderLock
+from app.utils.jobs import iniciar_tarefa
+from app.utils.notification_stream import (
+    NotificationBroadcaster, StreamLimitReached, stream_notificacoes,
+    alvo_turma, alvo_usuario, get_broadcaster, limite_streams
+)
+
+def test_notificar_turma_grava_uma_vez(test_app):
+    """
+    Testa se o aviso de turma é gravado uma única vez, independente do número de alunos.
+    """
+    with test_app.app_context():
+        for i in range(5):
+            aluno = Usuario(
+                nome_completo=f'Aluno Lote {i}',
+                email=f'aluno.lote{i}@test.com',
+                tipo='aluno',
+                turma='LOTE01',
+                status='ativo',
+                senha_hash='x'
+            )
+            db.session.add(aluno)
+        db.session.commit()
+        
+        inserts = []
+        
+        def contar_inserts(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('INSERT INTO notificacoes'):
+                inserts.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', contar_inserts)
+        try:
+            criadas = notificar_turma('LOTE01', 'Aviso', 'Mensagem para a turma')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', contar_inserts)
+        
+        assert criadas == 1
+        assert len(inserts) == 1
+        assert Notificacao.query.filter_by(titulo='Aviso', turma='LOTE01').count() == 1
+
+def test_caixa_entrada_leitura_por_usuario(test_app):
+    """
+    Testa se avisos de turma/globais são lidos por usuário (recibo e marcador).
+    """
+    with test_app.app_context():
+        alunos = [
+            Usuario(nome_completo=f'Aluno Caixa {i}', email=f'aluno.caixa{i}@test.com',
+                    tipo='aluno', turma='CAIXA01', status='ativo', senha_hash='x')
+            for i in range(2)
+        ]
+        outro = Usuario(nome_completo='Aluno Outra Turma', email='aluno.outra@test.com',
+                        tipo='aluno', turma='CAIXA02', status='ativo', senha_hash='x')
+        db.session.add_all(alunos + [outro])
+        db.session.commit()
+        
+        criar_notificacao_turma('CAIXA01', 'Aviso Caixa', 'Mensagem')
+        criar_notificacao_global('Global Caixa', 'Mensagem')
+        criar_notificacao(alunos[0].id, 'Pessoal Caixa', 'Mensagem')
+        
+        def nao_lidas(usuario):
+            query, lida = consulta_caixa_entrada(usuario)
+            return sorted(n.titulo for n, _ in query.filter(~lida) if 'Caixa' in n.titulo)
+        
+        assert nao_lidas(alunos[0]) == ['Aviso Caixa', 'Global Caixa', 'Pessoal Caixa']
+        assert nao_lidas(outro) == ['Global Caixa']
+        
+        # Recibo vale só para quem leu
+        aviso = Notificacao.query.filter_by(titulo='Aviso Caixa').first()
+        marcar_notificacao_lida(aviso, alunos[0])
+        assert nao_lidas(alunos[0]) == ['Global Caixa', 'Pessoal Caixa']
+        assert nao_lidas(alunos[1]) == ['Aviso Caixa', 'Global Caixa']
+        
+        # Marcar todas avança o marcador e compacta os recibos
+        marcar_todas_notificacoes_lidas(alunos[0])
+        assert nao_lidas(alunos[0]) == []
+        assert NotificacaoLeitura.query.filter_by(usuario_id=alunos[0].id).count() == 0
+        assert nao_lidas(alunos[1]) == ['Aviso Caixa', 'Global Caixa']
+
+def test_aviso_turma_somente_alunos_ativos(test_app):
+    """
+    Testa se professores e alunos inativos da turma não recebem o aviso nem o contador.
+    """
+    with test_app.app_context():
+        usuarios = [
+            Usuario(nome_completo=nome, email=email, tipo=tipo, turma='CAIXA03', status=status, senha_hash='x')
+            for nome, email, tipo, status in (
+                ('Aluno Ativo', 'aluno.ativo3@test.com', 'aluno', 'ativo'),
+                ('Aluno Inativo', 'aluno.inativo3@test.com', 'aluno', 'inativo'),
+                ('Professor Turma', 'professor.turma3@test.com', 'professor', 'ativo'),
+            )
+        ]
+        db.session.add_all(usuarios)
+        db.session.commit()
+        antes = [contar_nao_lidas(usuario) for usuario in usuarios]
+        
+        criar_notificacao_turma('CAIXA03', 'Aviso Restrito', 'Mensagem')
+        
+        esperado = [antes[0] + 1, antes[1], antes[2]]
+        assert [contar_nao_lidas(usuario) for usuario in usuarios] == esperado
+        for usuario in usuarios:
+            query, _ = consulta_caixa_entrada(usuario)
+            titulos = [n.titulo for n, _ in query]
+            assert ('Aviso Restrito' in titulos) is (usuario.tipo == 'aluno' and usuario.status == 'ativo')
+        
+        recalcular_contadores_nao_lidas()
+        assert [contar_nao_lidas(usuario) for usuario in usuarios] == esperado
+
+def test_outbox_enfileira_e_expande(test_app):
+    """
+    Testa se a criação de atividade só grava o evento e o dispatcher o expande uma vez.
+    """
+    with test_app.app_context():
+        professor = Usuario(nome_completo='Prof Outbox', email='prof.outbox@test.com',
+                            tipo='professor', senha_hash='x')
+        db.session.add(professor)
+        for i in range(3):
+            db.session.add(Usuario(
+                nome_completo=f'Aluno Outbox {i}',
+                email=f'aluno.outbox{i}@test.com',
+                tipo='aluno',
+                turma='OUTBOX01',
+                status='ativo',
+                senha_hash='x'
+            ))
+        db.session.commit()
+        
+        atividade = Atividade(
+            titulo='Atividade Outbox',
+            descricao='Teste',
+            tipo='individual',
+            prazo=datetime.utcnow() + timedelta(days=7),
+            criado_por=professor.id,
+            turma='OUTBOX01'
+        )
+        db.session.add(atividade)
+        notificar_nova_atividade(atividade)
+        db.session.commit()
+        
+        # Nada expandido ainda: apenas o evento na outbox
+        assert Notificacao.query.filter_by(titulo='Nova atividade: Atividade Outbox').count() == 0
+        assert EventoNotificacao.query.filter_by(status='pendente').count() == 1
+        
+        # O aviso da turma é gravado uma única vez
+        assert processar_outbox() == (1, 1)
+        assert processar_outbox() == (0, 0)
+        assert Notificacao.query.filter_by(titulo='Nova atividade: Atividade Outbox', turma='OUTBOX01').count() == 1
+        assert EventoNotificacao.query.filter_by(status='concluido').count() == 1
+
+def test_limpar_eventos_concluidos_em_lotes(test_app):
+    """
+    Testa a remoção em lotes dos eventos concluídos antigos (pendentes, com erro
+    e concluídos recentes permanecem).
+    """
+    with test_app.app_context():
+        antigo = datetime.utcnow() - test_app.config['NOTIFICATION_OUTBOX_RETENTION'] - timedelta(hours=1)
+        for i in range(5):
+            db.session.add(EventoNotificacao(tipo='usuarios', payload='{}', status='concluido',
+                                             processado_em=antigo))
+        mantidos = [
+            EventoNotificacao(tipo='usuarios', payload='{}', status='concluido',
+                              processado_em=datetime.utcnow()),
+            EventoNotificacao(tipo='usuarios', payload='{}', status='erro', processado_em=antigo),
+            EventoNotificacao(tipo='usuarios', payload='{}', status='pendente')
+        ]
+        db.session.add_all(mantidos)
+        db.session.commit()
+        ids_mantidos = {evento.id for evento in mantidos}
+        
+        assert limpar_eventos_concluidos(lote=2) == 5
+        restantes = {evento_id for (evento_id,) in db.session.query(EventoNotificacao.id)}
+        assert ids_mantidos <= restantes
+        assert EventoNotificacao.query.filter(
+            EventoNotificacao.status == 'concluido', EventoNotificacao.processado_em == antigo
+        ).count() == 0
+        
+        EventoNotificacao.query.filter(EventoNotificacao.id.in_(ids_mantidos)).delete(synchronize_session=False)
+        db.session.commit()
+
+def test_contador_nao_lidas(test_app):
+    """
+    Testa se o contador materializado acompanha criação, leitura e reparo em lote.
+    """
+    with test_app.app_context():
+        aluno = Usuario(nome_completo='Aluno Contador', email='aluno.contador@test.com',
+                        tipo='aluno', turma='CONT01', status='ativo', senha_hash='x')
+        db.session.add(aluno)
+        db.session.commit()
+        
+        base = contar_nao_lidas(aluno)  # Cria o marcador
+        
+        criar_notificacao_turma('CONT01', 'Aviso Contador', 'Mensagem')
+        criar_notificacao_turma('CONT02', 'Outra Turma', 'Mensagem')
+        criar_notificacao(aluno.id, 'Pessoal Contador', 'Mensagem')
+        assert contar_nao_lidas(aluno) == base + 2
+        
+        aviso = Notificacao.query.filter_by(titulo='Aviso Contador').first()
+        marcar_notificacao_lida(aviso, aluno)
+        marcar_notificacao_lida(aviso, aluno)  # Repetir não desconta de novo
+        assert contar_nao_lidas(aluno) == base + 1
+        
+        # Mudar de turma invalida o contador
+        aluno.turma = 'CONT02'
+        db.session.commit()
+        assert db.session.get(NotificacaoMarcador, aluno.id).nao_lidas is None
+        assert contar_nao_lidas(aluno) == base + 2
+        
+        # Reparo em lote chega ao mesmo valor
+        db.session.get(NotificacaoMarcador, aluno.id).nao_lidas = 99
+        db.session.commit()
+        recalcular_contadores_nao_lidas()
+        assert contar_nao_lidas(aluno) == base + 2
+        
+        marcar_todas_notificacoes_lidas(aluno)
+        assert contar_nao_lidas(aluno) == 0
+
+def test_contador_nao_lidas_nao_sobrescreve_gravacao_concorrente(test_app):
+    """
+    Testa se o recálculo de um contador NULL não sobrescreve um valor gravado
+    por outra requisição entre a leitura do marcador e a gravação.
+    """
+    with test_app.app_context():
+        aluno = Usuario(nome_completo='Aluno Corrida', email='aluno.corrida@test.com',
+                        tipo='aluno', turma='CORR01', status='ativo', senha_hash='x')
+        db.session.add(aluno)
+        db.session.commit()
+        contar_nao_lidas(aluno)
+        db.session.get(NotificacaoMarcador, aluno.id).nao_lidas = None
+        db.session.commit()
+        
+        # O marcador (NULL) já está na sessão quando a outra gravação acontece
+        marcador = db.session.get(NotificacaoMarcador, aluno.id)
+        assert marcador.nao_lidas is None
+        db.session.execute(
+            update(NotificacaoMarcador).where(NotificacaoMarcador.usuario_id == aluno.id)
+            .values(nao_lidas=7).execution_options(synchronize_session=False)
+        )
+        assert contar_nao_lidas(aluno) == 7
+        db.session.refresh(marcador)
+        assert marcador.nao_lidas == 7
+
+def test_polling_contador_sem_rate_limit(test_client, init_database, login):
+    """
+    Testa se o polling do contador passa do antigo teto de 50/hora sem 429.
+    """
+    login('aluno@test.com')
+    for _ in range(60):
+        assert test_client.get('/api/notificacoes/nao-lidas/count').status_code == 200
+    test_client.delete_cookie('session')
+
+def test_stream_notificacoes(test_app):
+    """
+    Testa o stream SSE: contador inicial, push após commit e retomada por Last-Event-ID.
+    """
+    with test_app.app_context():
+        aluno = Usuario(nome_completo='Aluno Stream', email='aluno.stream@test.com',
+                        tipo='aluno', turma='STREAM01', status='ativo', senha_hash='x')
+        db.session.add(aluno)
+        db.session.commit()
+        
+        stream = stream_notificacoes(test_app, aluno.id)
+        assert next(stream).startswith('retry:')
+        assert next(stream).startswith('event: nao_lidas')
+        
+        # O commit acorda o stream, que envia a notificação e o novo contador
+        criar_notificacao_turma('STREAM01', 'Aviso Stream', 'Mensagem')
+        evento = next(stream)
+        assert 'event: notificacao' in evento and 'Aviso Stream' in evento
+        assert next(stream).startswith('event: nao_lidas')
+        stream.close()
+        
+        ultimo_id = int(evento.split('\n')[0].split(': ')[1])
+        criar_notificacao(aluno.id, 'Pessoal Stream', 'Mensagem')
+        
+        # Reconexão com Last-Event-ID recebe só o que perdeu
+        retomado = stream_notificacoes(test_app, aluno.id, ultimo_id)
+        next(retomado)
+        evento = next(retomado)
+        assert 'Pessoal Stream' in evento and 'Aviso Stream' not in evento
+        retomado.close()
+
+def test_stream_limite_por_worker(tmp_path):
+    """
+    Testa o limite de conexões simultâneas do broadcaster.
+    """
+    broadcaster = NotificationBroadcaster(str(tmp_path / 'sinal'), max_streams=2)
+    broadcaster.abrir()
+    broadcaster.abrir()
+    try:
+        broadcaster.abrir()
+        assert False, 'Deveria recusar a terceira conexão'
+    except StreamLimitReached:
+        pass
+    broadcaster.fechar()
+    broadcaster.abrir()
+    assert broadcaster.stats()['abertos'] == 2
+
+def test_limite_streams_reserva_threads():
+    """
+    Testa se o teto de streams deixa SSE_RESERVED_THREADS threads livres por worker.
+    """
+    config = {'GUNICORN_THREADS': 16, 'SSE_RESERVED_THREADS': 8, 'SSE_MAX_STREAMS': None}
+    assert limite_streams(config) == 8
+    assert limite_streams({**config, 'SSE_MAX_STREAMS': 4}) == 4
+    assert limite_streams({**config, 'SSE_MAX_STREAMS': 50}) == 8
+    assert limite_streams({**config, 'GUNICORN_THREADS': 4}) == 0
+
+def test_sinal_acorda_apenas_streams_afetados(test_app, tmp_path):
+    """
+    Testa se uma alteração acorda só as conexões do usuário/turma afetados,
+    no próprio worker e (pelo arquivo de sinal) nos demais.
+    """
+    with test_app.app_context():
+        aluno = Usuario(nome_completo='Aluno Alvo', email='aluno.alvo@test.com',
+                        tipo='aluno', turma='ALVO01', status='ativo', senha_hash='x')
+        db.session.add(aluno)
+        db.session.commit()
+        
+        broadcaster = get_broadcaster()
+        do_aluno = broadcaster.inscrever([alvo_usuario(aluno.id), alvo_turma('ALVO01')])
+        de_outro = broadcaster.inscrever([alvo_usuario(-1), alvo_turma('OUTRA')])
+        try:
+            criar_notificacao(aluno.id, 'Pessoal Alvo', 'Mensagem')
+            assert broadcaster.aguardar(do_aluno, timeout=0) is True
+            assert broadcaster.aguardar(de_outro, timeout=0) is False
+            
+            criar_notificacao_turma('ALVO01', 'Aviso Alvo', 'Mensagem')
+            assert broadcaster.aguardar(do_aluno, timeout=0) is True
+            assert broadcaster.aguardar(de_outro, timeout=0) is False
+            
+            criar_notificacao_global('Global Alvo', 'Mensagem')
+            assert broadcaster.aguardar(do_aluno, timeout=0) is True
+            assert broadcaster.aguardar(de_outro, timeout=0) is True
+        finally:
+            broadcaster.cancelar(do_aluno)
+            broadcaster.cancelar(de_outro)
+    
+    # Outro worker: lê as linhas acrescentadas ao arquivo de sinal
+    escritor = NotificationBroadcaster(str(tmp_path / 'sinal'))
+    leitor = NotificationBroadcaster(str(tmp_path / 'sinal'))
+    do_aluno = leitor.inscrever([alvo_usuario(1)])
+    de_outro = leitor.inscrever([alvo_usuario(2)])
+    posicao = leitor._posicao_inicial()
+    
+    escritor.sinalizar([alvo_usuario(1)])
+    with open(escritor.arquivo_sinal) as arquivo:
+        sinal = arquivo.read()
+    # Linha gravada por outro processo (o próprio pid é ignorado)
+    with open(escritor.arquivo_sinal, 'w') as arquivo:
+        arquivo.write(sinal.replace(f'"pid": {os.getpid()}', '"pid": 0'))
+    posicao = leitor._ler_sinais(posicao)
+    assert leitor.aguardar(do_aluno, timeout=0) is True
+    assert leitor.aguardar(de_outro, timeout=0) is False
+    
+    # Arquivo truncado por outro escritor: todas as conexões são acordadas
+    with open(escritor.arquivo_sinal, 'w') as arquivo:
+        arquivo.write('#novo\n')
+    leitor._ler_sinais(posicao)
+    assert leitor.aguardar(de_outro, timeout=0) is True
+
+def test_lembretes_prazo_enviados_uma_vez(test_app):
+    """
+    Testa se cada lembrete de prazo é enviado uma única vez e se a reexecução é uma consulta.
+    """
+    with test_app.app_context():
+        professor = Usuario(nome_completo='Prof Prazo', email='prof.prazo@test.com',
+                            tipo='professor', senha_hash='x')
+        db.session.add(professor)
+        db.session.commit()
+        
+        atividade = Atividade(
+            titulo='Atividade Prazo',
+            descricao='Teste',
+            tipo='individual',
+            prazo=datetime.utcnow() + timedelta(hours=12),
+            criado_por=professor.id,
+            turma='PRAZO01'
+        )
+        db.session.add(atividade)
+        db.session.commit()
+        
+        # Dentro das duas janelas: apenas um lembrete
+        assert verificar_prazos_proximos(janelas=(48, 24)) == 1
+        
+        consultas = []
+        
+        def contar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', contar)
+        try:
+            assert verificar_prazos_proximos(janelas=(48,)) == 0
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', contar)
+        
+        assert len(consultas) == 1
+        assert Notificacao.query.filter_by(titulo='Prazo próximo: Atividade Prazo').count() == 1
+
+def test_lider_unico_do_agendador(test_app):
+    """
+    Testa se apenas um LeaderLock obtém a liderança por vez.
+    """
+    with test_app.app_context():
+        primeiro = LeaderLock(db.engine)
+        segundo = LeaderLock(db.engine)
+        assert primeiro.tentar()
+        assert not segundo.tentar()
+        primeiro.liberar()
+        assert segundo.tentar()
+        segundo.liberar()
+
+def test_limpeza_em_lotes(test_app):
+    """
+    Testa a limpeza em lotes: progresso por lote, contadores e execução como tarefa.
+    """
+    with test_app.app_context():
+        aluno = Usuario(nome_completo='Aluno Limpeza', email='aluno.limpeza@test.com',
+                        tipo='aluno', turma='LIMP01', status='ativo', senha_hash='x')
+        colega = Usuario(nome_completo='Colega Limpeza', email='colega.limpeza@test.com',
+                         tipo='aluno', turma='LIMP01', status='ativo', senha_hash='x')
+        db.session.add_all([aluno, colega])
+        db.session.commit()
+        
+        # Mesma data_envio em todas: os lotes não podem depender da ordem entre empates
+        antiga = datetime.utcnow() - timedelta(days=400)
+        for i in range(25):
+            criar_notificacao(aluno.id if i % 3 else colega.id, f'Antiga {i}', 'Mensagem')
+        Notificacao.query.filter(Notificacao.titulo.like('Antiga %')).update(
+            {'data_envio': antiga}, synchronize_session=False
+        )
+        db.session.commit()
+        antes = contar_nao_lidas(aluno), contar_nao_lidas(colega)
+        
+        progresso = []
+        removidas = limpar_notificacoes_antigas(dias=365, lote=10, reportar=progresso.append)
+        
+        assert removidas == 25
+        assert progresso == [10, 20, 25]
+        assert (contar_nao_lidas(aluno), contar_nao_lidas(colega)) == (antes[0] - 16, antes[1] - 9)
+        assert Notificacao.query.filter(Notificacao.titulo.like('Antiga %')).count() == 0
+        
+        # Como tarefa em background (síncrona em TESTING)
+        tarefa = iniciar_tarefa('limpar_notificacoes', limpar_notificacoes_antigas, 365, lote=10)
+        assert tarefa.status == 'concluida'
+        assert tarefa.get_resultado() == 0
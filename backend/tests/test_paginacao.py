@@ -0,0 +1,67 @@
+"""
+Testes para a paginação por cursor (keyset)
+"""
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from werkzeug.exceptions import HTTPException
+from app import db
+from app.models.usuario import Usuario
+from app.models.atividade import Atividade
+from app.utils.pagination import paginar
+
+def test_paginacao_por_cursor(test_app):
+    """
+    Testa se o cursor percorre todos os itens na ordem, com empates no prazo, sem COUNT.
+    """
+    with test_app.app_context():
+        professor = Usuario(nome_completo='Prof Cursor', email='prof.cursor@test.com',
+                            tipo='professor', senha_hash='x')
+        db.session.add(professor)
+        db.session.commit()
+        
+        base = datetime(2030, 1, 1)
+        for i in range(7):
+            db.session.add(Atividade(
+                titulo=f'Cursor {i}',
+                descricao='Teste',
+                tipo='individual',
+                prazo=base + timedelta(days=i // 2),  # Prazos repetidos: desempate pelo id
+                criado_por=professor.id,
+                turma='CURSOR01'
+            ))
+        db.session.commit()
+        
+        query = Atividade.query.filter_by(turma='CURSOR01')
+        esperado = [a.id for a in query.order_by(Atividade.prazo, Atividade.id)]
+        
+        statements = []
+        
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        vistos = []
+        cursor = ''
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            while cursor is not None:
+                with test_app.test_request_context(f'/?cursor={cursor}&per_page=3'):
+                    itens, meta = paginar(query, [(Atividade.prazo, 'asc')], Atividade.id)
+                vistos.extend(a.id for a in itens)
+                cursor = meta['next_cursor']
+                assert 'total' not in meta
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        
+        assert vistos == esperado
+        assert not any('count(' in s.lower() for s in statements)
+        
+        # Total apenas quando pedido
+        with test_app.test_request_context('/?cursor=&per_page=3&count=true'):
+            _, meta = paginar(query, [(Atividade.prazo, 'asc')], Atividade.id)
+        assert meta['total'] == 7
+        
+        with test_app.test_request_context('/?cursor=invalido'):
+            with pytest.raises(HTTPException) as erro:
+                paginar(query, [(Atividade.prazo, 'asc')], Atividade.id)
+        assert erro.value.response.status_code == 400
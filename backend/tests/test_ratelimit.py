@@ -0,0 +1,41 @@
+"""
+Testes para o backend SQLite de rate limiting
+"""
+import time
+from limits.storage import storage_from_string
+from app.utils.ratelimit import SQLiteStorage
+
+def test_sqlite_storage_incr_compartilhado(tmp_path):
+    """
+    Testa se duas instâncias (como dois workers) compartilham os contadores.
+    """
+    uri = f"sqlite:///{tmp_path / 'limits.db'}"
+    worker_a = storage_from_string(uri)
+    worker_b = SQLiteStorage(uri)
+
+    assert isinstance(worker_a, SQLiteStorage)
+    assert worker_a.incr('login:1.2.3.4', 60) == 1
+    assert worker_b.incr('login:1.2.3.4', 60) == 2
+    assert worker_a.get('login:1.2.3.4') == 2
+    assert worker_b.get_expiry('login:1.2.3.4') > time.time()
+
+    worker_a.clear('login:1.2.3.4')
+    assert worker_b.get('login:1.2.3.4') == 0
+
+def test_sqlite_storage_expiracao(tmp_path):
+    """
+    Testa se a janela expirada reinicia o contador e é compactada.
+    """
+    storage = SQLiteStorage(f"sqlite:///{tmp_path / 'limits.db'}")
+
+    storage.incr('user:1', 1)
+    storage.incr('user:1', 1)
+    time.sleep(1.1)
+    assert storage.get('user:1') == 0
+    assert storage.incr('user:1', 1) == 1
+
+    storage.incr('user:2', 0)
+    storage._last_compact = 0
+    storage._maybe_compact(time.time() + 1)
+    assert storage.get('user:2') == 0
+    assert storage.check() is True
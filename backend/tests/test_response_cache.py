@@ -0,0 +1,66 @@
+"""
+Testes do cache de respostas (camadas local e compartilhada, invalidação por versão)
+"""
+from app.utils.response_cache import ResponseCache, SharedCacheStorage, get_response_cache
+
+def test_cache_questoes_invalidado_pela_escrita(test_client, init_database, login, criar_prova):
+    """
+    Testa HIT/MISS, variante por papel (resposta correta) e invalidação ao atualizar a questão.
+    """
+    app = test_client.application
+    with app.app_context():
+        atividade, (questao,) = criar_prova('CACHE01', [(['3', '4'], '4')])
+        atividade_id, questao_id = atividade.id, questao.id
+        get_response_cache().clear()
+    
+    url = f'/api/atividades/{atividade_id}/questoes'
+    
+    login('professor@test.com')
+    response = test_client.get(url)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['questoes'][0]['resposta_correta'] == '4'
+    
+    response = test_client.get(url)
+    assert response.headers['X-Cache'] == 'HIT'
+    etag = response.headers['ETag']
+    assert test_client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    
+    # Aluno: outra variante, sem a resposta correta
+    login('aluno@test.com')
+    response = test_client.get(url)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert 'resposta_correta' not in response.get_json()['questoes'][0]
+    # Com as próprias respostas a listagem não passa pelo cache
+    assert 'X-Cache' not in test_client.get(url + '?include=respostas').headers
+    
+    login('professor@test.com')
+    response = test_client.put(f'/api/questoes/{questao_id}', json={'enunciado': '3 + 3?'})
+    assert response.status_code == 200
+    
+    response = test_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['questoes'][0]['enunciado'] == '3 + 3?'
+    
+    with app.app_context():
+        stats = get_response_cache().stats()
+    assert stats['hits_local'] >= 2 and stats['invalidacoes'] >= 1
+
+def test_camada_compartilhada_entre_workers(tmp_path):
+    """
+    Testa se entradas e versões da camada SQLite são vistas por outro worker.
+    """
+    caminho = str(tmp_path / 'cache.db')
+    worker_a = ResponseCache(maxsize=10, ttl=30, compartilhado=SharedCacheStorage(caminho))
+    worker_b = ResponseCache(maxsize=10, ttl=30, compartilhado=SharedCacheStorage(caminho))
+    
+    chave = f'atividade:1:v{worker_a.versao("atividade:1")}:aluno:/api/atividades/1'
+    worker_a.guardar(chave, ('etag', b'{"ok": true}'))
+    
+    assert worker_b.obter(chave) == ('etag', b'{"ok": true}')
+    assert worker_b.stats()['hits_compartilhado'] == 1
+    assert worker_b.obter(chave) is not None
+    assert worker_b.stats()['hits_local'] == 1
+    
+    worker_a.invalidar('atividade:1')
+    assert worker_b.versao('atividade:1') == 1
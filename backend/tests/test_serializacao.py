@@ -0,0 +1,140 @@
+"""
+Testes da serialização por colunas projetadas (listagens, ?fields= e ?include=)
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy import event
+from werkzeug.exceptions import HTTPException
+from app import db
+from app.models.usuario import Usuario
+from app.models.atividade import Atividade
+from app.models.entrega import Entrega
+from app.models.grupo import Grupo, GrupoMembro
+from app.models.notificacao import Notificacao
+from app.utils.notifications import consulta_caixa_entrada
+from app.utils.row_serializers import (
+    serializar_atividade, serializar_entrega, serializar_grupo, serializar_notificacao,
+    plano_da_requisicao
+)
+
+def test_projecao_igual_ao_to_dict(test_app):
+    """
+    Testa se as linhas projetadas geram o mesmo JSON que o to_dict() dos modelos.
+    """
+    with test_app.app_context():
+        professor = Usuario(nome_completo='Prof Projecao', email='prof.projecao@test.com',
+                            tipo='professor', senha_hash='x')
+        aluno = Usuario(nome_completo='Aluno Projecao', email='aluno.projecao@test.com',
+                        tipo='aluno', turma='PROJ01', status='ativo', senha_hash='x')
+        db.session.add_all([professor, aluno])
+        db.session.flush()
+        
+        com_config = Atividade(titulo='Com config', descricao='Teste', tipo='individual',
+                               prazo=datetime(2030, 1, 1), criado_por=professor.id, turma='PROJ01')
+        com_config.set_config({'peso': 2})
+        sem_config = Atividade(titulo='Sem config', descricao=None, tipo='grupo',
+                               prazo=datetime(2030, 1, 2), criado_por=professor.id, turma='PROJ01',
+                               config_json='invalido')
+        db.session.add_all([com_config, sem_config])
+        db.session.flush()
+        
+        avaliada = Entrega(atividade_id=com_config.id, aluno_id=aluno.id, status='avaliado',
+                           nota=7.5, avaliado_por=professor.id, data_avaliacao=datetime(2030, 1, 3))
+        avaliada.set_arquivos(['/uploads/a.pdf'])
+        pendente = Entrega(atividade_id=sem_config.id, aluno_id=aluno.id, status='pendente', nota=0)
+        db.session.add_all([avaliada, pendente])
+        
+        db.session.add_all([
+            Notificacao(usuario_id=aluno.id, titulo='Pessoal', mensagem='M', lida=True),
+            Notificacao(turma='PROJ01', titulo='Turma', mensagem='M'),
+            Notificacao(titulo='Global', mensagem='M'),
+        ])
+        db.session.commit()
+        
+        atividades = Atividade.query.filter_by(turma='PROJ01').order_by(Atividade.id)
+        assert serializar_atividade.serializar(serializar_atividade.consulta(atividades)) == [
+            a.to_dict() for a in atividades
+        ]
+        
+        entregas = Entrega.query.filter_by(aluno_id=aluno.id).order_by(Entrega.id)
+        assert serializar_entrega.serializar(serializar_entrega.consulta(entregas)) == [
+            e.to_dict() for e in entregas
+        ]
+        
+        caixa, lida = consulta_caixa_entrada(aluno)
+        caixa = caixa.order_by(Notificacao.id)
+        caixa_entrada = serializar_notificacao.com(lida=(lida.label('lida_usuario'), bool))
+        assert caixa_entrada.serializar(caixa_entrada.consulta(caixa)) == [
+            n.to_dict(lida=lida_usuario) for n, lida_usuario in caixa
+        ]
+        
+        # Sem estado de leitura do usuário, vale a flag da notificação
+        assert [n['lida'] for n in serializar_notificacao.serializar(
+            serializar_notificacao.consulta(Notificacao.query.filter_by(usuario_id=aluno.id))
+        )] == [True]
+
+def test_fields_e_include(test_app):
+    """
+    Testa ?fields= (só as colunas pedidas no SELECT) e ?include= (uma consulta por relação).
+    """
+    with test_app.app_context():
+        professor = Usuario(nome_completo='Prof Fields', email='prof.fields@test.com',
+                            tipo='professor', senha_hash='x')
+        aluno = Usuario(nome_completo='Aluno Fields', email='aluno.fields@test.com',
+                        tipo='aluno', turma='FIELDS01', status='ativo', senha_hash='x')
+        db.session.add_all([professor, aluno])
+        db.session.flush()
+        
+        atividades = [
+            Atividade(titulo=f'Fields {i}', descricao='Longa', tipo='grupo',
+                      prazo=datetime(2030, 1, 1 + i), criado_por=professor.id, turma='FIELDS01')
+            for i in range(3)
+        ]
+        db.session.add_all(atividades)
+        db.session.flush()
+        for atividade in atividades:
+            grupo = Grupo(nome=f'Grupo {atividade.id}', atividade_id=atividade.id, lider_id=aluno.id)
+            db.session.add(grupo)
+            db.session.flush()
+            db.session.add(GrupoMembro(grupo_id=grupo.id, aluno_id=aluno.id))
+            db.session.add(Entrega(atividade_id=atividade.id, aluno_id=aluno.id, status='entregue'))
+        db.session.commit()
+        
+        query = Atividade.query.filter_by(turma='FIELDS01').order_by(Atividade.prazo)
+        
+        with test_app.test_request_context('/?fields=id,titulo,prazo'):
+            plano = plano_da_requisicao(serializar_atividade, garantir=[Atividade.id])
+        sql = str(plano.consulta(query).statement).lower()
+        assert 'descricao' not in sql and 'config_json' not in sql
+        itens = plano.serializar(plano.consulta(query).all())
+        assert [set(item) for item in itens] == [{'id', 'titulo', 'prazo'}] * 3
+        
+        statements = []
+        
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        # Grupos com membros (padrão) e entregas com a atividade: uma consulta por relação
+        grupos = Grupo.query.filter(Grupo.atividade_id.in_([a.id for a in atividades]))
+        entregas = Entrega.query.filter_by(aluno_id=aluno.id)
+        with test_app.test_request_context('/?include=atividade,avaliacoes'):
+            plano_entregas = plano_da_requisicao(serializar_entrega)
+        plano_grupos = serializar_grupo.plano()
+        
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            lista_grupos = plano_grupos.serializar(plano_grupos.consulta(grupos).all())
+            lista_entregas = plano_entregas.serializar(plano_entregas.consulta(entregas).all())
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        
+        assert len(statements) == 5
+        assert lista_grupos == [g.to_dict() for g in grupos]
+        assert {e['atividade']['titulo'] for e in lista_entregas} == {a.titulo for a in atividades}
+        assert all(e['avaliacoes'] == [] for e in lista_entregas)
+        
+        # Nomes desconhecidos: 400
+        with test_app.test_request_context('/?fields=id,senha_hash'):
+            with pytest.raises(HTTPException) as erro:
+                plano_da_requisicao(serializar_atividade)
+        assert erro.value.response.status_code == 400
@@ -0,0 +1,78 @@
+"""
+Testes para o armazenamento de sessões server-side
+"""
+from datetime import datetime, timedelta
+from app import db
+from app.models.sessao import Sessao
+from app.utils.session_store import (
+    codificar_sessao, decodificar_sessao, limpar_sessoes_expiradas
+)
+
+def test_codificacao_sessao_compacta():
+    """
+    Testa a codificação binária (com e sem compressão) dos dados da sessão.
+    """
+    pequena = {'user_id': 1, 'user_tipo': 'aluno', '_permanent': True}
+    grande = {'historico': ['x' * 50] * 20}
+
+    assert decodificar_sessao(codificar_sessao(pequena)) == pequena
+    assert codificar_sessao(pequena)[:1] == b'\x00'
+    assert codificar_sessao(grande)[:1] == b'\x01'
+    assert decodificar_sessao(codificar_sessao(grande)) == grande
+
+def test_login_grava_sessao_no_servidor(test_client, init_database):
+    """
+    Testa se o login grava a sessão na tabela e o logout a remove.
+    """
+    response = test_client.post(
+        '/api/auth/login',
+        json={'email': 'professor@test.com', 'senha': 'testpass'}
+    )
+    assert response.status_code == 200
+    assert 'user_id' not in response.headers['Set-Cookie']
+
+    with test_client.application.app_context():
+        assert Sessao.query.count() >= 1
+
+    response = test_client.get('/api/auth/me')
+    assert response.status_code == 200
+
+    test_client.post('/api/auth/logout')
+    response = test_client.get('/api/auth/me')
+    assert response.status_code == 401
+
+def test_login_gera_novo_identificador(test_client, init_database):
+    """
+    Testa se o login troca o identificador da sessão e remove o anterior (fixação de sessão).
+    """
+    credenciais = {'email': 'professor@test.com', 'senha': 'testpass'}
+    assert test_client.post('/api/auth/login', json=credenciais).status_code == 200
+    anterior = test_client.get_cookie('session').value
+    with test_client.application.app_context():
+        total = Sessao.query.count()
+
+    assert test_client.post('/api/auth/login', json=credenciais).status_code == 200
+    assert test_client.get_cookie('session').value != anterior
+    with test_client.application.app_context():
+        assert Sessao.query.count() == total
+
+    # O identificador anterior não autentica mais
+    test_client.set_cookie('session', anterior)
+    assert test_client.get('/api/auth/me').status_code == 401
+
+def test_limpar_sessoes_expiradas_em_lotes(test_app):
+    """
+    Testa a remoção em lotes de sessões expiradas.
+    """
+    with test_app.app_context():
+        passado = datetime.utcnow() - timedelta(days=1)
+        for i in range(25):
+            db.session.add(Sessao(id=f'expirada-{i}', dados=b'\x00{}', expira_em=passado))
+        db.session.add(Sessao(
+            id='valida', dados=b'\x00{}', expira_em=datetime.utcnow() + timedelta(days=1)
+        ))
+        db.session.commit()
+
+        assert limpar_sessoes_expiradas(lote=10) == 25
+        assert Sessao.query.filter(Sessao.id.like('expirada-%')).count() == 0
+        assert Sessao.query.get('valida') is not None
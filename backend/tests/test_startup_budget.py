@@ -0,0 +1,53 @@
+"""
+Benchmark de orçamento de inicialização: tempo e memória de create_app()
+
+Roda num processo novo para medir imports reais. Os limites podem ser
+ajustados por STARTUP_BUDGET_SECONDS e STARTUP_BUDGET_RSS_MB.
+"""
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+from app import create_app
+app = create_app('development')
+duracao = time.perf_counter() - inicio
+try:
+    # VmHWM é o pico do próprio processo; no Linux ru_maxrss herda o pico do pai através do exec
+    with open('/proc/self/status') as status:
+        rss = next(int(linha.split()[1]) for linha in status if linha.startswith('VmHWM:'))
+except (OSError, StopIteration):
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss //= 1024
+print(json.dumps({
+    'segundos': duracao,
+    'rss_mb': rss / 1024,
+    'modulos': [m for m in ('weasyprint', 'openpyxl') if m in sys.modules],
+    'fases': app.extensions['startup_timings']
+}))
+"""
+
+def medir_inicializacao():
+    env = dict(os.environ, DATABASE_URL='sqlite:///:memory:')
+    saida = subprocess.run(
+        [sys.executable, '-c', SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+def test_create_app_dentro_do_orcamento():
+    """
+    Testa se create_app() não importa os backends de relatório e respeita
+    os orçamentos de tempo e de memória residente.
+    """
+    medicao = medir_inicializacao()
+    
+    assert medicao['modulos'] == [], f"Backends de relatório importados na inicialização: {medicao['modulos']}"
+    assert medicao['segundos'] < float(os.environ.get('STARTUP_BUDGET_SECONDS', 3.0)), medicao
+    assert medicao['rss_mb'] < float(os.environ.get('STARTUP_BUDGET_RSS_MB', 120)), medicao